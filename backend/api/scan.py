@@ -1,22 +1,286 @@
-from typing import List, Optional
+from typing import BinaryIO, List, Optional, Tuple, Union
+import asyncio
 import logging
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, status, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 import tempfile
 from pathlib import Path
 import zipfile
 import shutil
+import threading
 import time
 
-from backend.models.report import ReportModel
 from backend.services.scanner import scan_directory
-from backend.utils.file_handler import save_uploads
-from iac_audit.report import to_markdown
+from backend.services.executor import scan_executor, ExecutorSaturated
+from backend.services.jobs import job_manager, SUCCEEDED
+from backend.settings import SCAN_RETRY_AFTER, ARCHIVE_MAX_BYTES, UPLOAD_MAX_FILE_BYTES, UPLOAD_MAX_BYTES
+from backend.services.stream import iter_scan_events, encode_ndjson, encode_sse, NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE
+from backend.services.renderers import parse_formats, render, render_bytes, SARIF_MEDIA_TYPE, MARKDOWN_MEDIA_TYPE
+from backend.services.result_cache import result_cache, upload_digest, relative_result, rebase_result
+from backend.services.findings_index import findings_index_cache, InvalidCursor
+from backend.utils.file_handler import save_uploads, copy_upload, open_scan_source, UploadMeter, UploadTooLarge
+from iac_audit.encoding import dumps
+from iac_audit.sources import Source, FeedSource, FeedAborted, ArchiveTooLarge
+from iac_audit.utils import SEVERITY_ORDER, summarize, filter_by_severity
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-SEVERITY_ORDER = {"LOW": 1, "MEDIUM": 2, "HIGH": 3, "CRITICAL": 4}
+
+def _check_severity(severity: Optional[str]) -> Optional[str]:
+    if not severity:
+        return None
+    sev = severity.upper()
+    if sev not in SEVERITY_ORDER:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid severity. Use one of LOW, MEDIUM, HIGH, CRITICAL",
+        )
+    return sev
+
+
+def _stricter(severity: Optional[str], floor: Optional[str]) -> Optional[str]:
+    """The more severe of two minimum severities (None = no minimum)."""
+    if not severity or not floor:
+        return severity or floor
+    return severity if SEVERITY_ORDER[severity] >= SEVERITY_ORDER[floor] else floor
+
+
+def _check_formats(formats: Optional[str]) -> Tuple[str, ...]:
+    try:
+        return parse_formats(formats)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _links(scan_id: str) -> dict:
+    return {
+        "self": f"/scans/{scan_id}",
+        "findings": f"/scans/{scan_id}/findings",
+        "sarif": f"/scans/{scan_id}/sarif",
+        "markdown": f"/scans/{scan_id}/markdown",
+    }
+
+
+async def _stage_uploads(
+    files: Optional[List[UploadFile]],
+    archive: Optional[UploadFile],
+    temp_dir: Path,
+    persist_archive: bool = True,
+) -> Tuple[List[Path], Optional[Union[Path, BinaryIO]], UploadMeter]:
+    """
+    Stream uploaded files into temp_dir; returns (saved_files, archive, meter).
+    The archive is copied next to them only when it must outlive the request,
+    otherwise the upload's own (seekable) file object is returned. Either way
+    it is read once in chunks, enforcing the upload limits and hashing it.
+    """
+    meter = UploadMeter(UPLOAD_MAX_FILE_BYTES, UPLOAD_MAX_BYTES)
+    saved_files: List[Path] = []
+    zip_input: Optional[Union[Path, BinaryIO]] = None
+    try:
+        if files:
+            saved_files = await save_uploads(files, temp_dir, meter)
+            logger.info("Saved %d uploaded files to %s: %s", len(saved_files), temp_dir, [p.name for p in saved_files])
+            if meter.skipped:
+                logger.info("Skipped %d non-IaC uploads: %s", len(meter.skipped), meter.skipped[:20])
+
+        if archive:
+            if not archive.filename or not archive.filename.lower().endswith(".zip"):
+                raise HTTPException(status_code=400, detail="Archive must be a .zip file.")
+            name = Path(archive.filename).name
+            if persist_archive:
+                zip_input = temp_dir / name
+                with open(zip_input, "wb") as zf:
+                    meter.archive_digest = await copy_upload(archive, zf, meter, name)
+            else:
+                meter.archive_digest = await copy_upload(archive, None, meter, name)
+                await archive.seek(0)
+                zip_input = archive.file
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    return saved_files, zip_input, meter
+
+
+def _archive_error(e: Exception) -> HTTPException:
+    if isinstance(e, ArchiveTooLarge):
+        return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    return HTTPException(status_code=400, detail="Invalid ZIP archive.")
+
+
+def _open_source(temp_dir: Path, saved_files: List[Path], archive: Optional[Union[Path, BinaryIO]]) -> Tuple[Source, int]:
+    try:
+        return open_scan_source(saved_files, archive, ARCHIVE_MAX_BYTES)
+    except (zipfile.BadZipFile, ArchiveTooLarge) as e:
+        raise _archive_error(e)
+
+
+def _saturated() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Scanner is at capacity, retry later.",
+        headers={"Retry-After": str(SCAN_RETRY_AFTER)},
+    )
+
+
+def _scan_upload(temp_dir: Path, archive: Optional[Union[Path, BinaryIO]], saved_files: List[Path]) -> dict:
+    """Blocking part of /scan: scan an upload into an unfiltered result; runs on the scan executor."""
+    source, total_archived = _open_source(temp_dir, saved_files, archive)
+
+    # Run the scan while temp_dir still exists; archive members are read in place
+    logger.info("Scanning upload in %s (files: %d, archive entries: %d)", temp_dir, len(saved_files), total_archived)
+    try:
+        with source:
+            report = scan_directory(source)
+    except ArchiveTooLarge as e:
+        raise _archive_error(e)
+    _log_report(report)
+    report.metadata["archive_entries"] = total_archived
+    return report.to_dict()
+
+
+def _scan_feed(feed: FeedSource) -> Optional[dict]:
+    """Scan files as an upload handler feeds them in; None if the feed was aborted."""
+    try:
+        report = scan_directory(feed)
+    except FeedAborted:
+        return None
+    _log_report(report)
+    report.metadata["archive_entries"] = 0
+    return report.to_dict()
+
+
+def _log_report(report) -> None:
+    logger.info(
+        "Scan complete | total_files=%s tf_resources=%s k8s_documents=%s findings=%s",
+        report.metadata.get("total_files"),
+        report.metadata.get("terraform_resources"),
+        report.metadata.get("k8s_documents"),
+        report.count,
+    )
+
+
+def _cached_result(meter: UploadMeter, temp_dir: Path) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    (digest, cached result rebased onto this request's temp_dir) for an
+    upload; (None, None) when the result cache is off.
+    """
+    if not result_cache.enabled:
+        return None, None
+    digest = upload_digest(meter.digests, meter.archive_digest)
+    cached = result_cache.get(digest)
+    return digest, rebase_result(cached, temp_dir) if cached is not None else None
+
+
+def _render_response(
+    result: dict,
+    saved_files: List[Path],
+    sev: Optional[str],
+    formats: Tuple[str, ...],
+    t0: float,
+    cache: Optional[str],
+    inline: bool = True,
+) -> bytes:
+    """
+    Filter an unfiltered scan result (fresh or cached) and encode the /scan
+    response; runs off the event loop. With `inline` false the findings are
+    left out (page through GET /scans/{id}/findings instead).
+    """
+    elapsed = round(time.perf_counter() - t0, 4)
+    # Cached results are shared: never mutate their metadata in place
+    meta = dict(result["metadata"], upload_files=len(saved_files), elapsed_seconds=elapsed)
+    total_archived = meta.get("archive_entries", 0)
+    # Keep the result so SARIF/Markdown can be downloaded later from /scans/{id}
+    scan_id = job_manager.record(dict(result, metadata=meta), {"severity": sev, "upload_files": len(saved_files)})
+
+    # Severity filtering (threshold)
+    findings = filter_by_severity(result["findings"], sev)
+
+    # Rebuild summary after filtering
+    summary = summarize(findings)
+    logger.info("Post-filter summary: %s", summary)
+
+    # Include useful counters for the frontend; encoded once, findings included
+    response = {
+        "id": scan_id,
+        "links": _links(scan_id),
+        "summary": summary,
+        "count": len(findings),
+        "findings": findings if inline else [],
+        "total_files": meta.get("total_files", 0),
+        "terraform_resources": meta.get("terraform_resources", 0),
+        "k8s_documents": meta.get("k8s_documents", 0),
+        "scan_time": elapsed,
+        "debug": {
+            "uploaded_files": len(saved_files),
+            "archive_entries": total_archived,
+            "saved_filenames": [p.name for p in saved_files][:20],
+            "discovered_files": meta.get("total_files", 0),
+            "profile": meta.get("profile"),
+            "cache": cache,
+        },
+    }
+    # SARIF / Markdown only when asked for (formats=sarif,markdown)
+    for fmt in formats:
+        response[fmt] = render(scan_id, fmt, sev, findings)
+    return dumps(response)
+
+
+def _fresh_response(
+    result: dict,
+    digest: Optional[str],
+    temp_dir: Path,
+    saved_files: List[Path],
+    sev: Optional[str],
+    formats: Tuple[str, ...],
+    t0: float,
+    inline: bool = True,
+) -> bytes:
+    if digest is not None:
+        # Cached with upload-relative paths: this temp_dir goes with the request
+        result_cache.put(digest, relative_result(result, temp_dir))
+    return _render_response(result, saved_files, sev, formats, t0, "miss" if digest else None, inline)
+
+
+async def _scan_while_saving(
+    files: List[UploadFile],
+    temp_dir: Path,
+    sev: Optional[str],
+    formats: Tuple[str, ...],
+    t0: float,
+    inline: bool = True,
+) -> bytes:
+    """
+    Many-file uploads: each file is handed to the scan as soon as it is
+    written, so parsing overlaps with persisting the rest. A result cache
+    hit, found once every file is hashed, abandons the scan.
+    """
+    feed = FeedSource()
+    try:
+        scan = asyncio.wrap_future(scan_executor.submit(_scan_feed, feed))
+    except ExecutorSaturated:
+        raise _saturated()
+    meter = UploadMeter(UPLOAD_MAX_FILE_BYTES, UPLOAD_MAX_BYTES)
+    try:
+        saved_files = await save_uploads(files, temp_dir, meter, on_saved=feed.put)
+        digest, cached = await run_in_threadpool(_cached_result, meter, temp_dir)
+    except BaseException as e:
+        # The scan reads from temp_dir: let it stop before the directory goes
+        feed.abort()
+        await scan
+        if isinstance(e, UploadTooLarge):
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+        raise
+    logger.info("Saved %d uploaded files to %s while scanning", len(saved_files), temp_dir)
+    if cached is not None:
+        feed.abort()
+        await scan
+        logger.info("/scan result cache hit %s", digest[:12])
+        return await run_in_threadpool(_render_response, cached, saved_files, sev, formats, t0, "hit", inline)
+    feed.finish()
+    result = await scan
+    return await run_in_threadpool(_fresh_response, result, digest, temp_dir, saved_files, sev, formats, t0, inline)
 
 
 @router.post("/scan", tags=["scan"])
@@ -24,6 +288,8 @@ async def scan_endpoint(
     files: Optional[List[UploadFile]] = File(default=None, description="Multiple IaC files (.tf, .yaml, .yml)"),
     archive: Optional[UploadFile] = File(default=None, description="Single .zip archive of IaC files"),
     severity: Optional[str] = Query(default=None, description="Minimum severity to include (LOW|MEDIUM|HIGH|CRITICAL)"),
+    formats: Optional[str] = Query(default=None, description="Comma-separated renderings to inline: sarif, markdown"),
+    findings: bool = Query(default=True, description="Inline the findings; false returns summary and links only (page through GET /scans/{id}/findings)"),
 ):
     if not files and not archive:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide 'files' or 'archive' to scan.")
@@ -32,89 +298,224 @@ async def scan_endpoint(
                 severity, [getattr(f, 'filename', None) for f in (files or [])],
                 getattr(archive, 'filename', None))
 
+    sev = _check_severity(severity)
+    fmts = _check_formats(formats)
+
     with tempfile.TemporaryDirectory(prefix="iac_scan_") as tmpdir:
         temp_dir = Path(tmpdir)
 
-        saved_files: List[Path] = []
-        if files:
-            saved_files = await save_uploads(files, temp_dir)
-            logger.info("Saved %d uploaded files to %s: %s", len(saved_files), temp_dir, [p.name for p in saved_files])
+        # Feeding files to a running scan needs a thread, not a process, pool
+        if files and len(files) > 1 and not archive and scan_executor.kind == "thread":
+            body = await _scan_while_saving(files, temp_dir, sev, fmts, t0, findings)
+            return Response(content=body, media_type="application/json")
 
-        total_archived = 0
-        if archive:
-            if not archive.filename or not archive.filename.lower().endswith(".zip"):
-                raise HTTPException(status_code=400, detail="Archive must be a .zip file.")
-            zip_path = temp_dir / archive.filename
-            with open(zip_path, "wb") as zf:
-                shutil.copyfileobj(archive.file, zf)
-            try:
-                with zipfile.ZipFile(zip_path, "r") as z:
-                    z.extractall(temp_dir)
-                    total_archived = len(z.namelist())
-                    logger.info("Extracted %d entries from archive %s", total_archived, archive.filename)
-            except zipfile.BadZipFile:
-                raise HTTPException(status_code=400, detail="Invalid ZIP archive.")
-
-        # Run the scan while temp_dir still exists
-        logger.info("Scanning directory: %s", temp_dir)
-        report = scan_directory(temp_dir)
-        logger.info(
-            "Scan complete | total_files=%s tf_resources=%s k8s_documents=%s findings=%s",
-            report.metadata.get("total_files"),
-            report.metadata.get("terraform_resources"),
-            report.metadata.get("k8s_documents"),
-            report.count,
+        # A process pool cannot be handed the upload's file object, only a path
+        saved_files, archive_input, meter = await _stage_uploads(
+            files, archive, temp_dir, persist_archive=scan_executor.kind == "process"
         )
 
-        report.metadata["upload_files"] = len(saved_files)
-        report.metadata["archive_entries"] = total_archived
-        elapsed = round(time.perf_counter() - t0, 4)
-        report.metadata["elapsed_seconds"] = elapsed
-
-        # Convert to dict
-        data = report.model_dump()
-        findings = data.get("findings", [])
-
-        # Severity filtering (threshold)
-        if severity:
-            sev = severity.upper()
-            if sev not in SEVERITY_ORDER:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Invalid severity. Use one of LOW, MEDIUM, HIGH, CRITICAL",
-                )
-            findings = [
-                f for f in findings
-                if SEVERITY_ORDER.get(f.get("severity", "LOW"), 1) >= SEVERITY_ORDER[sev]
-            ]
-
-        # Rebuild summary after filtering
-        from iac_audit.utils import summarize
-        summary = summarize(findings)
-        logger.info("Post-filter summary: %s", summary)
-
-        # SARIF and Markdown
-        sarif = data.get("metadata", {}).get("sarif")
-        markdown = to_markdown(findings)
-
-        # Include useful counters for the frontend
-        response = {
-            "summary": summary,
+        # Identical uploads (same content, names and rule set) reuse the stored result
+        digest, cached = await run_in_threadpool(_cached_result, meter, temp_dir)
+        if cached is not None:
+            logger.info("/scan result cache hit %s", digest[:12])
+            body = await run_in_threadpool(_render_response, cached, saved_files, sev, fmts, t0, "hit", findings)
+            return Response(content=body, media_type="application/json")
+
+        # Scanning and rendering are CPU-bound: keep them off the event loop
+        try:
+            result = await scan_executor.run(_scan_upload, temp_dir, archive_input, saved_files)
+        except ExecutorSaturated:
+            raise _saturated()
+        body = await run_in_threadpool(_fresh_response, result, digest, temp_dir, saved_files, sev, fmts, t0, findings)
+
+    # Already encoded: skip FastAPI's jsonable_encoder pass over every finding
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/scan/stream", tags=["scan"])
+async def scan_stream_endpoint(
+    request: Request,
+    files: Optional[List[UploadFile]] = File(default=None, description="Multiple IaC files (.tf, .yaml, .yml)"),
+    archive: Optional[UploadFile] = File(default=None, description="Single .zip archive of IaC files"),
+    severity: Optional[str] = Query(default=None, description="Minimum severity to include (LOW|MEDIUM|HIGH|CRITICAL)"),
+):
+    """
+    Streaming variant of /scan. Emits newline-delimited JSON events (start,
+    progress per file, finding, and a final summary) as the scan runs, or
+    server-sent events when the client sends `Accept: text/event-stream`.
+    """
+    if not files and not archive:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide 'files' or 'archive' to scan.")
+    sev = _check_severity(severity)
+    use_sse = SSE_MEDIA_TYPE in request.headers.get("accept", "")
+    encode = encode_sse if use_sse else encode_ndjson
+
+    # Streams run in Starlette's threadpool, but still take a scan executor slot
+    if not scan_executor.try_acquire():
+        raise _saturated()
+    # The temp dir must outlive this handler: the body is produced after we return.
+    temp_dir = Path(tempfile.mkdtemp(prefix="iac_scan_"))
+    try:
+        saved_files, zip_path, _ = await _stage_uploads(files, archive, temp_dir)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        scan_executor.release()
+        raise
+
+    released = threading.Event()
+
+    def cleanup():
+        if not released.is_set():
+            released.set()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            scan_executor.release()
+
+    def body():
+        try:
+            source, _ = _open_source(temp_dir, saved_files, zip_path)
+            with source:
+                for event in iter_scan_events(source, sev):
+                    yield encode(event)
+        except ArchiveTooLarge as e:
+            e = _archive_error(e)
+            yield encode({"event": "error", "status": e.status_code, "detail": e.detail})
+        except HTTPException as e:
+            yield encode({"event": "error", "status": e.status_code, "detail": e.detail})
+        finally:
+            cleanup()
+
+    return StreamingResponse(
+        body(),
+        media_type=SSE_MEDIA_TYPE if use_sse else NDJSON_MEDIA_TYPE,
+        # Ask reverse proxies (nginx) not to buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also runs if the client disconnects before the body is consumed
+        background=BackgroundTask(cleanup),
+    )
+
+
+def _job_findings(job: dict) -> List[dict]:
+    """Findings of a finished job, at the severity chosen when it was submitted."""
+    result = job.get("result") or {}
+    return filter_by_severity(result.get("findings", []), (job.get("params") or {}).get("severity"))
+
+
+def _job_view(job: dict) -> dict:
+    """Public representation of a job; the result honours the severity chosen at submit time."""
+    view = {k: job.get(k) for k in ("id", "status", "created_at", "updated_at", "progress", "error")}
+    view["links"] = _links(job["id"])
+    result = job.get("result")
+    if job.get("status") == SUCCEEDED and result is not None:
+        findings = _job_findings(job)
+        view["result"] = {
+            "summary": summarize(findings),
             "count": len(findings),
             "findings": findings,
-            "total_files": data.get("metadata", {}).get("total_files", 0),
-            "terraform_resources": data.get("metadata", {}).get("terraform_resources", 0),
-            "k8s_documents": data.get("metadata", {}).get("k8s_documents", 0),
-            "scan_time": elapsed,
-            "sarif": sarif,
-            "markdown": markdown,
-            "debug": {
-                "uploaded_files": len(saved_files),
-                "archive_entries": total_archived,
-                "saved_filenames": [p.name for p in saved_files][:20],
-                "discovered_files": data.get("metadata", {}).get("total_files", 0),
-            },
+            "metadata": result.get("metadata", {}),
         }
+    return view
 
-    # Let FastAPI handle JSON serialization to avoid any proxy/serialization oddities
-    return response
+
+@router.post("/scans", tags=["scans"], status_code=status.HTTP_202_ACCEPTED)
+async def create_scan_job(
+    files: Optional[List[UploadFile]] = File(default=None, description="Multiple IaC files (.tf, .yaml, .yml)"),
+    archive: Optional[UploadFile] = File(default=None, description="Single .zip archive of IaC files"),
+    severity: Optional[str] = Query(default=None, description="Minimum severity to include (LOW|MEDIUM|HIGH|CRITICAL)"),
+):
+    """Queue a scan and return its id immediately; poll GET /scans/{id} for status and results."""
+    if not files and not archive:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide 'files' or 'archive' to scan.")
+    sev = _check_severity(severity)
+
+    # The job owns (and eventually removes) its work directory
+    work_dir = Path(tempfile.mkdtemp(prefix="iac_job_"))
+    try:
+        saved_files, zip_path, _ = await _stage_uploads(files, archive, work_dir)
+        job_id = job_manager.submit(work_dir, zip_path, {"severity": sev, "upload_files": len(saved_files)}, saved_files)
+    except ExecutorSaturated:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise _saturated()
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    return {"id": job_id, "status": "queued", "links": _links(job_id)}
+
+
+@router.get("/scans/{job_id}", tags=["scans"])
+def get_scan_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown scan job.")
+    return Response(content=dumps(_job_view(job)), media_type="application/json")
+
+
+def _finished_job(job_id: str) -> dict:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown scan job.")
+    if job.get("status") != SUCCEEDED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Scan is {job.get('status')}; no report yet.")
+    return job
+
+
+def _artifact(job_id: str, fmt: str, media_type: str, ext: str) -> Response:
+    job = _finished_job(job_id)
+    sev = (job.get("params") or {}).get("severity")
+    body = render_bytes(job_id, fmt, sev, _job_findings(job))
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="iac-audit-{job_id}.{ext}"'},
+    )
+
+
+@router.get("/scans/{job_id}/sarif", tags=["scans"])
+def get_scan_sarif(job_id: str):
+    """SARIF 2.1.0 report of a finished scan, rendered on first request and cached."""
+    return _artifact(job_id, "sarif", SARIF_MEDIA_TYPE, "sarif.json")
+
+
+@router.get("/scans/{job_id}/markdown", tags=["scans"])
+def get_scan_markdown(job_id: str):
+    """Markdown report of a finished scan, rendered on first request and cached."""
+    return _artifact(job_id, "markdown", MARKDOWN_MEDIA_TYPE, "md")
+
+
+@router.get("/scans/{job_id}/findings", tags=["scans"])
+def get_scan_findings(
+    job_id: str,
+    severity: Optional[str] = Query(default=None, description="Minimum severity; never below the one the scan was submitted with"),
+    rule: Optional[str] = Query(default=None, description="Exact rule id"),
+    file: Optional[str] = Query(default=None, description="Exact file"),
+    resource: Optional[str] = Query(default=None, description="Exact resource"),
+    q: Optional[str] = Query(default=None, description="Case-insensitive text in id, title, file or resource"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """
+    One page of a finished scan's findings, filtered server-side through an
+    index built on first request, with facet counts over the whole scan.
+    """
+    sev = _check_severity(severity)
+    entry = findings_index_cache.get(job_id)
+    if entry is None:
+        job = _finished_job(job_id)
+        submitted = (job.get("params") or {}).get("severity")
+        index = findings_index_cache.build(job_id, (job.get("result") or {}).get("findings", []), submitted)
+    else:
+        index, submitted = entry
+    # Findings the submitter filtered out stay out
+    positions = index.select(_stricter(sev, submitted), rule, file, resource, q or None)
+    try:
+        page, next_cursor = index.page(positions, cursor, limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    body = {
+        "id": job_id,
+        "count": len(positions),
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "findings": page,
+        "facets": index.facets,
+    }
+    return Response(content=dumps(body), media_type="application/json")
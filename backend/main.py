@@ -1,5 +1,6 @@
 import sys
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -11,6 +12,10 @@ if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 from backend.api.scan import router as scan_router  # noqa: E402
+from backend.services.executor import scan_executor  # noqa: E402
+from backend.services.jobs import job_executor  # noqa: E402
+from backend.services.metrics import scan_metrics, METRICS_MEDIA_TYPE  # noqa: E402
+from backend.settings import METRICS_ENABLED  # noqa: E402
 
 # Configure root logging to ensure app logs are visible in container output
 logging.basicConfig(
@@ -20,7 +25,14 @@ logging.basicConfig(
 logging.getLogger("backend").setLevel(logging.INFO)
 logging.getLogger("iac_audit").setLevel(logging.INFO)
 
-app = FastAPI(title="IaC Security Auditing API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    scan_executor.shutdown()
+    job_executor.shutdown()
+
+
+app = FastAPI(title="IaC Security Auditing API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,6 +53,9 @@ def root():
         "endpoints": {
             "health": "/health",
             "scan": "/scan",
+            "scan_stream": "/scan/stream",
+            "scan_jobs": "/scans",
+            "metrics": "/metrics",
             "docs": "/docs",
             "openapi": "/openapi.json"
         }
@@ -50,6 +65,13 @@ def root():
 def health():
     return {"status": "ok"}
 
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus text exposition of scan counters and executor gauges."""
+        body = scan_metrics.render([("scan", scan_executor), ("jobs", job_executor)])
+        return Response(content=body, media_type=METRICS_MEDIA_TYPE)
+
 @app.get("/favicon.ico")
 def favicon():
     """Return empty response for favicon requests to prevent 404 errors."""
@@ -1,10 +1,25 @@
-from typing import Dict, List, Union, Any
-from pydantic import BaseModel, Field
-from .finding import FindingModel
+from typing import Dict, List, Any
+from iac_audit.findings import Finding
 
-class ReportModel(BaseModel):
-    summary: Dict[str, int] = Field(description="Severity breakdown")
-    count: int = Field(description="Total number of findings")
-    findings: List[FindingModel]
-    # Allow nested structures like SARIF (dict) in metadata
-    metadata: Dict[str, Any]
+class ScanReport:
+    """
+    Result of scan_directory. Findings stay native Finding objects; the wire
+    shape ({summary, count, findings, metadata}) is produced once by
+    to_dict()/iac_audit.encoding.dumps instead of validating a model per
+    finding.
+    """
+    __slots__ = ("summary", "count", "findings", "metadata")
+
+    def __init__(self, summary: Dict[str, int], findings: List[Finding], metadata: Dict[str, Any]):
+        self.summary = summary
+        self.count = len(findings)
+        self.findings = findings
+        self.metadata = metadata
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "summary": self.summary,
+            "count": self.count,
+            "findings": [f.to_dict() if isinstance(f, Finding) else dict(f) for f in self.findings],
+            "metadata": self.metadata,
+        }
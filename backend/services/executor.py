@@ -0,0 +1,90 @@
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import logging
+import threading
+
+from backend.settings import SCAN_WORKERS, SCAN_QUEUE_DEPTH, SCAN_EXECUTOR
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class ScanExecutor:
+    """
+    Bounded pool for CPU-bound scan work so the asyncio event loop stays
+    responsive. At most `max_workers` jobs run at once and at most
+    `max_queue` more may wait; beyond that submissions are rejected with
+    ExecutorSaturated instead of piling up latency.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, kind: str = "thread"):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.kind = kind
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="iac-scan")
+            return self._pool
+
+    def try_acquire(self) -> bool:
+        """Reserve a slot without submitting work (e.g. for streamed responses)."""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        if not self.try_acquire():
+            logger.warning("Scan executor saturated (%d in flight)", self.capacity)
+            raise ExecutorSaturated()
+        try:
+            fut = self._get_pool().submit(fn, *args)
+        except BaseException:
+            self.release()
+            raise
+        fut.add_done_callback(lambda _: self.release())
+        return fut
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in the pool and await its result from the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.max_queue,
+            "running": min(in_flight, self.max_workers),
+            "queued": max(0, in_flight - self.max_workers),
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+scan_executor = ScanExecutor(SCAN_WORKERS, SCAN_QUEUE_DEPTH, SCAN_EXECUTOR)
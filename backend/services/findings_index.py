@@ -0,0 +1,160 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+import heapq
+import threading
+
+from iac_audit.utils import SEVERITY_ORDER
+from backend.settings import FINDINGS_INDEX_CACHE_SIZE
+
+# Indexed finding fields by query parameter name
+INDEXED = {"severity": "severity", "rule": "id", "file": "file", "resource": "resource"}
+
+# Facets reported with every page (resources are filterable, but too many to count)
+FACETS = ("severity", "rule", "file")
+
+# Filtered position lists kept per index (one per distinct filter combination)
+SELECTION_CACHE_SIZE = 32
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class FindingsIndex:
+    """
+    Read-only query index over a stored scan's findings (kept in report order):
+    posting lists of positions per severity, rule id, file and resource, plus
+    facet counts computed once. Queries intersect the smallest posting list
+    with the other filters and page through the result by position, so a page
+    costs O(limit) once its filter has been evaluated.
+    """
+
+    def __init__(self, findings: Sequence[Dict[str, Any]]):
+        self.findings = list(findings)
+        self.ranks: List[int] = []
+        self.postings: Dict[str, Dict[Any, List[int]]] = {name: {} for name in INDEXED}
+        indexed = [(self.postings[name], field) for name, field in INDEXED.items()]
+        for pos, f in enumerate(self.findings):
+            self.ranks.append(SEVERITY_ORDER.get(f.get("severity", "LOW"), 1))
+            for postings, field in indexed:
+                postings.setdefault(f.get(field), []).append(pos)
+        self.facets: Dict[str, Dict[Any, int]] = {
+            name: {value: len(positions) for value, positions in self.postings[name].items()}
+            for name in FACETS
+        }
+        self._selections: "OrderedDict[Hashable, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.findings)
+
+    def select(
+        self,
+        severity: Optional[str] = None,
+        rule: Optional[str] = None,
+        file: Optional[str] = None,
+        resource: Optional[str] = None,
+        q: Optional[str] = None,
+    ) -> List[int]:
+        """
+        Sorted positions of the findings at or above `severity` matching the
+        exact rule/file/resource given and, with `q`, containing it
+        (case-insensitive) in their id, title, file or resource.
+        """
+        key = (severity, rule, file, resource, q)
+        with self._lock:
+            positions = self._selections.get(key)
+            if positions is not None:
+                self._selections.move_to_end(key)
+                return positions
+        positions = self._select(severity, rule, file, resource, q)
+        with self._lock:
+            self._selections[key] = positions
+            while len(self._selections) > SELECTION_CACHE_SIZE:
+                self._selections.popitem(last=False)
+        return positions
+
+    def _select(
+        self,
+        severity: Optional[str],
+        rule: Optional[str],
+        file: Optional[str],
+        resource: Optional[str],
+        q: Optional[str],
+    ) -> List[int]:
+        exact = [(name, value) for name, value in (("rule", rule), ("file", file), ("resource", resource)) if value is not None]
+        candidates = [self.postings[name].get(value, []) for name, value in exact]
+        threshold = SEVERITY_ORDER[severity] if severity else None
+        if threshold is not None and threshold > 1:
+            levels = [p for sev, p in self.postings["severity"].items() if SEVERITY_ORDER.get(sev, 1) >= threshold]
+            candidates.append(levels[0] if len(levels) == 1 else list(heapq.merge(*levels)))
+        if len(candidates) <= 1 and not q:
+            # A single posting list (or none) is already the answer
+            return candidates[0] if candidates else list(range(len(self.findings)))
+        if not candidates:
+            positions: Sequence[int] = range(len(self.findings))
+        else:
+            positions = min(candidates, key=len)
+        findings = self.findings
+        ranks = self.ranks
+        checks = [(INDEXED[name], value) for name, value in exact]
+        needle = q.lower() if q else None
+        out: List[int] = []
+        for pos in positions:
+            if threshold is not None and ranks[pos] < threshold:
+                continue
+            f = findings[pos]
+            if any(f.get(field) != value for field, value in checks):
+                continue
+            if needle is not None and not any(needle in str(f.get(k) or "").lower() for k in ("id", "title", "file", "resource")):
+                continue
+            out.append(pos)
+        return out
+
+    def page(self, positions: List[int], cursor: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of `positions` after `cursor` (an opaque token returned as
+        the previous page's next cursor) and the cursor of the following page.
+        """
+        start = 0
+        if cursor:
+            try:
+                after = int(cursor)
+            except ValueError:
+                raise InvalidCursor(f"Invalid cursor: {cursor!r}") from None
+            start = bisect_right(positions, after)
+        chosen = positions[start:start + limit]
+        more = start + limit < len(positions)
+        return [self.findings[p] for p in chosen], (str(chosen[-1]) if more and chosen else None)
+
+
+class FindingsIndexCache:
+    """LRU of FindingsIndex per stored scan id (with the severity it was submitted at)."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Tuple[FindingsIndex, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scan_id: str) -> Optional[Tuple[FindingsIndex, Optional[str]]]:
+        with self._lock:
+            entry = self._items.get(scan_id)
+            if entry is not None:
+                self._items.move_to_end(scan_id)
+            return entry
+
+    def build(self, scan_id: str, findings: Sequence[Dict[str, Any]], severity: Optional[str]) -> FindingsIndex:
+        index = FindingsIndex(findings)
+        if self.max_entries > 0:
+            with self._lock:
+                self._items[scan_id] = (index, severity)
+                while len(self._items) > self.max_entries:
+                    self._items.popitem(last=False)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+findings_index_cache = FindingsIndexCache(FINDINGS_INDEX_CACHE_SIZE)
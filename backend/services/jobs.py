@@ -0,0 +1,243 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import datetime
+import json
+import logging
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+import zipfile
+
+from backend.services.executor import ScanExecutor
+from backend.services.scanner import scan_directory
+from backend.utils.file_handler import open_scan_source
+from backend.settings import JOB_WORKERS, JOB_QUEUE_DEPTH, JOB_DB_PATH, JOB_RETENTION, SCAN_RESULT_RETENTION, ARCHIVE_MAX_BYTES
+from iac_audit.sources import ArchiveTooLarge
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATES = {QUEUED, RUNNING}
+
+# Minimum seconds between persisted progress updates of a running job
+PROGRESS_INTERVAL = 0.5
+
+
+def _now() -> str:
+    return datetime.datetime.utcnow().isoformat() + "Z"
+
+
+class JobStore:
+    """
+    Storage backend for scan jobs. A job is a plain dict:
+    { id, status, created_at, updated_at, params, progress, result, error }
+    where `result` is a ScanReport.to_dict()-shaped dict once the job has succeeded.
+    """
+
+    def create(self, job: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class MemoryJobStore(JobStore):
+    """Process-local store keeping the most recent `max_jobs` jobs."""
+
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+            # Drop the oldest finished jobs beyond the retention limit
+            for jid in list(self._jobs):
+                if len(self._jobs) <= self.max_jobs:
+                    break
+                if self._jobs[jid]["status"] not in ACTIVE_STATES:
+                    del self._jobs[jid]
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields, updated_at=_now())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+
+class SqliteJobStore(JobStore):
+    """
+    Persistent store in a SQLite file. Jobs left queued/running by a previous
+    process can never complete, so they are marked failed on open.
+    """
+
+    JSON_FIELDS = ("params", "progress", "result")
+    COLUMNS = ("id", "status", "created_at", "updated_at", "params", "progress", "result", "error")
+
+    def __init__(self, path: str, max_jobs: int = 1000):
+        self.path = path
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at TEXT, updated_at TEXT, "
+                "params TEXT, progress TEXT, result TEXT, error TEXT)"
+            )
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE status IN (?, ?)",
+                (FAILED, "interrupted by server restart", _now(), QUEUED, RUNNING),
+            )
+
+    def _encode(self, field: str, value: Any) -> Any:
+        return json.dumps(value) if field in self.JSON_FIELDS and value is not None else value
+
+    def create(self, job: Dict[str, Any]) -> None:
+        row = tuple(self._encode(c, job.get(c)) for c in self.COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(f"INSERT INTO jobs ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})", row)
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status NOT IN (?, ?) AND id NOT IN "
+                "(SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?)",
+                (QUEUED, RUNNING, self.max_jobs),
+            )
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = _now()
+        cols = [c for c in fields if c in self.COLUMNS and c != "id"]
+        values = [self._encode(c, fields[c]) for c in cols]
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {', '.join(c + ' = ?' for c in cols)} WHERE id = ?", (*values, job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        for field in self.JSON_FIELDS:
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        return job
+
+
+class JobManager:
+    """
+    Accepts scan jobs and runs them on a bounded worker pool. The uploaded
+    content lives in a work directory owned by the job and removed when it ends.
+    Results of synchronous scans are kept apart, in a small in-memory store
+    (`recent`), so /scan never writes to the job store on the request path.
+    """
+
+    def __init__(self, store: JobStore, executor: ScanExecutor, recent: Optional[JobStore] = None):
+        self.store = store
+        self.executor = executor
+        self.recent = recent if recent is not None else MemoryJobStore(SCAN_RESULT_RETENTION)
+
+    def submit(
+        self,
+        work_dir: Path,
+        zip_path: Optional[Path] = None,
+        params: Optional[Dict[str, Any]] = None,
+        files: Optional[List[Path]] = None,
+    ) -> str:
+        """
+        Queue a scan of the saved `files` (every file under work_dir when not
+        given) plus zip_path; raises ExecutorSaturated when the queue is full.
+        """
+        job_id = uuid.uuid4().hex
+        now = _now()
+        self.store.create({
+            "id": job_id,
+            "status": QUEUED,
+            "created_at": now,
+            "updated_at": now,
+            "params": params or {},
+            "progress": {"files_scanned": 0, "total_files": None},
+            "result": None,
+            "error": None,
+        })
+        try:
+            self.executor.submit(self._run, job_id, work_dir, zip_path, files)
+        except BaseException:
+            self.store.update(job_id, status=FAILED, error="scan queue is full")
+            raise
+        logger.info("Queued scan job %s for %s", job_id, work_dir)
+        return job_id
+
+    def record(self, result: Dict[str, Any], params: Optional[Dict[str, Any]] = None) -> str:
+        """Keep the result of a scan that ran synchronously (POST /scan) so its artifacts can be fetched later."""
+        job_id = uuid.uuid4().hex
+        now = _now()
+        files = result.get("metadata", {}).get("total_files", 0)
+        self.recent.create({
+            "id": job_id,
+            "status": SUCCEEDED,
+            "created_at": now,
+            "updated_at": now,
+            "params": params or {},
+            "progress": {"files_scanned": files, "total_files": files},
+            "result": result,
+            "error": None,
+        })
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.recent.get(job_id)
+        return job if job is not None else self.store.get(job_id)
+
+    def _run(self, job_id: str, work_dir: Path, zip_path: Optional[Path], files: Optional[List[Path]] = None) -> None:
+        self.store.update(job_id, status=RUNNING)
+        last = [0.0]
+
+        def on_progress(done: int, total: int) -> None:
+            now = time.monotonic()
+            if done == total or now - last[0] >= PROGRESS_INTERVAL:
+                last[0] = now
+                self.store.update(job_id, progress={"files_scanned": done, "total_files": total})
+
+        try:
+            if files is None:
+                # Uploads keep their client subdirectories
+                files = sorted(p for p in work_dir.rglob("*") if p != zip_path and p.is_file())
+            source, archive_entries = open_scan_source(files, zip_path, ARCHIVE_MAX_BYTES)
+            with source:
+                report = scan_directory(source, on_progress=on_progress)
+            report.metadata["archive_entries"] = archive_entries
+            self.store.update(job_id, status=SUCCEEDED, result=report.to_dict())
+            logger.info("Scan job %s succeeded | findings=%d", job_id, report.count)
+        except zipfile.BadZipFile:
+            self.store.update(job_id, status=FAILED, error="Invalid ZIP archive.")
+        except ArchiveTooLarge as e:
+            self.store.update(job_id, status=FAILED, error=str(e))
+        except Exception as e:
+            logger.exception("Scan job %s failed", job_id)
+            self.store.update(job_id, status=FAILED, error=str(e) or e.__class__.__name__)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _make_store() -> JobStore:
+    if JOB_DB_PATH:
+        return SqliteJobStore(JOB_DB_PATH, JOB_RETENTION)
+    return MemoryJobStore(JOB_RETENTION)
+
+
+job_executor = ScanExecutor(JOB_WORKERS, JOB_QUEUE_DEPTH, "thread")
+job_manager = JobManager(_make_store(), job_executor)
@@ -0,0 +1,74 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import threading
+
+from backend.services.executor import ScanExecutor
+
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ScanMetrics:
+    """
+    Process-wide counters fed by completed scans and rendered in the
+    Prometheus text exposition format. Scans report their profile dict
+    (see iac_audit.profiling.Profiler.to_dict), so nothing is timed twice.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.scans = 0
+        self.scan_seconds = 0.0
+        self.files = 0
+        self.findings: Dict[str, int] = {}
+        self.stage_seconds: Dict[str, float] = {}
+        self.rule_seconds: Dict[str, float] = {}
+        self.rule_findings: Dict[str, int] = {}
+
+    def observe(self, seconds: float, files: int, summary: Dict[str, int], profile: Optional[Dict[str, Any]] = None) -> None:
+        """Record a completed scan: duration, file count, per-severity counts and optional profile."""
+        with self._lock:
+            self.scans += 1
+            self.scan_seconds += seconds
+            self.files += files
+            for sev, n in summary.items():
+                self.findings[sev] = self.findings.get(sev, 0) + n
+            if profile:
+                for name, s in profile.get("stages", {}).items():
+                    self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + s["seconds"]
+                for name, r in profile.get("rules", {}).items():
+                    self.rule_seconds[name] = self.rule_seconds.get(name, 0.0) + r["seconds"]
+                for fid, n in profile.get("findings_by_rule", {}).items():
+                    self.rule_findings[fid] = self.rule_findings.get(fid, 0) + n
+
+    def render(self, executors: Iterable[Tuple[str, ScanExecutor]] = ()) -> str:
+        out: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: Iterable[Tuple[str, float]]) -> None:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                out.append(f"{name}{labels} {value}")
+
+        with self._lock:
+            metric("iac_audit_scans_total", "counter", "Completed scans.", [("", self.scans)])
+            metric("iac_audit_scan_seconds_total", "counter", "Wall time spent in completed scans.", [("", round(self.scan_seconds, 6))])
+            metric("iac_audit_files_scanned_total", "counter", "IaC files parsed and evaluated.", [("", self.files)])
+            metric("iac_audit_findings_total", "counter", "Findings reported, by severity.",
+                   [(f'{{severity="{_escape(k)}"}}', v) for k, v in sorted(self.findings.items())])
+            metric("iac_audit_stage_seconds_total", "counter", "Time spent per pipeline stage.",
+                   [(f'{{stage="{_escape(k)}"}}', round(v, 6)) for k, v in sorted(self.stage_seconds.items())])
+            metric("iac_audit_rule_seconds_total", "counter", "Time spent per rule check.",
+                   [(f'{{rule="{_escape(k)}"}}', round(v, 6)) for k, v in sorted(self.rule_seconds.items())])
+            metric("iac_audit_rule_findings_total", "counter", "Findings reported, by rule id.",
+                   [(f'{{rule_id="{_escape(k)}"}}', v) for k, v in sorted(self.rule_findings.items())])
+        executors = list(executors)
+        for key in ("running", "queued"):
+            metric(f"iac_audit_executor_{key}", "gauge", f"Scans {key} per executor pool.",
+                   [(f'{{pool="{_escape(name)}"}}', ex.stats()[key]) for name, ex in executors])
+        return "\n".join(out) + "\n"
+
+
+scan_metrics = ScanMetrics()
@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+import threading
+
+from iac_audit.encoding import dumps
+from iac_audit.report import to_markdown
+from backend.services.sarif import generate_sarif
+from backend.settings import RENDER_CACHE_SIZE
+
+SARIF_MEDIA_TYPE = "application/sarif+json"
+MARKDOWN_MEDIA_TYPE = "text/markdown; charset=utf-8"
+
+# Renderers the API can run on demand, by `formats=` name
+RENDERERS: Dict[str, Callable[[List[Dict[str, Any]]], Any]] = {
+    "sarif": generate_sarif,
+    "markdown": to_markdown,
+}
+
+
+def parse_formats(formats: Optional[str]) -> Tuple[str, ...]:
+    """Split a `formats=sarif,markdown` parameter; raises ValueError on unknown names."""
+    if not formats:
+        return ()
+    names = tuple(dict.fromkeys(n.strip().lower() for n in formats.split(",") if n.strip()))
+    unknown = [n for n in names if n not in RENDERERS]
+    if unknown:
+        raise ValueError(f"Unknown format(s): {', '.join(unknown)}. Use: {', '.join(RENDERERS)}")
+    return names
+
+
+class RenderCache:
+    """
+    LRU of rendered artifacts keyed by (scan id, format, severity). Scan
+    results never change once stored, so entries are valid until evicted.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        value = render()
+        if self.max_entries > 0:
+            with self._lock:
+                self._items[key] = value
+                while len(self._items) > self.max_entries:
+                    self._items.popitem(last=False)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+render_cache = RenderCache(RENDER_CACHE_SIZE)
+
+
+def render(scan_id: Optional[str], fmt: str, severity: Optional[str], findings: Sequence[Dict[str, Any]]) -> Any:
+    """Render `findings` as `fmt`, cached per scan when the scan has an id."""
+    fn = RENDERERS[fmt]
+    if scan_id is None:
+        return fn(list(findings))
+    return render_cache.get_or_render((scan_id, fmt, severity), lambda: fn(list(findings)))
+
+
+def render_bytes(scan_id: str, fmt: str, severity: Optional[str], findings: Sequence[Dict[str, Any]]) -> bytes:
+    """Encoded download body for `fmt` (SARIF as JSON, Markdown as UTF-8 text)."""
+    def encode() -> bytes:
+        value = RENDERERS[fmt](list(findings))
+        return value.encode("utf-8") if isinstance(value, str) else dumps(value, indent=True)
+    return render_cache.get_or_render((scan_id, fmt, severity, "bytes"), encode)
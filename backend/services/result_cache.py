@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+import hashlib
+import os
+import threading
+
+from iac_audit.cache import ParseCache, PARSER_VERSION
+from backend.settings import RESULT_CACHE_SIZE, RESULT_CACHE_DIR
+from backend.services.rule_packs import fingerprint
+
+# Identifies the backend rule set (base + extended rules). Bump whenever a
+# Python rule is added or its findings change, so cached results are not
+# reused; declarative rule files are covered by their fingerprint.
+RULESET = f"backend.scanner/2+{fingerprint()}"
+
+# Stands in for the request's upload directory in cached results, whose
+# own directory is gone by the time another request reuses them
+UPLOAD_ROOT = "$UPLOAD"
+
+
+def upload_digest(file_digests: Dict[str, str], archive_digest: Optional[str] = None) -> str:
+    """
+    Content digest of an upload from the per-file sha256s computed while it
+    was saved (keyed by name, which findings report) and the archive's,
+    combined with the rule set and parser versions. Upload order does not matter.
+    """
+    h = hashlib.sha256(f"{RULESET}|p{PARSER_VERSION}|".encode())
+    for name in sorted(file_digests):
+        h.update(f"f:{name}:{file_digests[name]}\n".encode())
+    if archive_digest is not None:
+        h.update(f"z:{archive_digest}\n".encode())
+    return h.hexdigest()
+
+
+def _map_paths(result: Dict[str, Any], fn: Callable[[str], str]) -> Dict[str, Any]:
+    # File paths appear in findings, the scanned file sample and the profile
+    findings = [dict(f, file=fn(f["file"])) for f in result["findings"]]
+    meta = dict(result.get("metadata") or {})
+    if meta.get("scanned_files"):
+        meta["scanned_files"] = [fn(p) for p in meta["scanned_files"]]
+    profile = meta.get("profile")
+    if profile and profile.get("slowest_files"):
+        meta["profile"] = dict(profile, slowest_files=[dict(s, file=fn(s["file"])) for s in profile["slowest_files"]])
+    return dict(result, findings=findings, metadata=meta)
+
+
+def relative_result(result: Dict[str, Any], upload_dir: Union[str, Path]) -> Dict[str, Any]:
+    """Copy of `result` with paths under `upload_dir` made relative to UPLOAD_ROOT, for caching."""
+    prefix = os.path.join(str(upload_dir), "")
+
+    def rel(path: str) -> str:
+        if isinstance(path, str) and path.startswith(prefix):
+            return f"{UPLOAD_ROOT}/{Path(path[len(prefix):]).as_posix()}"
+        return path
+    return _map_paths(result, rel)
+
+
+def rebase_result(result: Dict[str, Any], upload_dir: Union[str, Path]) -> Dict[str, Any]:
+    """Copy of a cached `result` with UPLOAD_ROOT paths moved under this request's `upload_dir`."""
+    prefix = f"{UPLOAD_ROOT}/"
+
+    def rebase(path: str) -> str:
+        if isinstance(path, str) and path.startswith(prefix):
+            return str(Path(upload_dir) / path[len(prefix):])
+        return path
+    return _map_paths(result, rebase)
+
+
+class ResultCache:
+    """
+    Unfiltered scan results (ScanReport.to_dict(), with upload paths made
+    relative by relative_result()) keyed by upload digest: a
+    bounded in-memory LRU, optionally backed by an on-disk ParseCache tier
+    that survives restarts. Severity filtering happens on the way out, so one
+    entry serves every threshold. Entries must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 128, cache_dir: Optional[Union[str, Path]] = None):
+        self.max_entries = max_entries
+        self.disk = ParseCache(cache_dir) if cache_dir else None
+        self._items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or self.disk is not None
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._items.get(digest)
+            if result is not None:
+                self._items.move_to_end(digest)
+                self.hits += 1
+                return result
+        result = self.disk.get(digest) if self.disk else None
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(digest, result)
+        return result
+
+    def put(self, digest: str, result: Dict[str, Any]) -> None:
+        self._remember(digest, result)
+        if self.disk:
+            self.disk.put(digest, result)
+
+    def _remember(self, digest: str, result: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._items[digest] = result
+            self._items.move_to_end(digest)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_DIR)
@@ -0,0 +1,33 @@
+from pathlib import Path
+from typing import List
+import hashlib
+
+from iac_audit.declarative import RuleSpec, load_rules
+from backend.settings import RULES_DIR
+
+# Built-in declarative rules shipped with the backend
+BUILTIN_RULES_DIR = Path(__file__).resolve().parent.parent / "rules"
+
+
+def pack_files() -> List[Path]:
+    """Built-in rule files, then those of IAC_AUDIT_RULES_DIR, each sorted by name."""
+    files = sorted(BUILTIN_RULES_DIR.glob("*.yaml"))
+    if RULES_DIR:
+        files.extend(sorted(Path(RULES_DIR).glob("*.yaml")))
+    return files
+
+
+def load_pack(target: str) -> List[RuleSpec]:
+    """All declarative rules for `target` ("terraform" or "kubernetes")."""
+    specs: List[RuleSpec] = []
+    for path in pack_files():
+        specs.extend(load_rules(path, target))
+    return specs
+
+
+def fingerprint() -> str:
+    """Digest of the loaded rule files, so cached results track rule edits."""
+    h = hashlib.sha256()
+    for path in pack_files():
+        h.update(path.name.encode() + b"\0" + path.read_bytes())
+    return h.hexdigest()[:16]
@@ -1,15 +1,34 @@
 from typing import Dict, Any, List
 
+from iac_audit.registry import RuleRegistry
+from iac_audit.positions import line_of
+from iac_audit.findings import Finding
+from iac_audit.references import active_index
+from iac_audit.declarative import RuleSet
+from backend.services.rule_packs import load_pack
 
-def _finding(resource: Dict[str, Any], fid: str, severity: str, title: str, recommendation: str) -> Dict[str, Any]:
-    return {
-        "id": fid,
-        "severity": severity,
-        "title": title,
-        "file": resource.get("file", "<unknown>"),
-        "resource": f'{resource.get("type")}.{resource.get("name")}',
-        "recommendation": recommendation,
-    }
+TF_EXT_RULES = RuleRegistry("type")
+
+
+def _finding(resource: Dict[str, Any], fid: str, severity: str, title: str, recommendation: str, path: str = "") -> Finding:
+    return Finding(
+        fid,
+        severity,
+        title,
+        resource.get("file", "<unknown>"),
+        resource.get("address") or f'{resource.get("type")}.{resource.get("name")}',
+        recommendation,
+        line_of(resource, path),
+    )
+
+
+def _configured_by(resource: Dict[str, Any], rtype: str) -> bool:
+    """
+    True when a separate `rtype` resource in the same module configures this
+    bucket through its `bucket` attribute (not, say, a `target_bucket`).
+    """
+    index = active_index()
+    return bool(index and index.referrers(resource, rtype, attr="bucket"))
 
 
 def _as_list(val):
@@ -20,13 +39,32 @@ def _as_list(val):
     return [val]
 
 
+TF_EXT_RULES.describe(
+    "TF.S3.NO_ENCRYPTION",
+    "S3 bucket does not enforce server-side encryption",
+    "Add server_side_encryption_configuration with SSE-S3 or SSE-KMS.",
+)
+TF_EXT_RULES.describe(
+    "TF.IAM.WILDCARD",
+    "IAM policy allows wildcard actions or resources",
+    "Restrict actions and resources to least-privilege; avoid '*'.",
+)
+TF_EXT_RULES.describe(
+    "TF.S3.NO_LOGGING",
+    "S3 bucket does not have access logging enabled",
+    "Enable S3 server access logging to a dedicated bucket.",
+)
+
+
+@TF_EXT_RULES.register("aws_s3_bucket")
 def check_s3_encryption(resource: Dict[str, Any]) -> List[Dict[str, Any]]:
     findings: List[Dict[str, Any]] = []
     if resource.get("type") == "aws_s3_bucket":
         body = resource.get("body", {}) or {}
         sse = body.get("server_side_encryption_configuration")
-        # Different TF providers have varying shapes; minimal presence check
-        if not sse:
+        # Different TF providers have varying shapes; minimal presence check.
+        # AWS provider v4+ configures it in a separate resource instead.
+        if not sse and not _configured_by(resource, "aws_s3_bucket_server_side_encryption_configuration"):
             findings.append(_finding(
                 resource,
                 "TF.S3.NO_ENCRYPTION",
@@ -37,6 +75,7 @@ def check_s3_encryption(resource: Dict[str, Any]) -> List[Dict[str, Any]]:
     return findings
 
 
+@TF_EXT_RULES.register("aws_iam_policy", "aws_iam_role_policy")
 def check_iam_wildcards(resource: Dict[str, Any]) -> List[Dict[str, Any]]:
     findings: List[Dict[str, Any]] = []
     rtype = resource.get("type")
@@ -70,51 +109,27 @@ def check_iam_wildcards(resource: Dict[str, Any]) -> List[Dict[str, Any]]:
     return findings
 
 
- 
-
-
-def check_missing_logging(resource: Dict[str, Any]) -> List[Dict[str, Any]]:
+@TF_EXT_RULES.register("aws_s3_bucket")
+def check_s3_logging(resource: Dict[str, Any]) -> List[Dict[str, Any]]:
     findings: List[Dict[str, Any]] = []
-    rtype = resource.get("type")
     body = resource.get("body", {}) or {}
-
-    if rtype in {"aws_lb", "aws_alb"}:
-        al = body.get("access_logs")
-        if not al:
-            findings.append(_finding(
-                resource,
-                "TF.ALB.NO_LOGGING",
-                "MEDIUM",
-                "ALB has no access logging configured",
-                "Configure access_logs with S3 bucket and prefix."
-            ))
-    elif rtype == "aws_s3_bucket":
-        s3log = body.get("logging")
-        if not s3log:
-            findings.append(_finding(
-                resource,
-                "TF.S3.NO_LOGGING",
-                "LOW",
-                "S3 bucket does not have access logging enabled",
-                "Enable S3 server access logging to a dedicated bucket."
-            ))
-    elif rtype == "aws_cloudtrail":
-        # Basic check for CloudWatch logs integration
-        if not body.get("cloud_watch_logs_group_arn") or not body.get("cloud_watch_logs_role_arn"):
-            findings.append(_finding(
-                resource,
-                "TF.CT.NO_CW_LOGGING",
-                "MEDIUM",
-                "CloudTrail is not integrated with CloudWatch Logs",
-                "Set cloud_watch_logs_group_arn and cloud_watch_logs_role_arn for CloudTrail."
-            ))
+    s3log = body.get("logging")
+    if not s3log and not _configured_by(resource, "aws_s3_bucket_logging"):
+        findings.append(_finding(
+            resource,
+            "TF.S3.NO_LOGGING",
+            "LOW",
+            "S3 bucket does not have access logging enabled",
+            "Enable S3 server access logging to a dedicated bucket."
+        ))
     return findings
 
 
+# Single-resource attribute checks (ALB access logs, CloudTrail to CloudWatch)
+# are declarative: backend/rules/terraform.yaml plus any extra packs.
+TF_DECLARATIVE = RuleSet("type", load_pack("terraform"))
+TF_DECLARATIVE.register(TF_EXT_RULES, "tf_declarative_rules")
+
+
 def run_tf_extra_rules(resources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    all_findings: List[Dict[str, Any]] = []
-    for r in resources:
-        all_findings.extend(check_s3_encryption(r))
-        all_findings.extend(check_iam_wildcards(r))
-        all_findings.extend(check_missing_logging(r))
-    return all_findings
+    return TF_EXT_RULES.run(resources)
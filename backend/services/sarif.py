@@ -1,6 +1,11 @@
 from typing import List, Dict, Any
 import datetime
 
+from iac_audit.rules_tf import TF_RULES
+from iac_audit.rules_k8s import K8S_RULES
+from backend.services.rules_tf_ext import TF_EXT_RULES
+from backend.services.rules_k8s_ext import K8S_EXT_RULES
+
 SARIF_VERSION = "2.1.0"
 TOOL_NAME = "IaC Security Auditing Tool"
 
@@ -12,19 +17,39 @@ SEVERITY_TO_LEVEL = {
 }
 
 
+def _descriptor(rule_id: str, title: str, recommendation: str) -> Dict[str, Any]:
+    return {
+        "id": rule_id,
+        "name": title,
+        "shortDescription": {"text": title},
+        "fullDescription": {"text": recommendation},
+        "help": {"text": recommendation},
+    }
+
+
+# Rule descriptors are the same for every report: built once from the static
+# rule metadata the registries describe, never from findings (whose titles
+# name resources of the scanned upload).
+_rules_index: Dict[str, Dict[str, Any]] = {
+    rule_id: _descriptor(rule_id, d["title"], d["recommendation"])
+    for registry in (TF_RULES, K8S_RULES, TF_EXT_RULES, K8S_EXT_RULES)
+    for rule_id, d in registry.descriptions.items()
+}
+
+
+def _rule_descriptor(rule_id: str) -> Dict[str, Any]:
+    rule = _rules_index.get(rule_id)
+    # Rules without a description get a bare descriptor (no finding details)
+    return rule if rule is not None else _descriptor(rule_id, rule_id, "")
+
+
 def generate_sarif(findings: List[Dict[str, Any]]) -> Dict[str, Any]:
     results = []
     rules_index: Dict[str, Dict[str, Any]] = {}
     for f in findings:
         rule_id = f["id"]
         if rule_id not in rules_index:
-            rules_index[rule_id] = {
-                "id": rule_id,
-                "name": f.get("title", rule_id),
-                "shortDescription": {"text": f.get("title", rule_id)},
-                "fullDescription": {"text": f.get("recommendation", "")},
-                "help": {"text": f.get("recommendation", "")},
-            }
+            rules_index[rule_id] = _rule_descriptor(rule_id)
         level = SEVERITY_TO_LEVEL.get(f.get("severity", "LOW"), "note")
         results.append({
             "ruleId": rule_id,
@@ -38,7 +63,7 @@ def generate_sarif(findings: List[Dict[str, Any]]) -> Dict[str, Any]:
                 {
                     "physicalLocation": {
                         "artifactLocation": {"uri": f.get("file")},
-                        "region": {"startLine": 1},  # line info not parsed yet
+                        "region": {"startLine": f.get("line") or 1},  # scan-wide findings have no line
                     },
                 }
             ],
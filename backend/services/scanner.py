@@ -1,88 +1,137 @@
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple, Union
 import datetime
 import logging
+import time
 
 from iac_audit.utils import discover_files, summarize
-from iac_audit.parser_tf import parse_terraform_file
-from iac_audit.parser_k8s import parse_k8s_file
+from iac_audit.cache import ParseCache
+from iac_audit.sources import Source
+from iac_audit.pipeline import ScanStats, iter_file_results as _iter_file_results
+from iac_audit.profiling import Profiler
 from iac_audit.rules_tf import run_tf_rules
-from iac_audit.rules_k8s import run_k8s_rules
+from iac_audit.rules_k8s import run_k8s_rules, run_k8s_global_rules, rule_kinds
 from backend.services.rules_tf_ext import run_tf_extra_rules
-from backend.services.rules_k8s_ext import run_k8s_extra_rules
-from backend.services.sarif import generate_sarif
+from backend.services.rules_k8s_ext import run_k8s_extra_rules, K8S_EXT_RULES
+from backend.services.metrics import scan_metrics
+from backend.settings import SCAN_JOBS, PARSE_CACHE_DIR, SCAN_PROFILE, PROFILE_TOP_FILES
 
-from backend.models.report import ReportModel, FindingModel
+from backend.models.report import ScanReport
 
 logger = logging.getLogger(__name__)
 
-def scan_directory(target_dir: Path) -> ReportModel:
-    started_at = datetime.datetime.utcnow()
-    files = discover_files(str(target_dir))
-    sample = [str(p) for p in files[:10]]
-    logger.info(
-        "Discovered %d candidate IaC files in %s | sample=%s%s",
-        len(files),
-        target_dir,
-        sample,
-        " ..." if len(files) > 10 else "",
+_parse_cache = ParseCache(PARSE_CACHE_DIR) if PARSE_CACHE_DIR else None
+
+
+def evaluate(tf_resources: List[Dict[str, Any]], k8s_docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Base + extended rule sets for the records of a single file."""
+    findings: List[Dict[str, Any]] = []
+    findings.extend(run_tf_rules(tf_resources))
+    findings.extend(run_tf_extra_rules(tf_resources))
+    findings.extend(run_k8s_rules(k8s_docs))
+    findings.extend(run_k8s_extra_rules(k8s_docs))
+    return findings
+
+
+# Kinds the base and extended checks read; others are parsed as stubs
+evaluate.k8s_kinds = lambda: rule_kinds(K8S_EXT_RULES)
+
+
+def new_profiler() -> Optional[Profiler]:
+    """A Profiler when IAC_AUDIT_PROFILE is enabled, else None."""
+    return Profiler(PROFILE_TOP_FILES) if SCAN_PROFILE else None
+
+
+def iter_file_results(
+    target,
+    jobs: Optional[int] = None,
+    stats: Optional[ScanStats] = None,
+    profiler: Optional[Profiler] = None,
+) -> Iterator[Tuple[Optional[Path], List[Dict[str, Any]]]]:
+    """Per-file (path, findings) stream; a final (None, findings) item holds the global rules."""
+    return _iter_file_results(
+        target,
+        evaluate,
+        run_k8s_global_rules,
+        jobs=SCAN_JOBS if jobs is None else jobs,
+        cache=_parse_cache,
+        stats=stats,
+        profiler=profiler,
     )
 
-    tf_resources: List[Dict[str, Any]] = []
-    k8s_docs: List[Dict[str, Any]] = []
 
-    for f in files:
-        if f.suffix == ".tf":
-            tf_resources.extend(parse_terraform_file(f))
-        elif f.suffix in {".yaml", ".yml"}:
-            k8s_docs.extend(parse_k8s_file(f))
-    logger.info("Parsed resources | terraform=%d k8s_docs=%d", len(tf_resources), len(k8s_docs))
+def iter_findings(target, jobs: Optional[int] = None, stats: Optional[ScanStats] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield findings as each file is parsed and evaluated. Only the aggregate
+    ScanStats is retained, so memory is bounded by the largest directory
+    (files of a directory are evaluated together; see iac_audit.pipeline).
+    """
+    for _, findings in iter_file_results(target, jobs, stats):
+        yield from findings
+
+
+def scan_directory(
+    target_dir: Union[Path, Source],
+    jobs: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> ScanReport:
+    """
+    Scan a directory (or any iac_audit Source, e.g. a ZipSource) into a
+    ScanReport. `on_progress(files_scanned, total_files)` is called once
+    after discovery and after every file. Streaming sources (FeedSource) are
+    consumed as their files arrive; their total is only known at the end.
+    """
+    started_at = datetime.datetime.utcnow()
+    t0 = time.perf_counter()
+    stats = ScanStats()
+    prof = new_profiler()
 
+    if isinstance(target_dir, Source) and target_dir.streaming:
+        files = target_dir
+        total = None
+    else:
+        files = discover_files(target_dir)
+        total = len(files)
+        if prof:
+            prof.add_stage("discover", time.perf_counter() - t0)
+    if on_progress:
+        on_progress(0, total or 0)
     findings: List[Dict[str, Any]] = []
-    base_tf = run_tf_rules(tf_resources)
-    ext_tf = run_tf_extra_rules(tf_resources)
-    base_k8s = run_k8s_rules(k8s_docs)
-    ext_k8s = run_k8s_extra_rules(k8s_docs)
-    findings.extend(base_tf)
-    findings.extend(ext_tf)
-    findings.extend(base_k8s)
-    findings.extend(ext_k8s)
-    logger.info("Rule findings breakdown | tf_base=%d tf_ext=%d k8s_base=%d k8s_ext=%d", len(base_tf), len(ext_tf), len(base_k8s), len(ext_k8s))
-
-    # Global K8s rule: if K8s docs exist but no NetworkPolicy found
-    if k8s_docs:
-        has_np = any((d.get("kind") == "NetworkPolicy") for d in k8s_docs)
-        if not has_np:
-            findings.append({
-                "id": "K8S.NO_NETWORKPOLICY",
-                "severity": "LOW",
-                "title": "No Kubernetes NetworkPolicy resources detected",
-                "file": "-",
-                "resource": "Kubernetes.NetworkPolicy",
-                "recommendation": "Define NetworkPolicy to restrict pod ingress/egress by default (deny-all baseline).",
-            })
-            logger.info("Added global finding K8S.NO_NETWORKPOLICY")
-
-    finding_models = [FindingModel(**f) for f in findings]
-    summary = summarize(findings)
+    for path, file_findings in iter_file_results(files, jobs, stats, prof):
+        findings.extend(file_findings)
+        if on_progress and path is not None:
+            on_progress(stats.files, total or stats.files)
+    logger.info(
+        "Scanned %d IaC files in %s | terraform=%d k8s_docs=%d findings=%d | sample=%s",
+        stats.files,
+        target_dir,
+        stats.terraform_resources,
+        stats.k8s_documents,
+        len(findings),
+        stats.sample_files[:10],
+    )
 
-    sarif = generate_sarif(findings)
-    logger.info("Generated SARIF with %d results", len(findings))
+    t1 = time.perf_counter()
+    summary = summarize(findings)
     elapsed = (datetime.datetime.utcnow() - started_at).total_seconds()
+    if prof:
+        prof.add_stage("summary", time.perf_counter() - t1)
 
-    report = ReportModel(
+    report = ScanReport(
         summary=summary,
-        count=len(findings),
-        findings=finding_models,
+        findings=findings,
         metadata={
             "scanned_at": datetime.datetime.utcnow().isoformat() + "Z",
-            "total_files": len(files),
-            "terraform_resources": len(tf_resources),
-            "k8s_documents": len(k8s_docs),
+            "total_files": stats.files,
+            "terraform_resources": stats.terraform_resources,
+            "k8s_documents": stats.k8s_documents,
             "scan_time": elapsed,
-            "sarif": sarif,
-            "scanned_files": [str(p) for p in files[:50]],
+            "scanned_files": stats.sample_files,
         },
     )
-    logger.info("ReportModel created | count=%d summary=%s", report.count, report.summary)
+    profile = prof.to_dict() if prof else None
+    if profile:
+        report.metadata["profile"] = profile
+    scan_metrics.observe(time.perf_counter() - t0, stats.files, summary, profile)
+    logger.info("ScanReport created | count=%d summary=%s", report.count, report.summary)
     return report
@@ -0,0 +1,74 @@
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+import time
+
+from iac_audit.encoding import dumps
+from iac_audit.pipeline import ScanStats
+from iac_audit.sources import Source
+from iac_audit.utils import discover_files, filter_by_severity, summarize
+from backend.services.scanner import iter_file_results, new_profiler
+from backend.services.metrics import scan_metrics
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def iter_scan_events(target_dir: Union[Path, Source], min_severity: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Scan `target_dir` and yield events as they happen:
+      {"event": "start", "total_files"}
+      {"event": "progress", "files_scanned", "total_files", "file", "findings"}  (one per file)
+      {"event": "finding", "finding": {...}}                                    (one per finding)
+      {"event": "summary", "summary", "count", "total_files", ..., "profile"}  (last)
+    Findings below `min_severity` are dropped before they are emitted.
+    """
+    t0 = time.perf_counter()
+    files = discover_files(target_dir)
+    yield {"event": "start", "total_files": len(files)}
+
+    stats = ScanStats()
+    prof = new_profiler()
+    counts = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0}
+    unfiltered = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0}
+    emitted = 0
+    for path, findings in iter_file_results(files, stats=stats, profiler=prof):
+        for sev, n in summarize(findings).items():
+            unfiltered[sev] += n
+        kept = filter_by_severity(findings, min_severity)
+        if path is not None:
+            yield {
+                "event": "progress",
+                "files_scanned": stats.files,
+                "total_files": len(files),
+                "file": path.name,
+                "findings": len(kept),
+            }
+        for f in kept:
+            sev = f.get("severity", "LOW").upper()
+            if sev in counts:
+                counts[sev] += 1
+            emitted += 1
+            yield {"event": "finding", "finding": f}
+
+    profile = prof.to_dict() if prof else None
+    scan_metrics.observe(time.perf_counter() - t0, stats.files, unfiltered, profile)
+    summary = {
+        "event": "summary",
+        "summary": counts,
+        "count": emitted,
+        "total_files": stats.files,
+        "terraform_resources": stats.terraform_resources,
+        "k8s_documents": stats.k8s_documents,
+        "scan_time": round(time.perf_counter() - t0, 4),
+    }
+    if profile:
+        summary["profile"] = profile
+    yield summary
+
+
+def encode_ndjson(event: Dict[str, Any]) -> bytes:
+    return dumps(event) + b"\n"
+
+
+def encode_sse(event: Dict[str, Any]) -> bytes:
+    return b"event: " + event["event"].encode("utf-8") + b"\ndata: " + dumps(event) + b"\n\n"
@@ -0,0 +1,66 @@
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+# Number of parser processes used per scan (1 = serial, 0 = one per CPU)
+SCAN_JOBS = _env_int("IAC_AUDIT_JOBS", 1)
+
+# Optional on-disk parse cache shared by all scans (unset = disabled)
+PARSE_CACHE_DIR = os.environ.get("IAC_AUDIT_CACHE_DIR") or None
+
+# Scan executor: concurrent scans, extra scans allowed to wait, and pool type
+# ("thread" or "process"). Requests beyond workers + queue get a 503.
+SCAN_WORKERS = _env_int("IAC_AUDIT_SCAN_WORKERS", 2)
+SCAN_QUEUE_DEPTH = _env_int("IAC_AUDIT_SCAN_QUEUE", 8)
+SCAN_EXECUTOR = os.environ.get("IAC_AUDIT_SCAN_EXECUTOR", "thread")
+# Seconds suggested to clients in Retry-After when the executor is saturated
+SCAN_RETRY_AFTER = _env_int("IAC_AUDIT_SCAN_RETRY_AFTER", 5)
+
+# Asynchronous scan jobs (POST /scans): worker pool, queue limit, retained jobs
+# and optional SQLite file for persistence (unset = in-memory store)
+JOB_WORKERS = _env_int("IAC_AUDIT_JOB_WORKERS", 2)
+JOB_QUEUE_DEPTH = _env_int("IAC_AUDIT_JOB_QUEUE", 64)
+JOB_RETENTION = _env_int("IAC_AUDIT_JOB_RETENTION", 1000)
+JOB_DB_PATH = os.environ.get("IAC_AUDIT_JOB_DB") or None
+# Synchronous /scan results kept in memory (never in the job store) so their
+# findings and reports can be fetched from /scans/{id}/... afterwards
+SCAN_RESULT_RETENTION = _env_int("IAC_AUDIT_SCAN_RESULT_RETENTION", 32)
+
+# Upload limits: bytes per uploaded file (or archive) and per request. Uploads
+# are streamed to disk in chunks and rejected with 413 once a limit is crossed.
+UPLOAD_MAX_FILE_BYTES = _env_int("IAC_AUDIT_UPLOAD_MAX_FILE_BYTES", 256 * 1024 * 1024)
+UPLOAD_MAX_BYTES = _env_int("IAC_AUDIT_UPLOAD_MAX_BYTES", 512 * 1024 * 1024)
+
+# Cap on the total uncompressed size of IaC members read from an uploaded zip
+ARCHIVE_MAX_BYTES = _env_int("IAC_AUDIT_ARCHIVE_MAX_BYTES", 512 * 1024 * 1024)
+
+# Per-stage/rule/file timings in report metadata ("profile", off by default:
+# per-rule timers slow rule evaluation down), how many of the slowest files to
+# keep, and the Prometheus-format GET /metrics endpoint
+SCAN_PROFILE = _env_int("IAC_AUDIT_PROFILE", 0) != 0
+PROFILE_TOP_FILES = _env_int("IAC_AUDIT_PROFILE_TOP_FILES", 10)
+METRICS_ENABLED = _env_int("IAC_AUDIT_METRICS", 1) != 0
+
+# Rendered SARIF/Markdown artifacts kept per stored scan result (LRU entries)
+RENDER_CACHE_SIZE = _env_int("IAC_AUDIT_RENDER_CACHE", 256)
+
+# Scan results reused for byte-identical uploads to POST /scan: in-memory LRU
+# entries (0 = off) and an optional on-disk tier shared across restarts
+RESULT_CACHE_SIZE = _env_int("IAC_AUDIT_RESULT_CACHE", 128)
+RESULT_CACHE_DIR = os.environ.get("IAC_AUDIT_RESULT_CACHE_DIR") or None
+
+# Extra declarative rule packs (*.yaml, see backend/rules/) loaded after the
+# built-in ones; each file declares `target: terraform` or `target: kubernetes`
+RULES_DIR = os.environ.get("IAC_AUDIT_RULES_DIR") or None
+
+# Query indexes (GET /scans/{id}/findings) kept for recently browsed scans
+FINDINGS_INDEX_CACHE_SIZE = _env_int("IAC_AUDIT_FINDINGS_INDEX_CACHE", 64)
@@ -1,24 +1,134 @@
-from typing import List
+from typing import BinaryIO, Callable, Container, Dict, List, Optional, Tuple, Union
 from fastapi import UploadFile
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+import hashlib
+import re
+
+from iac_audit.sources import Source, FileListSource, ZipSource, MultiSource
 
 ALLOWED_EXTS = {".tf", ".yml", ".yaml", ".json"}
+UPLOAD_CHUNK = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """An uploaded file, or the request as a whole, exceeds its byte limit."""
+
+
+class UploadMeter:
+    """
+    Byte accounting and content digests for one request's uploads. Files are
+    charged as their chunks are written, so limits trip before anything
+    oversized reaches the disk; `digests` maps saved relative paths to sha256 hex.
+    """
+    __slots__ = ("max_file_bytes", "max_total_bytes", "total", "digests", "archive_digest", "skipped")
+
+    def __init__(self, max_file_bytes: Optional[int] = None, max_total_bytes: Optional[int] = None):
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.total = 0
+        self.digests: Dict[str, str] = {}
+        self.archive_digest: Optional[str] = None
+        self.skipped: List[str] = []
+
+    def charge(self, name: str, file_bytes: int, n: int) -> None:
+        self.total += n
+        if self.max_file_bytes and file_bytes > self.max_file_bytes:
+            raise UploadTooLarge(f"{name} exceeds the {self.max_file_bytes} byte upload limit")
+        if self.max_total_bytes and self.total > self.max_total_bytes:
+            raise UploadTooLarge(f"Upload exceeds the {self.max_total_bytes} byte request limit")
+
+
+async def copy_upload(uf: UploadFile, out: Optional[BinaryIO], meter: UploadMeter, name: str) -> str:
+    """
+    Stream `uf` into `out` (or just through the meter when out is None) in
+    UPLOAD_CHUNK pieces, enforcing limits; returns the content sha256.
+    """
+    h = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await uf.read(UPLOAD_CHUNK)
+        if not chunk:
+            break
+        size += len(chunk)
+        meter.charge(name, size, len(chunk))
+        h.update(chunk)
+        if out is not None:
+            out.write(chunk)
+    return h.hexdigest()
 
-async def save_uploads(files: List[UploadFile], dest_dir: Path) -> List[Path]:
+
+def upload_path(filename: str) -> str:
+    """
+    Relative path an upload is saved under: the client's directories are kept
+    (so mod1/main.tf and mod2/main.tf stay apart), but drive letters, `.`,
+    `..` and empty segments are dropped so nothing lands outside dest_dir.
+    """
+    parts = [p for p in re.split(r"[\\/]+", filename) if p not in ("", ".", "..") and not p.endswith(":")]
+    return "/".join(parts)
+
+
+def _unique(rel: str, taken: Container[str]) -> str:
+    # The same path uploaded twice: keep both, as name-2.tf, name-3.tf, ...
+    if rel not in taken:
+        return rel
+    path = PurePosixPath(rel)
+    n = 2
+    while str(path.with_name(f"{path.stem}-{n}{path.suffix}")) in taken:
+        n += 1
+    return str(path.with_name(f"{path.stem}-{n}{path.suffix}"))
+
+
+async def save_uploads(
+    files: List[UploadFile],
+    dest_dir: Path,
+    meter: Optional[UploadMeter] = None,
+    on_saved: Optional[Callable[[Path], None]] = None,
+) -> List[Path]:
+    """
+    Stream uploads into dest_dir chunk by chunk (memory stays flat whatever
+    their size). Files outside ALLOWED_EXTS are skipped without being written;
+    a file over a limit is removed and UploadTooLarge raised. `on_saved` gets
+    each path as soon as it is complete, e.g. to start parsing it. Every
+    upload gets its own path (see upload_path), so each is scanned once.
+    """
+    meter = meter if meter is not None else UploadMeter()
     saved: List[Path] = []
     for uf in files:
         if not uf.filename:
             continue
-        # Use basename to avoid client-side path fragments like C:\fakepath\file.tf
-        safe_name = Path(uf.filename).name
-        suffix = Path(safe_name).suffix.lower()
-        # If you want to restrict types strictly, uncomment:
-        # if suffix not in ALLOWED_EXTS:
-        #     continue
+        rel = upload_path(uf.filename)
+        suffix = PurePosixPath(rel).suffix.lower()
+        if not rel or suffix not in ALLOWED_EXTS:
+            meter.skipped.append(Path(uf.filename).name)
+            continue
+        safe_name = _unique(rel, meter.digests)
         out_path = dest_dir / safe_name
         out_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(out_path, "wb") as out:
-            content = await uf.read()
-            out.write(content)
+        try:
+            with open(out_path, "wb") as out:
+                meter.digests[safe_name] = await copy_upload(uf, out, meter, safe_name)
+        except UploadTooLarge:
+            out_path.unlink(missing_ok=True)
+            raise
         saved.append(out_path)
+        if on_saved:
+            on_saved(out_path)
     return saved
+
+
+def open_scan_source(files: List[Path], archive: Optional[Union[Path, BinaryIO]], max_archive_bytes: int) -> Tuple[Source, int]:
+    """
+    Build the Source for an upload: the saved files as given (no directory
+    walk) plus the zip archive read in place (no extraction). Returns
+    (source, archive_entries). Raises zipfile.BadZipFile or ArchiveTooLarge
+    for unusable archives.
+    """
+    sources: List[Source] = []
+    if files:
+        sources.append(FileListSource(files))
+    archive_entries = 0
+    if archive is not None:
+        zsrc = ZipSource(archive, max_archive_bytes)
+        archive_entries = zsrc.total_entries
+        sources.append(zsrc)
+    return MultiSource(sources), archive_entries
@@ -1,6 +1,6 @@
 import axios from 'axios';
 
-const API_BASE = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
+export const API_BASE = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
 export async function scanFiles({ files, zip, severity }) {
   const formData = new FormData();
@@ -11,7 +11,8 @@ export async function scanFiles({ files, zip, severity }) {
   } else {
     throw new Error('No files provided');
   }
-  const params = {};
+  // Findings are paged from /scans/{id}/findings by the table, not inlined
+  const params = { findings: false };
   if (severity && severity !== 'ALL') params.severity = severity;
   const res = await axios.post(`${API_BASE}/scan`, formData, {
     headers: { 'Content-Type': 'multipart/form-data' },
@@ -25,3 +26,24 @@ export async function scanFiles({ files, zip, severity }) {
   }
   return data;
 }
+
+export async function fetchFindings(scanId, { severity, q, cursor, limit }) {
+  const params = { limit };
+  if (severity && severity !== 'ALL') params.severity = severity;
+  if (q) params.q = q;
+  if (cursor) params.cursor = cursor;
+  const res = await axios.get(`${API_BASE}/scans/${scanId}/findings`, { params });
+  return res.data;
+}
+
+// Every finding of a scan (at the severity it was submitted with), page by page
+export async function fetchAllFindings(scanId) {
+  const findings = [];
+  let cursor = null;
+  do {
+    const page = await fetchFindings(scanId, { cursor, limit: 1000 });
+    findings.push(...page.findings);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return findings;
+}
@@ -1,24 +1,62 @@
-import React from 'react';
+import React, { useState } from 'react';
+import { API_BASE, fetchAllFindings } from '../api/scan';
+
+function saveBlob(blob, filename) {
+  const url = URL.createObjectURL(blob);
+  const a = document.createElement('a');
+  a.href = url;
+  a.download = filename;
+  a.click();
+  URL.revokeObjectURL(url);
+}
 
 export default function DownloadButtons({ report }) {
+  const [busy, setBusy] = useState(false);
+  const [error, setError] = useState(null);
   if (!report) return null;
-  const jsonBlob = new Blob([JSON.stringify(report, null, 2)], { type: 'application/json' });
-  const mdBlob = new Blob([report.markdown || ''], { type: 'text/markdown' });
-  const sarifBlob = new Blob([JSON.stringify(report.sarif || {}, null, 2)], { type: 'application/json' });
+
+  // /scan answers without inline findings; fetch them all when the JSON is saved
+  const downloadJson = async (e) => {
+    e.preventDefault();
+    if (busy) return;
+    setBusy(true);
+    setError(null);
+    try {
+      const inline = Array.isArray(report.findings) && report.findings.length === (report.count ?? report.findings.length);
+      const findings = inline || !report.id ? report.findings || [] : await fetchAllFindings(report.id);
+      const full = { ...report, findings };
+      saveBlob(new Blob([JSON.stringify(full, null, 2)], { type: 'application/json' }), `iac-audit-report-${Date.now()}.json`);
+    } catch (err) {
+      setError(err?.response?.data?.detail || err.message || 'Download failed');
+    } finally {
+      setBusy(false);
+    }
+  };
+  // SARIF/Markdown are rendered server-side on demand; inline copies only exist with ?formats=
+  const links = report.links || {};
+  const fromServer = (path) => (path ? `${API_BASE}${path}` : null);
+  const mdHref = report.markdown
+    ? URL.createObjectURL(new Blob([report.markdown], { type: 'text/markdown' }))
+    : fromServer(links.markdown);
+  const sarifHref = report.sarif
+    ? URL.createObjectURL(new Blob([JSON.stringify(report.sarif, null, 2)], { type: 'application/json' }))
+    : fromServer(links.sarif);
 
   const buttons = [
-    { label: 'JSON', blob: jsonBlob, ext: 'json' },
-    { label: 'Markdown', blob: mdBlob, ext: 'md' },
-    { label: 'SARIF', blob: sarifBlob, ext: 'sarif.json' },
-  ];
+    { label: busy ? 'JSON…' : 'JSON', href: '#', ext: 'json', onClick: downloadJson },
+    { label: 'Markdown', href: mdHref, ext: 'md' },
+    { label: 'SARIF', href: sarifHref, ext: 'sarif.json' },
+  ].filter((btn) => btn.href);
 
   return (
     <div className="flex flex-wrap gap-2">
       {buttons.map((btn) => (
         <a
-          key={btn.label}
-          href={URL.createObjectURL(btn.blob)}
-          download={`iac-audit-report-${Date.now()}.${btn.ext}`}
+          key={btn.ext}
+          href={btn.href}
+          onClick={btn.onClick}
+          aria-busy={btn.onClick ? busy : undefined}
+          download={btn.onClick ? undefined : `iac-audit-report-${Date.now()}.${btn.ext}`}
           className="inline-flex items-center gap-2 px-4 py-2 rounded-lg border border-slate-300 dark:border-slate-600 bg-white dark:bg-slate-700 text-slate-700 dark:text-slate-200 font-medium hover:bg-slate-50 dark:hover:bg-slate-600 transition-colors shadow-sm hover:shadow"
         >
           <span>{btn.label}</span>
@@ -27,6 +65,7 @@ export default function DownloadButtons({ report }) {
           </svg>
         </a>
       ))}
+      {error && <span className="self-center text-sm text-red-600 dark:text-red-400">{error}</span>}
     </div>
   );
 }
@@ -1,28 +1,52 @@
-import React, { useMemo, useState } from 'react';
+import React, { useEffect, useState } from 'react';
+import { fetchFindings } from '../api/scan.js';
 
-export default function FindingsTable({ findings }) {
+// Findings stay on the server: each page is fetched (filtered and indexed)
+// from GET /scans/{id}/findings, so large scans never load in full.
+export default function FindingsTable({ scanId }) {
   const [query, setQuery] = useState('');
+  const [search, setSearch] = useState('');
   const [severityFilter, setSeverityFilter] = useState('ALL');
   const [page, setPage] = useState(1);
   const [pageSize, setPageSize] = useState(10);
+  // cursors[i] fetches page i + 1; the first page needs none
+  const [cursors, setCursors] = useState([null]);
+  const [data, setData] = useState({ findings: [], count: 0, next_cursor: null });
 
-  const filtered = useMemo(() => {
-    if (!findings) return [];
-    return findings.filter(f => {
-      const matchesQuery = query === '' || (
-        f.title.toLowerCase().includes(query.toLowerCase()) ||
-        f.file.toLowerCase().includes(query.toLowerCase()) ||
-        f.resource.toLowerCase().includes(query.toLowerCase()) ||
-        f.id.toLowerCase().includes(query.toLowerCase())
-      );
-      const matchesSeverity = severityFilter === 'ALL' || f.severity === severityFilter;
-      return matchesQuery && matchesSeverity;
-    });
-  }, [findings, query, severityFilter]);
+  useEffect(() => {
+    const t = setTimeout(() => setSearch(query.trim()), 300);
+    return () => clearTimeout(t);
+  }, [query]);
 
-  const totalPages = Math.max(1, Math.ceil(filtered.length / pageSize));
-  const paginated = filtered.slice((page - 1) * pageSize, page * pageSize);
-  const changePage = (newPage) => setPage(Math.min(Math.max(newPage, 1), totalPages));
+  useEffect(() => {
+    setPage(1);
+    setCursors([null]);
+  }, [scanId, search, severityFilter, pageSize]);
+
+  useEffect(() => {
+    if (!scanId) return;
+    let cancelled = false;
+    fetchFindings(scanId, { severity: severityFilter, q: search, cursor: cursors[page - 1], limit: pageSize })
+      .then(res => {
+        if (cancelled) return;
+        setData(res);
+        setCursors(prev => {
+          const next = prev.slice(0, page);
+          if (res.next_cursor) next.push(res.next_cursor);
+          return next;
+        });
+      })
+      .catch(err => console.warn('[FindingsTable] fetch failed', err));
+    return () => { cancelled = true; };
+  }, [scanId, search, severityFilter, pageSize, page]);
+
+  const total = data.count;
+  const paginated = data.findings;
+  const totalPages = Math.max(1, Math.ceil(total / pageSize));
+  const changePage = (newPage) => {
+    if (newPage < 1 || newPage > cursors.length) return;
+    setPage(newPage);
+  };
 
   return (
     <div className="space-y-3">
@@ -46,9 +70,9 @@ export default function FindingsTable({ findings }) {
         >
           <option value="ALL">All Severities</option>
           <option value="CRITICAL">Critical</option>
-          <option value="HIGH">High</option>
-          <option value="MEDIUM">Medium</option>
-          <option value="LOW">Low</option>
+          <option value="HIGH">High+</option>
+          <option value="MEDIUM">Medium+</option>
+          <option value="LOW">Low+</option>
         </select>
       </div>
       <div className="overflow-auto rounded-xl border border-slate-200 dark:border-slate-700 bg-white dark:bg-slate-800 shadow-md">
@@ -86,7 +110,7 @@ export default function FindingsTable({ findings }) {
                     <svg className="w-4 h-4 text-slate-400 flex-shrink-0" fill="none" stroke="currentColor" viewBox="0 0 24 24">
                       <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M9 12h6m-6 4h6m2 5H7a2 2 0 01-2-2V5a2 2 0 012-2h5.586a1 1 0 01.707.293l5.414 5.414a1 1 0 01.293.707V19a2 2 0 01-2 2z" />
                     </svg>
-                    <span className="truncate text-slate-700 dark:text-slate-200" title={f.file}>{f.file}</span>
+                    <span className="truncate text-slate-700 dark:text-slate-200" title={f.file}>{f.file}{f.line ? `:${f.line}` : ""}</span>
                   </div>
                 </td>
                 <td className="px-4 py-3">
@@ -97,7 +121,7 @@ export default function FindingsTable({ findings }) {
                 </td>
               </tr>
             ))}
-            {filtered.length === 0 && (
+            {total === 0 && (
               <tr>
                 <td colSpan={5} className="px-4 py-12 text-center">
                   <div className="flex flex-col items-center gap-2">
@@ -115,7 +139,7 @@ export default function FindingsTable({ findings }) {
       </div>
       <div className="flex flex-col md:flex-row md:items-center md:justify-between gap-4 pt-4">
         <div className="text-sm text-slate-600 dark:text-slate-400">
-          Showing <span className="font-semibold text-slate-900 dark:text-slate-100">{(page - 1) * pageSize + 1}</span> - <span className="font-semibold text-slate-900 dark:text-slate-100">{Math.min(page * pageSize, filtered.length)}</span> of <span className="font-semibold text-slate-900 dark:text-slate-100">{filtered.length}</span>
+          Showing <span className="font-semibold text-slate-900 dark:text-slate-100">{total ? (page - 1) * pageSize + 1 : 0}</span> - <span className="font-semibold text-slate-900 dark:text-slate-100">{Math.min(page * pageSize, total)}</span> of <span className="font-semibold text-slate-900 dark:text-slate-100">{total}</span>
         </div>
         <div className="flex items-center gap-2">
           <button 
@@ -128,14 +152,14 @@ export default function FindingsTable({ findings }) {
           <span className="text-sm font-medium text-slate-600 dark:text-slate-400 px-4">Page {page} of {totalPages}</span>
           <button 
             onClick={() => changePage(page + 1)} 
-            disabled={page === totalPages} 
+            disabled={page >= totalPages || page >= cursors.length} 
             className="px-4 py-2 rounded-lg border border-slate-300 dark:border-slate-600 bg-white dark:bg-slate-700 text-slate-700 dark:text-slate-200 font-medium hover:bg-slate-50 dark:hover:bg-slate-600 disabled:opacity-40 disabled:cursor-not-allowed transition-colors"
           >
             Next
           </button>
           <select 
             value={pageSize} 
-            onChange={(e) => { setPageSize(Number(e.target.value)); setPage(1); }} 
+            onChange={(e) => setPageSize(Number(e.target.value))} 
             className="px-3 py-2 rounded-lg border border-slate-300 dark:border-slate-600 bg-white dark:bg-slate-700 text-slate-900 dark:text-slate-100 text-sm font-medium focus:outline-none focus:ring-2 focus:ring-slate-500 focus:border-slate-500 transition-all"
           >
             {[10,25,50,100].map(sz => <option key={sz} value={sz}>{sz}/page</option>)}
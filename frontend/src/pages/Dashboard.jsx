@@ -206,7 +206,7 @@ export default function Dashboard() {
                 Comprehensive analysis of identified security vulnerabilities and remediation guidance
               </p>
             </div>
-            <FindingsTable findings={report.findings || []} />
+            <FindingsTable scanId={report.id} />
           </motion.section>
         </>
       )}
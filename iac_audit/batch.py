@@ -0,0 +1,149 @@
+"""
+Scan many repositories in one run.
+
+	python -m iac_audit.cli scan-batch repo-a repo-b --out-dir reports
+	python -m iac_audit.cli scan-batch --manifest repos.txt --out-dir reports --workers 0
+
+Roots are scanned by a pool of long-lived worker processes (or in this
+process with one worker), so interpreter start-up and parser imports are paid
+once per worker rather than once per repository. Each worker writes a
+repository's report to the output directory as soon as that repository is
+done and hands back only its counters; the aggregate `summary.json` is built
+from those, so memory does not grow with the number of repositories.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import os
+import re
+import time
+
+from .cache import ParseCache
+from .parsing import resolve_jobs
+from .pipeline import ScanStats, evaluate, iter_findings
+from .report import to_json, to_markdown
+from .encoding import dumps
+from .utils import summarize
+
+SUMMARY_FILE = "summary.json"
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+def read_manifest(path: Union[str, Path]) -> List[str]:
+	"""
+	Roots listed in a manifest file, one per line. Blank lines and `#`
+	comments are skipped; relative roots are taken from the manifest's
+	directory.
+	"""
+	path = Path(path)
+	roots: List[str] = []
+	for line in path.read_text(encoding="utf-8").splitlines():
+		line = line.split("#", 1)[0].strip()
+		if line:
+			roots.append(str(path.parent / line) if not os.path.isabs(line) else line)
+	return roots
+
+def report_names(roots: Iterable[str], output: str = "json") -> List[str]:
+	"""One distinct report file name per root, derived from its directory name."""
+	names: List[str] = []
+	taken = set()
+	for root in roots:
+		base = _UNSAFE.sub("_", Path(root).resolve().name) or "root"
+		name, n = base, 1
+		while name in taken:
+			n += 1
+			name = f"{base}-{n}"
+		taken.add(name)
+		names.append(f"{name}.{output}")
+	return names
+
+def scan_repo(root: str, report: str, output: str = "json", cache_dir: Optional[str] = None) -> Dict[str, Any]:
+	"""
+	Scan one root, write its report to `report` and return its counters (no
+	findings). Failures are returned as an `error` instead of raised, so one
+	broken repository does not stop the batch.
+	"""
+	entry: Dict[str, Any] = {"root": root, "report": report}
+	if not os.path.exists(root):
+		entry["error"] = "path does not exist"
+		return entry
+	start = time.perf_counter()
+	try:
+		stats = ScanStats()
+		cache = ParseCache(cache_dir) if cache_dir else None
+		findings = list(iter_findings(root, evaluate, cache=cache, stats=stats))
+		text = to_json(findings) if output == "json" else to_markdown(findings)
+		Path(report).write_text(text, encoding="utf-8")
+	except Exception as e:
+		entry["error"] = f"{type(e).__name__}: {e}"
+		return entry
+	rules: Dict[str, int] = {}
+	for f in findings:
+		rules[f["id"]] = rules.get(f["id"], 0) + 1
+	entry.update({
+		"files": stats.files,
+		"count": len(findings),
+		"summary": summarize(findings),
+		"rules": rules,
+		"seconds": round(time.perf_counter() - start, 3),
+	})
+	return entry
+
+def _aggregate(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+	totals = {"repos": len(entries), "failed": 0, "files": 0, "count": 0}
+	severities = summarize([])
+	rules: Dict[str, int] = {}
+	for e in entries:
+		if "error" in e:
+			totals["failed"] += 1
+			continue
+		totals["files"] += e["files"]
+		totals["count"] += e["count"]
+		for sev, n in e["summary"].items():
+			severities[sev] += n
+		for rule, n in e["rules"].items():
+			rules[rule] = rules.get(rule, 0) + n
+	totals["summary"] = severities
+	totals["rules"] = dict(sorted(rules.items(), key=lambda kv: (-kv[1], kv[0])))
+	return totals
+
+def scan_batch(
+	roots: List[str],
+	out_dir: Union[str, Path],
+	output: str = "json",
+	workers: Optional[int] = 1,
+	cache_dir: Optional[str] = None,
+	progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+	"""
+	Scan `roots` with `workers` processes (0 = one per CPU, 1 = in this
+	process), writing one report per root plus `summary.json` to `out_dir`.
+	Returns the summary; `progress` is called with each root's entry as it
+	finishes.
+	"""
+	out = Path(out_dir)
+	out.mkdir(parents=True, exist_ok=True)
+	jobs: List[Tuple[str, str]] = [(root, str(out / name)) for root, name in zip(roots, report_names(roots, output))]
+	entries: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+	workers = min(resolve_jobs(workers), len(jobs)) if jobs else 1
+
+	def done(i: int, entry: Dict[str, Any]) -> None:
+		report = entry.pop("report")
+		if "error" not in entry:
+			entry["report"] = os.path.basename(report)
+		entries[i] = entry
+		if progress:
+			progress(entry)
+
+	if workers <= 1:
+		for i, (root, report) in enumerate(jobs):
+			done(i, scan_repo(root, report, output, cache_dir))
+	else:
+		with ProcessPoolExecutor(max_workers=workers) as pool:
+			futures = {pool.submit(scan_repo, root, report, output, cache_dir): i for i, (root, report) in enumerate(jobs)}
+			for future in as_completed(futures):
+				done(futures[future], future.result())
+
+	summary = {"repos": entries, "totals": _aggregate(entries)}
+	(out / SUMMARY_FILE).write_bytes(dumps(summary, indent=True))
+	return summary
@@ -0,0 +1,310 @@
+"""
+Benchmark harness for the scan pipeline.
+
+	python -m iac_audit.bench --tf-files 500 --k8s-files 500 --density 0.3 --out bench.json
+	python -m iac_audit.bench --k8s-yaml --docs 2000 --configmap-kb 8
+
+Generates a synthetic Terraform + Kubernetes corpus (modeled on
+tests/samples/pack) and times each stage separately: discovery, parsing,
+rule evaluation, SARIF generation and API serialization. Results are printed
+(or written) as JSON so runs can be compared across commits. The SARIF and
+serialization stages need the backend package and are skipped without it.
+
+With --k8s-yaml, Kubernetes YAML parser throughput is measured instead, on a
+multi-MB Helm-style manifest: pure-Python SafeLoader, libyaml CSafeLoader
+(the default when available) and CSafeLoader with the kind prefilter scans
+use, which skips constructing ConfigMaps and other documents no rule reads.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from . import parser_k8s
+from .utils import discover_files
+from .parsing import iter_parsed_files, k8s_kinds_for
+from .pipeline import evaluate as base_evaluate
+from .rules_k8s import run_k8s_global_rules, count_kinds
+from .encoding import dumps
+
+BENCH_FORMAT = 1
+
+# (insecure, secure) Terraform resource templates; {n} is a unique suffix
+TF_TEMPLATES: List[Tuple[str, str]] = [
+	(
+		'resource "aws_security_group" "sg{n}" {{\n  name = "sg{n}"\n  ingress {{\n    from_port   = 22\n    to_port     = 22\n    protocol    = "tcp"\n    cidr_blocks = ["0.0.0.0/0"]\n  }}\n}}\n',
+		'resource "aws_security_group" "sg{n}" {{\n  name = "sg{n}"\n  ingress {{\n    from_port   = 443\n    to_port     = 443\n    protocol    = "tcp"\n    cidr_blocks = ["10.0.0.0/16"]\n  }}\n}}\n',
+	),
+	(
+		'resource "aws_s3_bucket" "b{n}" {{\n  bucket = "b{n}"\n}}\n',
+		'resource "aws_s3_bucket" "b{n}" {{\n  bucket = "b{n}"\n  server_side_encryption_configuration {{\n    rule {{\n      apply_server_side_encryption_by_default {{\n        sse_algorithm = "AES256"\n      }}\n    }}\n  }}\n  logging {{\n    target_bucket = "logs"\n  }}\n}}\n',
+	),
+	(
+		'resource "aws_lb" "lb{n}" {{\n  name               = "lb{n}"\n  load_balancer_type = "application"\n  subnets            = ["subnet-a", "subnet-b"]\n}}\n',
+		'resource "aws_lb" "lb{n}" {{\n  name               = "lb{n}"\n  load_balancer_type = "application"\n  subnets            = ["subnet-a", "subnet-b"]\n  access_logs {{\n    bucket  = "logs"\n    enabled = true\n  }}\n}}\n',
+	),
+	(
+		'resource "aws_cloudtrail" "ct{n}" {{\n  name           = "ct{n}"\n  s3_bucket_name = "ct{n}"\n}}\n',
+		'resource "aws_cloudtrail" "ct{n}" {{\n  name                       = "ct{n}"\n  s3_bucket_name             = "ct{n}"\n  cloud_watch_logs_group_arn = "arn:aws:logs:us-east-1:123456789012:log-group:ct{n}"\n  cloud_watch_logs_role_arn  = "arn:aws:iam::123456789012:role/ct{n}"\n}}\n',
+	),
+]
+
+# (insecure, secure) Kubernetes document templates
+K8S_TEMPLATES: List[Tuple[str, str]] = [
+	(
+		"apiVersion: v1\nkind: Pod\nmetadata:\n  name: pod-{n}\nspec:\n  containers:\n    - name: app\n      image: nginx\n      securityContext:\n        privileged: true\n",
+		"apiVersion: v1\nkind: Pod\nmetadata:\n  name: pod-{n}\nspec:\n  containers:\n    - name: app\n      image: nginx\n      securityContext:\n        runAsNonRoot: true\n        readOnlyRootFilesystem: true\n      resources:\n        limits: {{cpu: 500m, memory: 256Mi}}\n",
+	),
+	(
+		"apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: dep-{n}\nspec:\n  template:\n    spec:\n      containers:\n        - name: app\n          image: busybox\n      volumes:\n        - name: hp\n          hostPath:\n            path: /var/lib\n",
+		"apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: dep-{n}\nspec:\n  template:\n    spec:\n      securityContext:\n        runAsNonRoot: true\n      containers:\n        - name: app\n          image: busybox\n          securityContext:\n            readOnlyRootFilesystem: true\n          resources:\n            limits: {{cpu: 250m, memory: 128Mi}}\n",
+	),
+]
+
+# Helm-style manifest for --k8s-yaml: workloads interleaved with large ConfigMaps
+MANIFEST_DEPLOYMENT = "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: app-{i}\n  labels: {{app: app-{i}, tier: backend}}\nspec:\n  replicas: 2\n  selector:\n    matchLabels: {{app: app-{i}}}\n  template:\n    metadata:\n      labels: {{app: app-{i}}}\n    spec:\n      containers:\n        - name: app\n          image: registry.example.com/app:{i}\n          ports: [{{containerPort: 8080}}]\n          resources:\n            limits: {{cpu: 500m, memory: 256Mi}}\n          securityContext:\n            runAsNonRoot: true\n            readOnlyRootFilesystem: true\n"
+MANIFEST_CONFIGMAP = "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: config-{i}\ndata:\n{data}\n"
+
+NETWORK_POLICY = "apiVersion: networking.k8s.io/v1\nkind: NetworkPolicy\nmetadata:\n  name: deny-all\nspec:\n  podSelector: {}\n  policyTypes: [Ingress, Egress]\n"
+
+def generate_corpus(
+	dest: Path,
+	tf_files: int = 100,
+	k8s_files: int = 100,
+	density: float = 0.3,
+	resources_per_file: int = 5,
+	docs_per_file: int = 3,
+	seed: int = 0,
+) -> Dict[str, int]:
+	"""
+	Write a synthetic corpus under dest/terraform and dest/k8s. Each
+	resource/document is insecure with probability `density`. Returns counts
+	of what was written.
+	"""
+	rng = random.Random(seed)
+	counts = {"tf_files": 0, "k8s_files": 0, "tf_resources": 0, "k8s_documents": 0, "insecure": 0}
+	n = 0
+	tf_dir = dest / "terraform"
+	k8s_dir = dest / "k8s"
+	for i in range(tf_files):
+		blocks = []
+		for _ in range(resources_per_file):
+			insecure = rng.random() < density
+			blocks.append(rng.choice(TF_TEMPLATES)[0 if insecure else 1].format(n=n))
+			counts["insecure"] += insecure
+			n += 1
+		path = tf_dir / f"mod{i // 100:03d}" / f"main{i:05d}.tf"
+		path.parent.mkdir(parents=True, exist_ok=True)
+		path.write_text("\n".join(blocks), encoding="utf-8")
+		counts["tf_files"] += 1
+		counts["tf_resources"] += len(blocks)
+	for i in range(k8s_files):
+		docs = []
+		for _ in range(docs_per_file):
+			insecure = rng.random() < density
+			docs.append(rng.choice(K8S_TEMPLATES)[0 if insecure else 1].format(n=n))
+			counts["insecure"] += insecure
+			n += 1
+		path = k8s_dir / f"app{i // 100:03d}" / f"manifest{i:05d}.yaml"
+		path.parent.mkdir(parents=True, exist_ok=True)
+		path.write_text("---\n".join(docs), encoding="utf-8")
+		counts["k8s_files"] += 1
+		counts["k8s_documents"] += len(docs)
+	if k8s_files:
+		(k8s_dir / "networkpolicy.yaml").write_text(NETWORK_POLICY, encoding="utf-8")
+		counts["k8s_files"] += 1
+		counts["k8s_documents"] += 1
+	return counts
+
+def build_k8s_manifest(docs: int = 2000, configmap_kb: int = 8) -> str:
+	"""A multi-document manifest alternating Deployments and ~`configmap_kb` KiB ConfigMaps."""
+	line = "  key{n}: " + "x" * 100
+	data = "\n".join(line.format(n=n) for n in range(configmap_kb * 1024 // 110 + 1))
+	parts = [
+		MANIFEST_DEPLOYMENT.format(i=i) if i % 2 == 0 else MANIFEST_CONFIGMAP.format(i=i, data=data)
+		for i in range(docs)
+	]
+	return "---\n".join(parts)
+
+def bench_k8s_yaml(docs: int = 2000, configmap_kb: int = 8, repeat: int = 3) -> Dict[str, Any]:
+	"""Best-of-`repeat` Kubernetes YAML parse throughput per loader variant."""
+	text = build_k8s_manifest(docs, configmap_kb)
+	mb = len(text.encode("utf-8")) / (1024 * 1024)
+	kinds = k8s_kinds_for(_evaluator()[1])
+	variants: List[Tuple[str, Any, Any]] = [("SafeLoader", yaml.SafeLoader, None)]
+	if hasattr(yaml, "CSafeLoader"):
+		variants.append(("CSafeLoader", yaml.CSafeLoader, None))
+		if kinds is not None:
+			variants.append(("CSafeLoader+kinds", yaml.CSafeLoader, kinds))
+	results: Dict[str, Any] = {}
+	default_loader = parser_k8s.SafeLoader
+	try:
+		for label, loader, variant_kinds in variants:
+			parser_k8s.SafeLoader = loader
+			best = float("inf")
+			for _ in range(max(1, repeat)):
+				seconds, records = _timed(lambda: parser_k8s.parse_k8s_source(text, "bench.yaml", variant_kinds))
+				best = min(best, seconds)
+			if len(records) != docs:
+				raise RuntimeError(f"{label}: parsed {len(records)} of {docs} documents")
+			results[label] = {"seconds": round(best, 4), "mb_per_s": round(mb / best, 2)}
+	finally:
+		parser_k8s.SafeLoader = default_loader
+	return {
+		"format": BENCH_FORMAT,
+		"revision": _git_revision(),
+		"python": platform.python_version(),
+		"manifest_mb": round(mb, 2),
+		"documents": docs,
+		"kinds": sorted(kinds) if kinds is not None else None,
+		"variants": results,
+	}
+
+def _timed(fn: Callable[[], Any]) -> Tuple[float, Any]:
+	t0 = time.perf_counter()
+	result = fn()
+	return time.perf_counter() - t0, result
+
+def _evaluator() -> Tuple[str, Callable]:
+	try:
+		from backend.services.scanner import evaluate
+		return "backend", evaluate
+	except ImportError:
+		return "base", base_evaluate
+
+def _backend_stages() -> Optional[Tuple[Callable, Callable]]:
+	try:
+		from backend.services.sarif import generate_sarif
+		from backend.models.report import ScanReport
+		from .utils import summarize
+	except ImportError:
+		return None
+
+	def serialize(findings: List[Dict[str, Any]]) -> bytes:
+		# What the API does: wrap the findings in a report and encode it once
+		report = ScanReport(summary=summarize(findings), findings=findings, metadata={})
+		return dumps(report.to_dict())
+
+	return generate_sarif, serialize
+
+def run_once(corpus: Path, jobs: int = 1) -> Dict[str, Any]:
+	"""Time each pipeline stage once over `corpus`; returns seconds per stage and counts."""
+	ruleset, evaluate = _evaluator()
+	stages: Dict[str, Optional[float]] = {}
+
+	stages["discover"], files = _timed(lambda: discover_files(corpus))
+	stages["parse"], parsed = _timed(lambda: list(iter_parsed_files(files, jobs)))
+
+	def run_rules() -> List[Dict[str, Any]]:
+		findings: List[Dict[str, Any]] = []
+		kinds: Dict[str, int] = {}
+		for _, tf, k8s in parsed:
+			findings.extend(evaluate(tf, k8s))
+			count_kinds(k8s, kinds)
+		findings.extend(run_k8s_global_rules(kinds))
+		return findings
+	stages["rules"], findings = _timed(run_rules)
+
+	backend = _backend_stages()
+	if backend is None:
+		stages["sarif"] = stages["serialize"] = None
+	else:
+		generate_sarif, serialize = backend
+		stages["sarif"], _ = _timed(lambda: generate_sarif(findings))
+		stages["serialize"], _ = _timed(lambda: serialize(findings))
+
+	return {
+		"ruleset": ruleset,
+		"stages": stages,
+		"files": len(files),
+		"terraform_resources": sum(len(tf) for _, tf, _ in parsed),
+		"k8s_documents": sum(len(k8s) for _, _, k8s in parsed),
+		"findings": len(findings),
+	}
+
+def _git_revision() -> Optional[str]:
+	try:
+		out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, cwd=Path(__file__).parent)
+	except (OSError, subprocess.SubprocessError):
+		return None
+	return out.stdout.strip() or None
+
+def benchmark(corpus: Path, repeat: int = 3, jobs: int = 1) -> Dict[str, Any]:
+	"""Run the pipeline `repeat` times; per stage reports min and median seconds."""
+	runs = [run_once(corpus, jobs) for _ in range(max(1, repeat))]
+	stages: Dict[str, Optional[Dict[str, float]]] = {}
+	for name in runs[0]["stages"]:
+		samples = [r["stages"][name] for r in runs if r["stages"][name] is not None]
+		stages[name] = {"min": round(min(samples), 6), "median": round(statistics.median(samples), 6)} if samples else None
+	last = runs[-1]
+	parse = stages["parse"]
+	return {
+		"format": BENCH_FORMAT,
+		"revision": _git_revision(),
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"jobs": jobs,
+		"repeat": len(runs),
+		"ruleset": last["ruleset"],
+		"files": last["files"],
+		"terraform_resources": last["terraform_resources"],
+		"k8s_documents": last["k8s_documents"],
+		"findings": last["findings"],
+		"parse_files_per_second": round(last["files"] / parse["median"], 1) if parse and parse["median"] else None,
+		"stages": stages,
+	}
+
+def main(argv: Optional[List[str]] = None) -> None:
+	ap = argparse.ArgumentParser(prog="python -m iac_audit.bench", description="Benchmark the IaC scan pipeline.")
+	ap.add_argument("--corpus", help="Benchmark an existing directory instead of generating one.")
+	ap.add_argument("--keep", help="Generate the corpus into this directory and keep it.")
+	ap.add_argument("--tf-files", type=int, default=200)
+	ap.add_argument("--k8s-files", type=int, default=200)
+	ap.add_argument("--resources-per-file", type=int, default=5)
+	ap.add_argument("--docs-per-file", type=int, default=3)
+	ap.add_argument("--density", type=float, default=0.3, help="Fraction of insecure resources/documents (0-1).")
+	ap.add_argument("--seed", type=int, default=0)
+	ap.add_argument("--jobs", "-j", type=int, default=1, help="Parallel parser processes (0 = one per CPU).")
+	ap.add_argument("--repeat", type=int, default=3)
+	ap.add_argument("--out", help="Write the JSON result to this file instead of stdout.")
+	ap.add_argument("--k8s-yaml", action="store_true", help="Measure Kubernetes YAML parser throughput instead.")
+	ap.add_argument("--docs", type=int, default=2000, help="Documents in the --k8s-yaml manifest.")
+	ap.add_argument("--configmap-kb", type=int, default=8, help="Size of each ConfigMap in the --k8s-yaml manifest.")
+	args = ap.parse_args(argv)
+
+	def run(corpus: Path, generated: Optional[Dict[str, int]]) -> Dict[str, Any]:
+		result = benchmark(corpus, args.repeat, args.jobs)
+		if generated is not None:
+			result["corpus"] = dict(generated, density=args.density, seed=args.seed)
+		return result
+
+	if args.k8s_yaml:
+		result = bench_k8s_yaml(args.docs, args.configmap_kb, args.repeat)
+	elif args.corpus:
+		result = run(Path(args.corpus), None)
+	elif args.keep:
+		dest = Path(args.keep)
+		result = run(dest, generate_corpus(dest, args.tf_files, args.k8s_files, args.density, args.resources_per_file, args.docs_per_file, args.seed))
+	else:
+		with tempfile.TemporaryDirectory(prefix="iac_bench_") as tmp:
+			dest = Path(tmp)
+			result = run(dest, generate_corpus(dest, args.tf_files, args.k8s_files, args.density, args.resources_per_file, args.docs_per_file, args.seed))
+
+	text = json.dumps(result, indent=2)
+	if args.out:
+		Path(args.out).write_text(text + "\n", encoding="utf-8")
+		print(f"Benchmark written to {args.out}", file=sys.stderr)
+	else:
+		print(text)
+
+if __name__ == "__main__":
+	main()
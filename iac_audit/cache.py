@@ -0,0 +1,209 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import base64
+import datetime
+import hashlib
+import json
+import logging
+import os
+import zlib
+
+import hcl2
+import yaml
+
+from .k8s_workload import WorkloadView, build_workload
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the normalized record shape produced by the parsers changes.
+PARSER_VERSION = 6
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_SUFFIX = ".bin"
+
+def default_cache_dir() -> Path:
+	base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+	return Path(base) / "iac-audit"
+
+def _version_tag() -> bytes:
+	return f"p{PARSER_VERSION}|json|hcl2={getattr(hcl2, '__version__', '?')}|yaml={yaml.__version__}|".encode()
+
+# Values JSON has no type for are stored as a one-key object {"\0<tag>": ...};
+# dicts with non-string (or "\0"-prefixed) keys are stored as pairs.
+_TAG = "\0"
+
+def _plain(value: Any) -> Any:
+	if value is None or isinstance(value, (str, bool, int, float)):
+		return value
+	if isinstance(value, dict):
+		if all(isinstance(k, str) and not k.startswith(_TAG) for k in value):
+			return {k: _plain(v) for k, v in value.items()}
+		return {_TAG + "d": [[_plain(k), _plain(v)] for k, v in value.items()]}
+	if isinstance(value, list):
+		return [_plain(v) for v in value]
+	if isinstance(value, tuple):
+		return {_TAG + "t": [_plain(v) for v in value]}
+	if isinstance(value, WorkloadView):
+		# Derived from the body; rebuilt on load
+		return None
+	if isinstance(value, datetime.datetime):
+		return {_TAG + "dt": value.isoformat()}
+	if isinstance(value, datetime.date):
+		return {_TAG + "date": value.isoformat()}
+	if isinstance(value, (set, frozenset)):
+		return {_TAG + "s": [_plain(v) for v in value]}
+	if isinstance(value, bytes):
+		return {_TAG + "b": base64.b64encode(value).decode("ascii")}
+	raise TypeError(f"cannot cache a value of type {type(value).__name__}")
+
+def _hashable(value: Any) -> Any:
+	return tuple(value) if isinstance(value, list) else value
+
+def _tagged(obj: Dict[str, Any]) -> Any:
+	if len(obj) != 1:
+		return obj
+	tag, value = next(iter(obj.items()))
+	if not tag.startswith(_TAG):
+		return obj
+	tag = tag[1:]
+	if tag == "d":
+		return {_hashable(k): v for k, v in value}
+	if tag == "t":
+		return tuple(value)
+	if tag == "dt":
+		return datetime.datetime.fromisoformat(value)
+	if tag == "date":
+		return datetime.date.fromisoformat(value)
+	if tag == "s":
+		return {_hashable(v) for v in value}
+	if tag == "b":
+		return base64.b64decode(value)
+	raise ValueError(f"unknown cache tag {tag!r}")
+
+def encode_entry(value: Any) -> bytes:
+	"""Compressed JSON of plain data: loading an entry never runs code."""
+	text = json.dumps(_plain(value), separators=(",", ":"), ensure_ascii=False)
+	return zlib.compress(text.encode("utf-8"), 1)
+
+def decode_entry(raw: bytes) -> Any:
+	value = json.loads(zlib.decompress(raw), object_hook=_tagged)
+	if isinstance(value, list):
+		for r in value:
+			if isinstance(r, dict) and "workload" in r:
+				r["workload"] = build_workload(r.get("kind"), r.get("body") or {})
+	return value
+
+class ParseCache:
+	"""
+	On-disk cache of parsed records keyed by file content hash.
+
+	Entries are zlib-compressed JSON stored as <dir>/<kk>/<key>.bin. They
+	hold data only (see encode_entry), so a shared or restored cache directory
+	cannot run code when an entry is loaded. The
+	file mtime doubles as the LRU clock: hits touch the entry, and once the
+	total size exceeds max_bytes the least recently used entries are evicted.
+	"""
+
+	def __init__(self, cache_dir: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES):
+		self.dir = Path(cache_dir)
+		self.max_bytes = max_bytes
+		self._tag = _version_tag()
+		self._total: Optional[int] = None
+		self.hits = 0
+		self.misses = 0
+
+	def key(self, parser: str, data: bytes) -> str:
+		h = hashlib.sha256(self._tag)
+		h.update(parser.encode())
+		h.update(b"\0")
+		h.update(data)
+		return h.hexdigest()
+
+	def _entry(self, key: str) -> Path:
+		return self.dir / key[:2] / (key + ENTRY_SUFFIX)
+
+	def __contains__(self, key: str) -> bool:
+		return self._entry(key).is_file()
+
+	def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+		entry = self._entry(key)
+		try:
+			raw = entry.read_bytes()
+			records = decode_entry(raw)
+		except FileNotFoundError:
+			self.misses += 1
+			return None
+		except Exception:
+			logger.warning("Dropping unreadable cache entry %s", entry)
+			self._remove(entry)
+			self.misses += 1
+			return None
+		try:
+			os.utime(entry)
+		except OSError:
+			pass
+		self.hits += 1
+		return records
+
+	def put(self, key: str, records: List[Dict[str, Any]]) -> None:
+		entry = self._entry(key)
+		try:
+			payload = encode_entry(records)
+		except (TypeError, ValueError, RecursionError) as e:
+			logger.warning("Not caching %s: %s", key, e)
+			return
+		try:
+			entry.parent.mkdir(parents=True, exist_ok=True)
+			tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+			tmp.write_bytes(payload)
+			os.replace(tmp, entry)
+		except OSError as e:
+			logger.warning("Could not write cache entry %s: %s", entry, e)
+			return
+		self._grow(len(payload))
+
+	def _remove(self, entry: Path) -> None:
+		try:
+			size = entry.stat().st_size
+			entry.unlink()
+		except OSError:
+			return
+		if self._total is not None:
+			self._total -= size
+
+	def _entries(self):
+		if not self.dir.is_dir():
+			return []
+		return list(self.dir.glob("*/*" + ENTRY_SUFFIX))
+
+	def _grow(self, nbytes: int) -> None:
+		if self._total is None:
+			self._total = sum(p.stat().st_size for p in self._entries())
+		else:
+			self._total += nbytes
+		if self._total > self.max_bytes:
+			self.evict()
+
+	def evict(self, target_bytes: Optional[int] = None) -> int:
+		"""Remove least recently used entries until the cache fits; returns entries removed."""
+		target = int(self.max_bytes * 0.9) if target_bytes is None else target_bytes
+		stats = []
+		for p in self._entries():
+			try:
+				st = p.stat()
+			except OSError:
+				continue
+			stats.append((st.st_mtime, st.st_size, p))
+		total = sum(s[1] for s in stats)
+		removed = 0
+		for _, size, p in sorted(stats, key=lambda s: s[0]):
+			if total <= target:
+				break
+			try:
+				p.unlink()
+			except OSError:
+				continue
+			total -= size
+			removed += 1
+		self._total = total
+		logger.info("Parse cache eviction removed %d entries (now %d bytes)", removed, total)
+		return removed
@@ -3,30 +3,20 @@ import argparse
 import os
 import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-from .utils import discover_files
-from .parser_tf import parse_terraform_file
-from .parser_k8s import parse_k8s_file
-from .rules_tf import run_tf_rules
-from .rules_k8s import run_k8s_rules
+from .cache import ParseCache, default_cache_dir
+from .pipeline import evaluate, iter_findings
+from .profiling import Profiler, format_profile
+from .incremental import scan_incremental, DEFAULT_STATE_FILE
 from .report import to_json, to_markdown
+from .batch import scan_batch, read_manifest, SUMMARY_FILE
 
-def scan_path(target: str) -> List[Dict[str, Any]]:
-    files = discover_files(target)
-    tf_resources: List[Dict[str, Any]] = []
-    k8s_docs: List[Dict[str, Any]] = []
+# Identifies the rule set whose results an incremental state file holds
+RULESET = "iac_audit.cli/1"
 
-    for f in files:
-        if f.suffix == ".tf":
-            tf_resources.extend(parse_terraform_file(f))
-        elif f.suffix in {".yaml", ".yml"}:
-            k8s_docs.extend(parse_k8s_file(f))
-
-    findings: List[Dict[str, Any]] = []
-    findings.extend(run_tf_rules(tf_resources))
-    findings.extend(run_k8s_rules(k8s_docs))
-    return findings
+def scan_path(target: str, jobs: int = 1, cache: Optional[ParseCache] = None, profiler: Optional[Profiler] = None) -> List[Dict[str, Any]]:
+    return list(iter_findings(target, evaluate, jobs=jobs, cache=cache, profiler=profiler))
 
 def main():
     parser = argparse.ArgumentParser(description="IaC Security Auditing Tool")
@@ -36,16 +26,70 @@ def main():
     scan_parser.add_argument("path", type=str, help="Path to IaC templates.")
     scan_parser.add_argument("--output", choices=["json", "md"], default="json", help="Output format (json or md). Default: json.")
     scan_parser.add_argument("--out-file", help="Write report to a file instead of stdout")
+    scan_parser.add_argument("--jobs", "-j", type=int, default=1, help="Parallel parser processes (0 = one per CPU). Default: 1.")
+    scan_parser.add_argument("--cache-dir", help=f"Parse cache directory. Default: {default_cache_dir()}")
+    scan_parser.add_argument("--no-cache", action="store_true", help="Disable the parse cache.")
+    scan_parser.add_argument("--incremental", action="store_true", help="Only re-scan files changed since the previous run.")
+    scan_parser.add_argument("--state", default=DEFAULT_STATE_FILE, help=f"State file used by --incremental. Default: {DEFAULT_STATE_FILE}")
+    scan_parser.add_argument("--profile", action="store_true", help="Print per-stage, per-rule and slowest-file timings to stderr.")
+
+    batch_parser = subparsers.add_parser("scan-batch", help="Scan several repositories in one run.")
+    batch_parser.add_argument("roots", nargs="*", help="Repository roots to scan.")
+    batch_parser.add_argument("--manifest", help="File listing roots to scan, one per line (# comments allowed).")
+    batch_parser.add_argument("--out-dir", required=True, help=f"Directory for per-repository reports and {SUMMARY_FILE}.")
+    batch_parser.add_argument("--output", choices=["json", "md"], default="json", help="Per-repository report format (json or md). Default: json.")
+    batch_parser.add_argument("--workers", "-w", type=int, default=1, help="Repositories scanned in parallel, one process each (0 = one per CPU). Default: 1.")
+    batch_parser.add_argument("--cache-dir", help=f"Parse cache directory. Default: {default_cache_dir()}")
+    batch_parser.add_argument("--no-cache", action="store_true", help="Disable the parse cache.")
 
     args = parser.parse_args()
 
+    if args.command == "scan-batch":
+        roots = list(args.roots)
+        if args.manifest:
+            roots.extend(read_manifest(args.manifest))
+        if not roots:
+            parser.error("scan-batch needs at least one root or --manifest")
+
+        def progress(entry):
+            if "error" in entry:
+                print(f"[ERROR] {entry['root']}: {entry['error']}", file=sys.stderr)
+            else:
+                print(f"[INFO] {entry['root']}: {entry['count']} findings in {entry['files']} files -> {entry['report']}", file=sys.stderr)
+
+        cache_dir = None if args.no_cache else str(args.cache_dir or default_cache_dir())
+        summary = scan_batch(roots, args.out_dir, args.output, workers=args.workers, cache_dir=cache_dir, progress=progress)
+        totals = summary["totals"]
+        print(
+            f"Scanned {totals['repos'] - totals['failed']}/{totals['repos']} repositories, "
+            f"{totals['count']} findings. Summary written to {Path(args.out_dir) / SUMMARY_FILE}"
+        )
+        if totals["failed"]:
+            sys.exit(1)
+        return
+
+
     if args.command == "scan":
+        if args.incremental and args.profile:
+            parser.error("--profile cannot be combined with --incremental")
         path = args.path
         if not os.path.exists(path):
             print(f"[ERROR] Path {path} does not exist.", file=sys.stderr)
             sys.exit(1)
 
-        findings = scan_path(path)
+        cache = None if args.no_cache else ParseCache(args.cache_dir or default_cache_dir())
+        if args.incremental:
+            findings, stats = scan_incremental(path, Path(args.state), evaluate, RULESET, jobs=args.jobs, cache=cache)
+            print(
+                f"[INFO] Incremental scan: {stats['changed_files']} changed, "
+                f"{stats['reused_files']} reused, {stats['removed_files']} removed",
+                file=sys.stderr,
+            )
+        else:
+            profiler = Profiler() if args.profile else None
+            findings = scan_path(path, jobs=args.jobs, cache=cache, profiler=profiler)
+            if profiler:
+                print(format_profile(profiler.to_dict()), file=sys.stderr)
         report = to_json(findings) if args.output == "json" else to_markdown(findings)
 
         if args.out_file:
@@ -0,0 +1,525 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+import re
+import time
+
+import yaml
+
+from .registry import RuleRegistry
+from .profiling import Profiler
+from .positions import line_of
+from .findings import Finding
+
+# Declarative rules: data instead of code. A rule names the records it applies
+# to, optionally the elements to iterate (`for_each`), the conditions that make
+# an element a finding (`when`) and the finding's text:
+#
+#   - id: K8S.PRIVILEGED
+#     severity: HIGH
+#     applies_to: ["@workloads"]
+#     for_each: [pod.containers.*, pod.initContainers.*]
+#     when:
+#       - path: [securityContext.privileged, /pod.securityContext.privileged]
+#         op: eq
+#         value: true
+#     title: 'Container "{name}" runs privileged.'
+#     recommendation: Avoid privileged containers.
+#     at: securityContext.privileged
+#
+# Paths are dotted keys into the record body; `*` iterates a list and a
+# leading root alias (e.g. `pod`) expands per record type to a body path.
+# Condition paths are relative to the element unless they start with `/`; a
+# list of paths is a fallback chain (the first one present is used), which is
+# how container settings override pod-level ones.
+# Everything is compiled once at load time into accessor closures (plain key
+# chains become direct lookups), and rules are arranged per record type so
+# shared prefixes are walked once per record: each root alias is resolved
+# once, rules iterating the same elements (the containers of a workload, say)
+# share one pass over them, and `/` lookups and wildcard expansions are
+# memoized for the record.
+
+Match = Tuple[Any, str]
+Accessor = Callable[[Dict[Any, Any], Any, str], List[Match]]
+Getter = Callable[[Dict[Any, Any], Any, str], List[Any]]
+
+SEVERITIES = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+_MISSING = object()
+
+# The `{name}` placeholder of a title (with its quotes and a leading colon),
+# dropped from the generic title a rule is described by
+_GENERIC_NAME = re.compile(r':?\s*"?\{name\}"?')
+
+def _join(path: str, key: Any) -> str:
+	return f"{path}.{key}" if path else str(key)
+
+def _chain(keys: Sequence[str]) -> Callable[[Any], Any]:
+	"""value -> value[k1][k2]... or _MISSING, for a wildcard-free key chain."""
+	if not keys:
+		return lambda v: v
+	if len(keys) == 1:
+		key = keys[0]
+		return lambda v: v.get(key, _MISSING) if isinstance(v, dict) else _MISSING
+	if len(keys) == 2:
+		k1, k2 = keys
+
+		def get2(v: Any) -> Any:
+			if isinstance(v, dict):
+				v = v.get(k1, _MISSING)
+				if isinstance(v, dict):
+					return v.get(k2, _MISSING)
+			return _MISSING
+		return get2
+
+	def get(v: Any) -> Any:
+		for key in keys:
+			if not isinstance(v, dict):
+				return _MISSING
+			v = v.get(key, _MISSING)
+		return v
+	return get
+
+def compile_path(path: str) -> Accessor:
+	"""
+	Compile a dotted path into walk(memo, value, at) -> [(value, concrete path)],
+	`at` being the concrete path of `value`. `memo` is shared by every accessor
+	evaluated on one record and holds its wildcard expansions.
+	"""
+	segments = [s for s in path.split(".") if s]
+	if "*" not in segments:
+		get = _chain(segments)
+		suffix = ".".join(segments)
+		if not suffix:
+			return lambda memo, value, at: [(value, at)]
+
+		def walk(memo: Dict[Any, Any], value: Any, at: str) -> List[Match]:
+			v = get(value)
+			return [] if v is _MISSING else [(v, f"{at}.{suffix}" if at else suffix)]
+		return walk
+
+	star = len(segments) - 1 - segments[::-1].index("*")
+	parent = _accessor(".".join(segments[:star]))
+	tail = segments[star + 1:]
+	get = _chain(tail)
+	suffix = "." + ".".join(tail) if tail else ""
+	key = path
+
+	def walk_star(memo: Dict[Any, Any], value: Any, at: str) -> List[Match]:
+		found = memo.get((key, at))
+		if found is None:
+			found = []
+			for items, p in parent(memo, value, at):
+				if not isinstance(items, list):
+					continue
+				base = f"{p}." if p else ""
+				for i, item in enumerate(items):
+					v = get(item)
+					if v is not _MISSING:
+						found.append((v, f"{base}{i}{suffix}"))
+			memo[(key, at)] = found
+		return found
+	return walk_star
+
+def compile_getter(path: str) -> Getter:
+	"""Like compile_path, but yielding only the values (no concrete paths)."""
+	segments = [s for s in path.split(".") if s]
+	if "*" in segments:
+		walk = _accessor(path)
+		return lambda memo, value, at: [v for v, _ in walk(memo, value, at)]
+	get = _chain(segments)
+
+	def values(memo: Dict[Any, Any], value: Any, at: str) -> List[Any]:
+		v = get(value)
+		return [] if v is _MISSING else [v]
+	return values
+
+def _same(value: Any, arg: Any) -> bool:
+	# YAML `true` must not match 1 (and vice versa)
+	if isinstance(arg, bool) or isinstance(value, bool):
+		return value is arg
+	return value == arg
+
+def _eq(vals: List[Any], arg: Any) -> bool:
+	for v in vals:
+		if _same(v, arg):
+			return True
+	return False
+
+def _in(vals: List[Any], arg: Any) -> bool:
+	for v in vals:
+		if not isinstance(v, (dict, list)) and v in arg:
+			return True
+	return False
+
+def _contains(vals: List[Any], arg: Any) -> bool:
+	for v in vals:
+		if isinstance(v, (list, str, dict)) and arg in v:
+			return True
+	return False
+
+# op -> predicate over the values a condition path reached
+OPS: Dict[str, Callable[[List[Any], Any], bool]] = {
+	"exists": lambda vals, arg: bool(vals),
+	"missing": lambda vals, arg: not vals,
+	"truthy": lambda vals, arg: any(vals),
+	"falsy": lambda vals, arg: not any(vals),
+	"eq": _eq,
+	"ne": lambda vals, arg: not _eq(vals, arg),
+	"in": _in,
+	"not_in": lambda vals, arg: not _in(vals, arg),
+	"contains": _contains,
+}
+
+# The same predicates over the single value of a wildcard-free path
+# (_MISSING when absent), which avoids wrapping every lookup in a list
+VALUE_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+	"exists": lambda v, arg: v is not _MISSING,
+	"missing": lambda v, arg: v is _MISSING,
+	"truthy": lambda v, arg: v is not _MISSING and bool(v),
+	"falsy": lambda v, arg: v is _MISSING or not v,
+	"eq": lambda v, arg: v is not _MISSING and _same(v, arg),
+	"ne": lambda v, arg: v is _MISSING or not _same(v, arg),
+	"in": lambda v, arg: v is not _MISSING and _in([v], arg),
+	"not_in": lambda v, arg: v is _MISSING or not _in([v], arg),
+	"contains": lambda v, arg: v is not _MISSING and _contains([v], arg),
+}
+
+class Condition:
+	"""`path` (or fallback chain of paths) compared with `op` against `value`."""
+	__slots__ = ("paths", "op", "value", "_test", "_value_test")
+
+	def __init__(self, path: Union[str, Sequence[str]], op: str = "exists", value: Any = None):
+		if op not in OPS:
+			raise ValueError(f"unknown op {op!r} (use one of {', '.join(OPS)})")
+		self.paths = (path,) if isinstance(path, str) else tuple(path)
+		if not self.paths:
+			raise ValueError("condition has no path")
+		self.op = op
+		self.value = value
+		self._test = OPS[op]
+		self._value_test = VALUE_OPS[op]
+
+class RuleSpec:
+	"""One declarative rule; see the module comment for the fields."""
+	__slots__ = ("id", "severity", "title", "recommendation", "applies_to", "for_each", "when", "match", "at")
+
+	def __init__(
+		self,
+		id: str,
+		severity: str,
+		title: str,
+		recommendation: str = "",
+		applies_to: Sequence[str] = (),
+		for_each: Union[str, Sequence[str], None] = None,
+		when: Sequence[Union[Condition, Mapping[str, Any]]] = (),
+		match: str = "all",
+		at: str = "",
+	):
+		if severity not in SEVERITIES:
+			raise ValueError(f"rule {id}: severity must be one of {', '.join(SEVERITIES)}")
+		if match not in ("all", "any"):
+			raise ValueError(f"rule {id}: match must be 'all' or 'any'")
+		self.id = id
+		self.severity = severity
+		self.title = title
+		self.recommendation = recommendation
+		self.applies_to = tuple(applies_to)
+		self.for_each = (for_each,) if isinstance(for_each, str) else tuple(for_each or ())
+		try:
+			self.when = tuple(c if isinstance(c, Condition) else Condition(**c) for c in when)
+		except (TypeError, ValueError) as e:
+			raise ValueError(f"rule {id}: {e}") from None
+		self.match = match
+		self.at = at
+
+	@classmethod
+	def from_dict(cls, data: Mapping[str, Any]) -> "RuleSpec":
+		if not isinstance(data, Mapping):
+			raise ValueError(f"rule must be a mapping, got {type(data).__name__}")
+		try:
+			return cls(**data)
+		except TypeError as e:
+			raise ValueError(f"rule {data.get('id', '?')}: {e}") from None
+
+Test = Callable[[Dict[Any, Any], Dict[str, Any], Dict[str, Any], str], bool]
+
+class _Compiled:
+	"""A RuleSpec specialised for one record type: rooted paths, fused conditions."""
+	__slots__ = ("spec", "field", "paths", "bases", "matches")
+
+	def __init__(self, spec: RuleSpec, field: str, roots: Mapping[str, str]):
+		self.spec = spec
+		self.field = field
+		self.paths = [_expand(p, roots) for p in spec.for_each] or [("", "")]
+		# Roots the conditions read from (`/`-prefixed paths)
+		self.bases = [_expand(p[1:], roots)[0] for c in spec.when for p in c.paths if p.startswith("/")]
+		self.matches = _combine([_condition(c, roots) for c in spec.when], spec.match == "all")
+
+	def finding(self, record: Dict[str, Any], element: Dict[str, Any], at: str) -> Finding:
+		spec = self.spec
+		return Finding(
+			spec.id,
+			spec.severity,
+			spec.title.replace("{name}", str(element.get("name", "<unnamed>"))),
+			record.get("file", "<unknown>"),
+			record.get("address") or f'{record.get(self.field)}.{record.get("name")}',
+			spec.recommendation,
+			line_of(record, _join(at, spec.at) if spec.at else at),
+		)
+
+class _Plan:
+	"""
+	The rules of one record type, arranged so shared work happens once per
+	record: each root (the body, or an alias such as the pod spec) is resolved
+	once, each distinct `for_each` path is walked once, and every rule
+	iterating it is tested against the element in turn.
+	"""
+	__slots__ = ("rules", "bases", "groups")
+
+	def __init__(self) -> None:
+		self.rules: List[_Compiled] = []
+		self.bases: Dict[str, Callable[[Any], Any]] = {}
+		self.groups: List[Tuple[str, Accessor, List[Tuple[int, _Compiled]]]] = []
+
+	def add(self, rule: _Compiled) -> None:
+		index = len(self.rules)
+		self.rules.append(rule)
+		for root in [root for root, _ in rule.paths] + rule.bases:
+			if root not in self.bases:
+				self.bases[root] = _chain([s for s in root.split(".") if s])
+		by_path = {(root, id(acc)): members for root, acc, members in self.groups}
+		for root, rel in dict.fromkeys(rule.paths):
+			acc = _accessor(rel)
+			members = by_path.get((root, id(acc)))
+			if members is None:
+				members = by_path[(root, id(acc))] = []
+				self.groups.append((root, acc, members))
+			members.append((index, rule))
+
+_accessors: Dict[str, Accessor] = {}
+_getters: Dict[str, Getter] = {}
+
+def _accessor(path: str) -> Accessor:
+	# Identical paths across rules share one compiled closure (and memo entries)
+	acc = _accessors.get(path)
+	if acc is None:
+		acc = _accessors[path] = compile_path(path)
+	return acc
+
+def _getter(path: str) -> Getter:
+	get = _getters.get(path)
+	if get is None:
+		get = _getters[path] = compile_getter(path)
+	return get
+
+def _expand(path: str, roots: Mapping[str, str]) -> Tuple[str, str]:
+	"""Split a rule path into (root body path, path relative to it)."""
+	head, _, rest = path.partition(".")
+	if head in roots:
+		return roots[head], rest
+	return "", path
+
+def _rooted_getter(root: str, path: str) -> Callable[[Dict[Any, Any], Dict[str, Any]], List[Any]]:
+	# Record-level values are looked up once per record, not once per element
+	get = _getter(path)
+	key = ("/", root, path)
+
+	def values(memo: Dict[Any, Any], bases: Dict[str, Any]) -> List[Any]:
+		vals = memo.get(key)
+		if vals is None:
+			vals = memo[key] = get(memo, bases.get(root, _MISSING), root)
+		return vals
+	return values
+
+def _combine(conditions: List[Test], need_all: bool) -> Test:
+	if len(conditions) == 1:
+		return conditions[0]
+	if not conditions:
+		return lambda memo, bases, element, at: need_all
+	if need_all:
+		return lambda memo, bases, element, at: all(c(memo, bases, element, at) for c in conditions)
+	return lambda memo, bases, element, at: any(c(memo, bases, element, at) for c in conditions)
+
+_PLAIN, _WILDCARD, _ROOTED = range(3)
+
+def _condition(cond: Condition, roots: Mapping[str, str]) -> Test:
+	"""Fuse a condition's getters and predicate into test(memo, bases, element, at)."""
+	test, arg = cond._test, cond.value
+	chain: List[Tuple[int, Callable[..., Any]]] = []
+	for p in cond.paths:
+		if p.startswith("/"):
+			chain.append((_ROOTED, _rooted_getter(*_expand(p[1:], roots))))
+		elif "*" in p.split("."):
+			chain.append((_WILDCARD, _getter(p)))
+		else:
+			chain.append((_PLAIN, _chain([s for s in p.split(".") if s])))
+	if len(chain) == 1:
+		kind, get = chain[0]
+		if kind == _PLAIN:
+			value_test = cond._value_test
+			return lambda memo, bases, element, at: value_test(get(element), arg)
+		if kind == _ROOTED:
+			return lambda memo, bases, element, at: test(get(memo, bases), arg)
+		return lambda memo, bases, element, at: test(get(memo, element, at), arg)
+
+	def fallback(memo: Dict[Any, Any], bases: Dict[str, Any], element: Dict[str, Any], at: str) -> bool:
+		for kind, get in chain:
+			if kind == _PLAIN:
+				v = get(element)
+				if v is not _MISSING:
+					return test([v], arg)
+				continue
+			vals = get(memo, bases) if kind == _ROOTED else get(memo, element, at)
+			if vals:
+				return test(vals, arg)
+		return test([], arg)
+	return fallback
+
+class RuleSet:
+	"""
+	Declarative rules for records dispatched on `field` ("type" or "kind").
+	`groups` expands `@name` entries of applies_to; `roots` maps a path alias
+	to its body path per record type (e.g. {"pod": {"Deployment":
+	"spec.template.spec", ...}}). Rules are compiled per type on load.
+	"""
+
+	def __init__(
+		self,
+		field: str,
+		specs: Iterable[RuleSpec] = (),
+		groups: Optional[Mapping[str, Iterable[str]]] = None,
+		roots: Optional[Mapping[str, Mapping[str, str]]] = None,
+	):
+		self.field = field
+		self.groups = {k: tuple(v) for k, v in (groups or {}).items()}
+		self.roots = roots or {}
+		self.specs: List[RuleSpec] = []
+		self._plans: Dict[str, _Plan] = {}
+		for spec in specs:
+			self.add(spec)
+
+	def add(self, spec: RuleSpec) -> None:
+		types: List[str] = []
+		for t in spec.applies_to:
+			if t.startswith("@"):
+				if t[1:] not in self.groups:
+					raise ValueError(f"rule {spec.id}: unknown group {t}")
+				types.extend(self.groups[t[1:]])
+			else:
+				types.append(t)
+		if not types:
+			raise ValueError(f"rule {spec.id}: applies_to is empty")
+		self.specs.append(spec)
+		for t in dict.fromkeys(types):
+			roots = {alias: per_type[t] for alias, per_type in self.roots.items() if t in per_type}
+			plan = self._plans.get(t)
+			if plan is None:
+				plan = self._plans[t] = _Plan()
+			plan.add(_Compiled(spec, self.field, roots))
+
+	@property
+	def types(self) -> Tuple[str, ...]:
+		return tuple(self._plans)
+
+	def check(self, record: Dict[str, Any]) -> List[Finding]:
+		"""
+		Evaluate every rule for the record's type, sharing one path memo.
+		Findings are ordered by rule, then by element.
+		"""
+		try:
+			plan = self._plans.get(record.get(self.field))
+		except TypeError:
+			return []
+		if plan is None:
+			return []
+		memo: Dict[Any, Any] = {}
+		body = record.get("body") or {}
+		bases = {root: get(body) for root, get in plan.bases.items()}
+		hits: List[Optional[List[Finding]]] = [None] * len(plan.rules)
+		for root, elements, rules in plan.groups:
+			for element, at in elements(memo, bases[root], root):
+				if not isinstance(element, dict):
+					continue
+				for index, rule in rules:
+					if rule.matches(memo, bases, element, at):
+						found = hits[index]
+						if found is None:
+							found = hits[index] = []
+						found.append(rule.finding(record, element, at))
+		findings: List[Finding] = []
+		for found in hits:
+			if found:
+				findings.extend(found)
+		return findings
+
+	def check_profiled(self, record: Dict[str, Any], prof: Profiler, name: str) -> List[Finding]:
+		"""
+		check() reporting each rule id's tests to `prof` separately; the shared
+		work (resolving roots, walking element paths) is reported as `name`.
+		"""
+		t0 = time.perf_counter()
+		try:
+			plan = self._plans.get(record.get(self.field))
+		except TypeError:
+			plan = None
+		if plan is None:
+			prof.add_rule(name, time.perf_counter() - t0, [])
+			return []
+		memo: Dict[Any, Any] = {}
+		body = record.get("body") or {}
+		bases = {root: get(body) for root, get in plan.bases.items()}
+		hits: List[List[Finding]] = [[] for _ in plan.rules]
+		spent = [0.0] * len(plan.rules)
+		for root, elements, rules in plan.groups:
+			for element, at in elements(memo, bases[root], root):
+				if not isinstance(element, dict):
+					continue
+				for index, rule in rules:
+					t = time.perf_counter()
+					if rule.matches(memo, bases, element, at):
+						hits[index].append(rule.finding(record, element, at))
+					spent[index] += time.perf_counter() - t
+		findings: List[Finding] = []
+		for rule, found, seconds in zip(plan.rules, hits, spent):
+			prof.add_rule(rule.spec.id, seconds, found)
+			findings.extend(found)
+		prof.add_rule(name, time.perf_counter() - t0 - sum(spent), [])
+		return findings
+
+	def register(self, registry: RuleRegistry, name: str = "declarative_rules") -> None:
+		"""Add check() to a RuleRegistry for every type the rules apply to."""
+		if not self.specs:
+			# Registered with no types, it would run on (and need) every record
+			return
+		check = self.check
+		check_profiled = self.check_profiled
+
+		def declarative_rules(record: Dict[str, Any]) -> List[Dict[str, Any]]:
+			return check(record)
+
+		def profiled(record: Dict[str, Any], prof: Profiler) -> List[Dict[str, Any]]:
+			return check_profiled(record, prof, name)
+		declarative_rules.__name__ = name
+		# Picked up by RuleRegistry when profiling, so each rule id is timed
+		declarative_rules.profiled = profiled
+		registry.add(declarative_rules, self.types)
+		for spec in self.specs:
+			registry.describe(spec.id, _GENERIC_NAME.sub("", spec.title), spec.recommendation)
+
+def load_rules(path: Union[str, Path], target: Optional[str] = None) -> List[RuleSpec]:
+	"""
+	Read RuleSpecs from a YAML file holding a list of rules or a mapping
+	{target: terraform|kubernetes, rules: [...]}. With `target` given, files
+	declaring a different target yield nothing.
+	"""
+	with open(path, "r", encoding="utf-8") as f:
+		data = yaml.safe_load(f) or []
+	if isinstance(data, dict):
+		if target is not None and data.get("target", target) != target:
+			return []
+		data = data.get("rules") or []
+	if not isinstance(data, list):
+		raise ValueError(f"{path}: expected a list of rules")
+	try:
+		return [RuleSpec.from_dict(d) for d in data]
+	except ValueError as e:
+		raise ValueError(f"{path}: {e}") from None
@@ -0,0 +1,187 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Collection, Iterable, Iterator, List, Optional, Tuple
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Directories that never hold IaC worth scanning but can be huge (VCS data,
+# provider/module caches, dependency trees). Pruned before descending.
+DEFAULT_PRUNE_DIRS = frozenset({
+	".git", ".hg", ".svn",
+	".terraform", ".terragrunt-cache",
+	"node_modules", "__pycache__",
+	".venv", "venv", ".tox",
+})
+
+# Ignore files read from every directory of the walk, in this order
+IGNORE_FILES = (".gitignore", ".iacauditignore")
+
+def _translate(pattern: str) -> str:
+	"""gitignore glob -> regex over a '/'-separated relative path."""
+	out = []
+	i, n = 0, len(pattern)
+	while i < n:
+		c = pattern[i]
+		if pattern.startswith("**/", i):
+			out.append("(?:.*/)?")
+			i += 3
+			continue
+		if pattern.startswith("**", i):
+			out.append(".*")
+			i += 2
+			continue
+		if c == "*":
+			out.append("[^/]*")
+		elif c == "?":
+			out.append("[^/]")
+		elif c == "[":
+			j = pattern.find("]", i + 2)
+			if j < 0:
+				out.append(re.escape(c))
+			else:
+				body = pattern[i + 1:j]
+				if body.startswith("!"):
+					body = "^" + body[1:]
+				out.append("[" + body.replace("\\", "\\\\") + "]")
+				i = j
+		elif c == "\\" and i + 1 < n:
+			i += 1
+			out.append(re.escape(pattern[i]))
+		else:
+			out.append(re.escape(c))
+		i += 1
+	return "".join(out)
+
+class IgnoreRules:
+	"""
+	Ordered gitignore-style rules collected while walking. Each rule is
+	relative to the directory of the file that declared it; the last matching
+	rule wins and `!pattern` re-includes. Supported: `*`, `?`, `[...]`, `**`,
+	leading `/` (anchored), trailing `/` (directories only) and comments.
+	"""
+	__slots__ = ("rules",)
+
+	def __init__(self, rules: Iterable[Tuple[str, "re.Pattern[str]", bool, bool]] = ()):
+		self.rules = tuple(rules)
+
+	def extend(self, base: str, lines: Iterable[str]) -> "IgnoreRules":
+		"""Return new rules with `lines` appended, relative to `base` ('' = walk root)."""
+		added = []
+		for line in lines:
+			line = line.rstrip("\n\r")
+			if not line.strip() or line.startswith("#"):
+				continue
+			line = line.rstrip() if not line.endswith("\\ ") else line
+			negate = line.startswith("!")
+			if negate:
+				line = line[1:]
+			dir_only = line.endswith("/")
+			line = line.rstrip("/")
+			if not line:
+				continue
+			if "/" in line:
+				regex = _translate(line.lstrip("/"))
+			else:
+				regex = "(?:.*/)?" + _translate(line)
+			added.append((base, re.compile(regex + r"\Z"), negate, dir_only))
+		if not added:
+			return self
+		return IgnoreRules(self.rules + tuple(added))
+
+	def ignored(self, rel: str, is_dir: bool) -> bool:
+		result = False
+		for base, regex, negate, dir_only in self.rules:
+			if dir_only and not is_dir:
+				continue
+			if base:
+				if not rel.startswith(base + "/"):
+					continue
+				sub = rel[len(base) + 1:]
+			else:
+				sub = rel
+			if regex.match(sub):
+				result = not negate
+		return result
+
+	def __bool__(self) -> bool:
+		return bool(self.rules)
+
+def _read_ignore_files(dirpath: str, base: str, rules: IgnoreRules) -> IgnoreRules:
+	for name in IGNORE_FILES:
+		try:
+			with open(os.path.join(dirpath, name), "r", encoding="utf-8", errors="replace") as fh:
+				rules = rules.extend(base, fh)
+		except OSError:
+			continue
+	return rules
+
+def _scan_dir(dirpath: str, base: str, rules: IgnoreRules, exts: Collection[str], prune: Collection[str], use_ignore: bool) -> Tuple[List[str], List[Tuple[str, str]], IgnoreRules]:
+	"""List one directory: matching files, subdirectories to descend into, rules in effect."""
+	if use_ignore:
+		rules = _read_ignore_files(dirpath, base, rules)
+	files: List[str] = []
+	subdirs: List[Tuple[str, str]] = []
+	try:
+		with os.scandir(dirpath) as it:
+			entries = sorted(it, key=lambda e: e.name)
+	except OSError as e:
+		logger.warning("discover: cannot list %s: %s", dirpath, e)
+		return files, subdirs, rules
+	for entry in entries:
+		rel = base + "/" + entry.name if base else entry.name
+		try:
+			# follow_symlinks=False: never loop through symlinked directories
+			is_dir = entry.is_dir(follow_symlinks=False)
+			if is_dir:
+				if entry.name in prune or (rules and rules.ignored(rel, True)):
+					continue
+				subdirs.append((entry.path, rel))
+			elif os.path.splitext(entry.name)[1].lower() in exts and entry.is_file():
+				if rules and rules.ignored(rel, False):
+					continue
+				files.append(entry.path)
+		except OSError:
+			continue
+	return files, subdirs, rules
+
+def _walk(dirpath: str, base: str, rules: IgnoreRules, exts: Collection[str], prune: Collection[str], use_ignore: bool) -> Iterator[Path]:
+	stack = [(dirpath, base, rules)]
+	while stack:
+		path, rel, inherited = stack.pop()
+		files, subdirs, effective = _scan_dir(path, rel, inherited, exts, prune, use_ignore)
+		for f in files:
+			yield Path(f)
+		# Reverse so subdirectories are visited in name order
+		stack.extend((p, r, effective) for p, r in reversed(subdirs))
+
+def walk_files(
+	root: os.PathLike,
+	exts: Collection[str],
+	prune: Optional[Collection[str]] = None,
+	use_ignore_files: bool = True,
+	jobs: int = 1,
+) -> Iterator[Path]:
+	"""
+	Lazily yield files under `root` whose lowercase suffix is in `exts`.
+	Directories named in `prune` (DEFAULT_PRUNE_DIRS by default) and paths
+	matched by .gitignore/.iacauditignore files found during the walk are
+	skipped without being descended into. With jobs > 1 the top-level
+	subtrees are walked on a thread pool; output order is unchanged.
+	"""
+	prune = DEFAULT_PRUNE_DIRS if prune is None else prune
+	root = os.fspath(root)
+	files, subdirs, rules = _scan_dir(root, "", IgnoreRules(), exts, prune, use_ignore_files)
+	for f in files:
+		yield Path(f)
+	if jobs <= 1 or len(subdirs) < 2:
+		for path, rel in subdirs:
+			yield from _walk(path, rel, rules, exts, prune, use_ignore_files)
+		return
+	# os.scandir releases the GIL, so threads overlap the directory I/O.
+	with ThreadPoolExecutor(max_workers=min(jobs, len(subdirs)), thread_name_prefix="iac-walk") as pool:
+		walked = pool.map(lambda sd: list(_walk(sd[0], sd[1], rules, exts, prune, use_ignore_files)), subdirs)
+		for batch in walked:
+			yield from batch
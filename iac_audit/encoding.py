@@ -0,0 +1,23 @@
+from typing import Any
+import json
+
+try:
+	import orjson
+except ImportError:  # optional speedup; the stdlib encoder is used without it
+	orjson = None
+
+def _default(obj: Any) -> Any:
+	# Finding and similar compact records
+	to_dict = getattr(obj, "to_dict", None)
+	if to_dict is not None:
+		return to_dict()
+	raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+	"""Encode to UTF-8 JSON in one pass, with orjson when it is installed."""
+	if orjson is not None:
+		option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+		return orjson.dumps(obj, default=_default, option=option)
+	if indent:
+		return json.dumps(obj, default=_default, indent=2, ensure_ascii=False).encode("utf-8")
+	return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
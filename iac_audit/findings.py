@@ -0,0 +1,73 @@
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+FIELDS: Tuple[str, ...] = ("id", "severity", "title", "file", "resource", "recommendation", "line")
+
+class Finding:
+	"""
+	Compact finding record produced by the rules. Attribute access is the
+	fast path; item access (`f["id"]`, `f.get("line")`) keeps code written
+	against plain finding dicts working. Converted to a dict only when
+	serialized (see iac_audit.encoding).
+	"""
+	__slots__ = FIELDS
+
+	def __init__(self, id: str, severity: str, title: str, file: str, resource: str, recommendation: str, line: Optional[int] = None):
+		self.id = id
+		self.severity = severity
+		self.title = title
+		self.file = file
+		self.resource = resource
+		self.recommendation = recommendation
+		self.line = line
+
+	@classmethod
+	def from_dict(cls, d: Mapping[str, Any]) -> "Finding":
+		return cls(*(d.get(k) for k in FIELDS))
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+			"id": self.id,
+			"severity": self.severity,
+			"title": self.title,
+			"file": self.file,
+			"resource": self.resource,
+			"recommendation": self.recommendation,
+			"line": self.line,
+		}
+
+	def __getitem__(self, key: str) -> Any:
+		if key not in FIELDS:
+			raise KeyError(key)
+		return getattr(self, key)
+
+	def __setitem__(self, key: str, value: Any) -> None:
+		if key not in FIELDS:
+			raise KeyError(key)
+		setattr(self, key, value)
+
+	def get(self, key: str, default: Any = None) -> Any:
+		return getattr(self, key) if key in FIELDS else default
+
+	def __contains__(self, key: object) -> bool:
+		return key in FIELDS
+
+	def keys(self) -> Tuple[str, ...]:
+		return FIELDS
+
+	def __iter__(self) -> Iterator[str]:
+		return iter(FIELDS)
+
+	def __len__(self) -> int:
+		return len(FIELDS)
+
+	def __eq__(self, other: object) -> bool:
+		if isinstance(other, Finding):
+			return all(getattr(self, k) == getattr(other, k) for k in FIELDS)
+		if isinstance(other, Mapping):
+			return self.to_dict() == dict(other)
+		return NotImplemented
+
+	__hash__ = None  # type: ignore[assignment]
+
+	def __repr__(self) -> str:
+		return f"Finding({self.id!r}, {self.severity!r}, {self.resource!r}, file={self.file!r}, line={self.line!r})"
@@ -0,0 +1,127 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+
+from .utils import discover_files
+from .parsing import iter_parsed_files, k8s_kinds_for
+from .cache import ParseCache, PARSER_VERSION
+from .rules_k8s import count_kinds, run_k8s_global_rules
+from .pipeline import Findings, FileEvaluator, GlobalEvaluator
+from .encoding import dumps
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+DEFAULT_STATE_FILE = ".iac-audit-state"
+
+class ScanState:
+	"""
+	Per-file fingerprints and results of a previous scan:
+	{ path: { mtime_ns, size, sha256, findings, kinds } }
+	`kinds` holds the per-kind document counts the cross-file rules need.
+	"""
+
+	def __init__(self, target: str, ruleset: str, files: Optional[Dict[str, Dict[str, Any]]] = None):
+		self.target = target
+		self.ruleset = ruleset
+		self.files: Dict[str, Dict[str, Any]] = files or {}
+
+	@classmethod
+	def load(cls, path: Path, target: str, ruleset: str) -> "ScanState":
+		"""Load state, starting fresh if it is missing, corrupt or was made for another target/ruleset."""
+		try:
+			data = json.loads(Path(path).read_text(encoding="utf-8"))
+		except (OSError, ValueError):
+			return cls(target, ruleset)
+		if (data.get("version") != STATE_VERSION or data.get("parser") != PARSER_VERSION
+				or data.get("target") != target or data.get("ruleset") != ruleset):
+			logger.info("Ignoring incompatible scan state in %s", path)
+			return cls(target, ruleset)
+		return cls(target, ruleset, data.get("files") or {})
+
+	def save(self, path: Path) -> None:
+		data = {
+			"version": STATE_VERSION,
+			"parser": PARSER_VERSION,
+			"target": self.target,
+			"ruleset": self.ruleset,
+			"files": self.files,
+		}
+		tmp = Path(f"{path}.tmp")
+		tmp.write_bytes(dumps(data))
+		os.replace(tmp, path)
+
+def _fingerprint(path: Path, prev: Optional[Dict[str, Any]]) -> Tuple[bool, Dict[str, Any]]:
+	"""
+	Return (unchanged, fingerprint). A matching mtime/size pair is trusted
+	without reading the file; otherwise the content hash decides.
+	"""
+	st = path.stat()
+	fp = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+	if prev and prev.get("mtime_ns") == fp["mtime_ns"] and prev.get("size") == fp["size"]:
+		fp["sha256"] = prev.get("sha256")
+		return True, fp
+	fp["sha256"] = hashlib.sha256(path.read_bytes()).hexdigest()
+	return bool(prev) and prev.get("sha256") == fp["sha256"], fp
+
+def scan_incremental(
+	target: str,
+	state_path: Path,
+	evaluate: FileEvaluator,
+	ruleset: str,
+	global_rules: GlobalEvaluator = run_k8s_global_rules,
+	jobs: Optional[int] = 1,
+	cache: Optional[ParseCache] = None,
+) -> Tuple[Findings, Dict[str, int]]:
+	"""
+	Scan `target`, re-parsing and re-evaluating only files whose fingerprint
+	changed since the run recorded in `state_path`. Findings of unchanged files
+	are reused; cross-file rules are recomputed from the merged per-file kind
+	counts. Returns (findings, stats) and rewrites the state file.
+	"""
+	state = ScanState.load(state_path, str(Path(target).resolve()), ruleset)
+	files = discover_files(target)
+
+	entries: Dict[str, Dict[str, Any]] = {}
+	changed: List[Path] = []
+	for f in files:
+		key = str(f)
+		prev = state.files.get(key)
+		try:
+			unchanged, fp = _fingerprint(f, prev)
+		except OSError:
+			continue
+		if unchanged:
+			fp["findings"] = prev["findings"]
+			fp["kinds"] = prev["kinds"]
+		else:
+			changed.append(f)
+		entries[key] = fp
+
+	for f, tf, k8s in iter_parsed_files(changed, jobs, cache, k8s_kinds_for(evaluate)):
+		entry = entries[str(f)]
+		entry["findings"] = evaluate(tf, k8s)
+		entry["kinds"] = count_kinds(k8s)
+
+	stats = {
+		"total_files": len(entries),
+		"changed_files": len(changed),
+		"reused_files": len(entries) - len(changed),
+		"removed_files": len(set(state.files) - set(entries)),
+	}
+	logger.info("Incremental scan | %s", stats)
+
+	findings: Findings = []
+	kind_counts: Dict[str, int] = {}
+	for entry in entries.values():
+		findings.extend(entry["findings"])
+		for kind, n in entry["kinds"].items():
+			kind_counts[kind] = kind_counts.get(kind, 0) + n
+	findings.extend(global_rules(kind_counts))
+
+	state.files = entries
+	state.save(state_path)
+	return findings, stats
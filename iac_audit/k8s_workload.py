@@ -0,0 +1,79 @@
+from typing import Any, Dict, List, Optional
+
+WORKLOAD_KINDS = {"Pod","Deployment","StatefulSet","DaemonSet","Job","CronJob"}
+TEMPLATE_KINDS = {"Deployment","StatefulSet","DaemonSet","Job"}
+
+# Dotted path of the pod spec inside the document, for line lookups
+POD_SPEC_PATHS = {"Pod": "spec", "CronJob": "spec.jobTemplate.spec.template.spec"}
+POD_SPEC_PATHS.update((k, "spec.template.spec") for k in TEMPLATE_KINDS)
+
+class ContainerView:
+	"""A container (or init container) with its effective securityContext."""
+	__slots__ = ("name", "spec", "security_context", "path")
+
+	def __init__(self, spec: Dict[str, Any], pod_sc: Dict[str, Any], path: str = ""):
+		self.spec = spec
+		self.path = path
+		self.name = spec.get("name", "<unnamed>")
+		# Container-level settings override the pod-level securityContext
+		self.security_context = {**pod_sc, **(spec.get("securityContext") or {})}
+
+	def get(self, key: str, default: Any = None) -> Any:
+		return self.spec.get(key, default)
+
+	def __eq__(self, other: object) -> bool:
+		return isinstance(other, ContainerView) and self.spec == other.spec and self.security_context == other.security_context
+
+	def __repr__(self) -> str:
+		return f"ContainerView({self.name!r})"
+
+class WorkloadView:
+	"""
+	Normalized view of a workload document: the (unwrapped) pod spec, its
+	containers and volumes. Built once per document at parse time so rules
+	never re-walk or mutate the parsed YAML.
+	"""
+	__slots__ = ("pod_spec", "containers", "volumes", "volume_paths", "path")
+
+	def __init__(self, pod_spec: Dict[str, Any], path: str = "spec"):
+		self.pod_spec = pod_spec
+		self.path = path
+		pod_sc = pod_spec.get("securityContext") or {}
+		self.containers: List[ContainerView] = [
+			ContainerView(c, pod_sc, f"{path}.{field}.{i}")
+			for field in ("containers", "initContainers")
+			for i, c in enumerate(pod_spec.get(field) or [])
+			if isinstance(c, dict)
+		]
+		self.volumes: List[Dict[str, Any]] = []
+		self.volume_paths: List[str] = []
+		for i, v in enumerate(pod_spec.get("volumes") or []):
+			if isinstance(v, dict):
+				self.volumes.append(v)
+				self.volume_paths.append(f"{path}.volumes.{i}")
+
+	def __eq__(self, other: object) -> bool:
+		# Everything else is derived from the pod spec
+		return isinstance(other, WorkloadView) and self.pod_spec == other.pod_spec
+
+	def __repr__(self) -> str:
+		return f"WorkloadView(containers={[c.name for c in self.containers]!r})"
+
+def pod_spec_of(kind: Optional[str], body: Dict[str, Any]) -> Dict[str, Any]:
+	spec = body.get("spec") or {}
+	if kind in TEMPLATE_KINDS:
+		spec = ((spec.get("template") or {}).get("spec") or {})
+	elif kind == "CronJob":
+		spec = (((spec.get("jobTemplate") or {}).get("spec") or {}).get("template") or {}).get("spec") or {}
+	return spec if isinstance(spec, dict) else {}
+
+def build_workload(kind: Optional[str], body: Dict[str, Any]) -> Optional[WorkloadView]:
+	if not isinstance(kind, str) or kind not in WORKLOAD_KINDS:
+		return None
+	return WorkloadView(pod_spec_of(kind, body), POD_SPEC_PATHS[kind])
+
+def workload_of(doc: Dict[str, Any]) -> Optional[WorkloadView]:
+	"""Return the document's precomputed workload view, building it for hand-made docs."""
+	if "workload" not in doc:
+		doc["workload"] = build_workload(doc.get("kind"), doc.get("body") or {})
+	return doc["workload"]
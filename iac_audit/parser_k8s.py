@@ -1,29 +1,88 @@
 
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, Collection, Dict, IO, List, Optional, Union
 import yaml
 
-def parse_k8s_file(path: Path) -> List[Dict[str, Any]]:
+from .k8s_workload import build_workload, POD_SPEC_PATHS
+from .positions import LineTable, yaml_line_table, yaml_span
+
+# libyaml's C loader is several times faster; fall back to pure Python without it
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def _root_scalar(node: yaml.Node, key: str, default: Any = None) -> Any:
+	"""Read a top-level scalar of a document straight from its node."""
+	if isinstance(node, yaml.MappingNode):
+		for k, v in node.value:
+			if isinstance(k, yaml.ScalarNode) and k.value == key:
+				return v.value if isinstance(v, yaml.ScalarNode) else default
+	return default
+
+def _root_name(node: yaml.Node) -> str:
+	if isinstance(node, yaml.MappingNode):
+		for k, v in node.value:
+			if isinstance(k, yaml.ScalarNode) and k.value == "metadata":
+				return _root_scalar(v, "name", "<unknown>")
+	return "<unknown>"
+
+def parse_k8s_source(source: Union[str, IO[str]], path: Union[str, Path], kinds: Optional[Collection[str]] = None) -> List[Dict[str, Any]]:
 	"""
 	Return normalized docs:
-	{ kind, name, body, file }
+	{ kind, name, body, file, workload, line, end_line, lines }
+	`workload` is a precomputed WorkloadView for workload kinds, else None.
+	`line`/`end_line` span the document and `lines` maps key paths (e.g.
+	"spec.containers.0.securityContext") to start lines, taken from the
+	composed YAML nodes; only a workload's pod spec is tracked in detail, see
+	iac_audit.positions.
+	`source` is YAML text or an open text stream; `path` is only recorded.
+	With `kinds`, documents of other kinds are not constructed: they yield a
+	stub record (empty body, no line table) so kind counts stay exact.
 	"""
 	items: List[Dict[str, Any]] = []
-	with open(path, "r", encoding="utf-8") as f:
-		try:
-			docs = yaml.safe_load_all(f)
-			for doc in docs:
-				if not isinstance(doc, dict):
+	# Same as yaml.safe_load_all, but keeping each document's node tree for marks
+	loader = SafeLoader(source)
+	try:
+		while loader.check_node():
+			node = loader.get_node()
+			if kinds is not None and isinstance(node, yaml.MappingNode):
+				kind = _root_scalar(node, "kind")
+				if kind not in kinds:
+					start, end = yaml_span(node)
+					items.append({
+						"kind": kind,
+						"name": _root_name(node),
+						"body": {},
+						"file": str(path),
+						"workload": None,
+						"line": start,
+						"end_line": end,
+						"lines": {},
+					})
 					continue
-				kind = doc.get("kind")
-				meta = doc.get("metadata", {}) or {}
-				name = meta.get("name", "<unknown>")
-				items.append({
-					"kind": kind,
-					"name": name,
-					"body": doc,
-					"file": str(path),
-				})
-		except Exception:
-			return []
+			doc = loader.construct_document(node)
+			if not isinstance(doc, dict):
+				continue
+			kind = doc.get("kind")
+			meta = doc.get("metadata", {}) or {}
+			name = meta.get("name", "<unknown>")
+			start, end = yaml_span(node)
+			lines: LineTable = {}
+			yaml_line_table(node, lines, detail=POD_SPEC_PATHS.get(kind) if isinstance(kind, str) else None)
+			items.append({
+				"kind": kind,
+				"name": name,
+				"body": doc,
+				"file": str(path),
+				"workload": build_workload(kind, doc),
+				"line": start,
+				"end_line": end,
+				"lines": lines,
+			})
+	except Exception:
+		return []
+	finally:
+		loader.dispose()
 	return items
+
+def parse_k8s_file(path: Path, kinds: Optional[Collection[str]] = None) -> List[Dict[str, Any]]:
+	with open(path, "r", encoding="utf-8") as f:
+		return parse_k8s_source(f, path, kinds)
@@ -1,20 +1,37 @@
 
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, IO, Union
 import hcl2
 
-def parse_terraform_file(path: Path) -> List[Dict[str, Any]]:
+from .positions import LineTable, strip_hcl_meta
+
+def _record(rtype: str, name: str, body: Any, path: Union[str, Path]) -> Dict[str, Any]:
+	lines: LineTable = {}
+	start, end = strip_hcl_meta(body, lines)
+	return {
+		"type": rtype,
+		"name": name,
+		"body": body,
+		"file": str(path),
+		"line": start,
+		"end_line": end,
+		"lines": lines,
+	}
+
+def parse_terraform_source(source: Union[str, IO[str]], path: Union[str, Path]) -> List[Dict[str, Any]]:
 	"""
 	Return normalized resources:
-	{ type, name, body, file }
+	{ type, name, body, file, line, end_line, lines }
+	`line`/`end_line` span the resource block and `lines` maps nested block
+	paths (e.g. "ingress.0") to start lines; see iac_audit.positions.
 	Supports hcl2 load shapes where resource block values may be a list of dicts
 	or a dict mapping name -> body.
+	`source` is HCL text or an open text stream; `path` is only recorded.
 	"""
-	with open(path, "r", encoding="utf-8") as f:
-		try:
-			data = hcl2.load(f)
-		except Exception:
-			return []
+	try:
+		data = hcl2.loads(source, with_meta=True) if isinstance(source, str) else hcl2.load(source, with_meta=True)
+	except Exception:
+		return []
 
 	results: List[Dict[str, Any]] = []
 	for block in data.get("resource", []):
@@ -24,19 +41,13 @@ def parse_terraform_file(path: Path) -> List[Dict[str, Any]]:
 				for item in rval:
 					if isinstance(item, dict):
 						for name, body in item.items():
-							results.append({
-								"type": rtype,
-								"name": name,
-								"body": body,
-								"file": str(path),
-							})
+							results.append(_record(rtype, name, body, path))
 			# Case B: dict mapping name -> body
 			elif isinstance(rval, dict):
 				for name, body in rval.items():
-					results.append({
-						"type": rtype,
-						"name": name,
-						"body": body,
-						"file": str(path),
-					})
+					results.append(_record(rtype, name, body, path))
 	return results
+
+def parse_terraform_file(path: Path) -> List[Dict[str, Any]]:
+	with open(path, "r", encoding="utf-8") as f:
+		return parse_terraform_source(f, path)
@@ -0,0 +1,233 @@
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+import io
+import json
+import logging
+import re
+
+try:
+	import ijson
+except ImportError:  # optional; without it plans are loaded whole
+	ijson = None
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+logger = logging.getLogger(__name__)
+
+# `terraform show -json` output (plan or state) names the Terraform version
+# within its first few fields; other JSON files are skipped after this sniff.
+SNIFF_BYTES = 4096
+PLAN_MARKER = b'"terraform_version"'
+
+# Plans at least this large are streamed with ijson (when installed) so memory
+# stays per-module; smaller ones are loaded whole, which is faster.
+STREAM_MIN_BYTES = 64 * 1024 * 1024
+
+# Resources live under planned_values (plans) or values (state)
+ROOTS = ("planned_values", "values")
+
+# Instance keys (`[0]`, `["a"]`) of resource and module addresses
+_INSTANCE = re.compile(r"\[[^\]]*\]")
+
+References = Dict[str, Dict[str, List[str]]]
+
+def looks_like_plan(head: bytes) -> bool:
+	return PLAN_MARKER in head
+
+def is_plan_file(path: Any) -> bool:
+	"""True when a file's first SNIFF_BYTES name a terraform_version; only those are read further."""
+	try:
+		if isinstance(path, Path):
+			with open(path, "rb") as fh:
+				return looks_like_plan(fh.read(SNIFF_BYTES))
+		return looks_like_plan(path.read_bytes()[:SNIFF_BYTES])
+	except OSError:
+		return False
+
+def config_address(address: str) -> str:
+	"""`module.app[0].aws_s3_bucket.logs["a"]` -> `module.app.aws_s3_bucket.logs`"""
+	return _INSTANCE.sub("", address)
+
+def _expression_refs(expr: Any) -> Iterator[str]:
+	if isinstance(expr, dict):
+		for key, v in expr.items():
+			if key == "references" and isinstance(v, list) and all(isinstance(r, str) for r in v):
+				yield from v
+			else:
+				yield from _expression_refs(v)
+	elif isinstance(expr, list):
+		for v in expr:
+			yield from _expression_refs(v)
+
+def plan_references(configuration: Optional[Dict[str, Any]]) -> References:
+	"""
+	{config address: {top-level attribute: [referenced config addresses]}}
+	from a plan's `configuration` section. References to resources created by
+	the same plan are unknown in planned_values, so only the configuration's
+	expressions still name them.
+	"""
+	refs: References = {}
+
+	def walk(module: Dict[str, Any], prefix: str) -> None:
+		for resource in module.get("resources") or []:
+			attrs: Dict[str, List[str]] = {}
+			for attr, expr in (resource.get("expressions") or {}).items():
+				found = [prefix + config_address(r) for r in _expression_refs(expr)]
+				if found:
+					attrs[attr] = found
+			if attrs:
+				refs[prefix + resource.get("address", "")] = attrs
+		for name, call in (module.get("module_calls") or {}).items():
+			walk(call.get("module") or {}, f"{prefix}module.{name}.")
+
+	walk((configuration or {}).get("root_module") or {}, "")
+	return refs
+
+def _record(resource: Dict[str, Any], path: Union[str, Path, PurePosixPath], refs: Optional[References] = None) -> Dict[str, Any]:
+	rtype = resource.get("type", "")
+	address = resource.get("address", "")
+	# "module.app.aws_s3_bucket.logs[0]" -> "logs[0]"; the full address is kept
+	name = address.rpartition(f"{rtype}.")[2] if rtype and address else resource.get("name", "")
+	return {
+		"type": rtype,
+		"name": name,
+		"body": resource.get("values") or {},
+		"file": str(path),
+		"line": None,
+		"end_line": None,
+		"lines": {},
+		"address": address,
+		"references": (refs or {}).get(config_address(address), {}),
+	}
+
+def _module_lists(module: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+	"""The resources of a module, then of each of its descendants, one list per module."""
+	yield module.get("resources") or []
+	for child in module.get("child_modules") or []:
+		yield from _module_lists(child)
+
+def _iter_streamed(fh: BinaryIO) -> Iterator[List[Dict[str, Any]]]:
+	"""
+	Stream modules with ijson's C-level item builder: one pass for the root
+	module's resources, one yielding child modules (walked as they arrive).
+	"""
+	for root in ROOTS:
+		fh.seek(0)
+		resources = list(ijson.items(fh, f"{root}.root_module.resources.item", use_float=True))
+		found = bool(resources)
+		if resources:
+			yield resources
+		del resources
+		fh.seek(0)
+		for module in ijson.items(fh, f"{root}.root_module.child_modules.item", use_float=True):
+			found = True
+			yield from _module_lists(module)
+		if found:
+			return
+
+def _load(fh: BinaryIO) -> Dict[str, Any]:
+	raw = fh.read()
+	return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def _iter_loaded(fh: BinaryIO, data: Optional[Dict[str, Any]] = None) -> Iterator[List[Dict[str, Any]]]:
+	data = _load(fh) if data is None else data
+	for root in ROOTS:
+		module = (data.get(root) or {}).get("root_module")
+		if module:
+			yield from _module_lists(module)
+			return
+
+def iter_plan_modules(fh: BinaryIO, stream: bool = False) -> Iterator[List[Dict[str, Any]]]:
+	"""
+	Resources of a `terraform show -json` document (plan or state), one list
+	per module, streamed if asked and possible.
+	"""
+	if stream and ijson is not None:
+		return _iter_streamed(fh)
+	return _iter_loaded(fh)
+
+def iter_plan_resources(fh: BinaryIO, stream: bool = False) -> Iterator[Dict[str, Any]]:
+	"""Resources of a `terraform show -json` document (plan or state), streamed if asked and possible."""
+	for resources in iter_plan_modules(fh, stream):
+		yield from resources
+
+def _module_records(fh: BinaryIO, path: Union[str, Path, PurePosixPath], stream: bool = False) -> Iterator[List[Dict[str, Any]]]:
+	try:
+		if stream and ijson is not None:
+			# The configuration holds no values: small enough to load whole
+			refs = plan_references(next(ijson.items(fh, "configuration", use_float=True), None))
+			fh.seek(0)
+			modules = _iter_streamed(fh)
+		else:
+			data = _load(fh)
+			refs = plan_references(data.get("configuration"))
+			modules = _iter_loaded(fh, data)
+		for resources in modules:
+			records = [_record(r, path, refs) for r in resources if r.get("mode", "managed") == "managed"]
+			if records:
+				yield records
+	except Exception as e:
+		logger.warning("Could not read Terraform plan JSON %s: %s", path, e)
+
+def _records(fh: BinaryIO, path: Union[str, Path, PurePosixPath]) -> List[Dict[str, Any]]:
+	return [r for records in _module_records(fh, path) for r in records]
+
+class PlanStream:
+	"""
+	Records of a plan too large to load at once (see STREAM_MIN_BYTES), read
+	from the file on every pass: modules() yields them one module at a time,
+	streamed with ijson when it is installed, and iterating yields records.
+	Only the path is held, so it crosses a process pool cheaply.
+	"""
+	__slots__ = ("path",)
+
+	def __init__(self, path: Union[str, Path]):
+		self.path = Path(path)
+
+	def modules(self) -> Iterator[List[Dict[str, Any]]]:
+		with open(self.path, "rb") as fh:
+			yield from _module_records(fh, self.path, stream=True)
+
+	def __iter__(self) -> Iterator[Dict[str, Any]]:
+		for records in self.modules():
+			yield from records
+
+	def __repr__(self) -> str:
+		return f"PlanStream({str(self.path)!r})"
+
+def parse_plan_source(data: bytes, path: Union[str, Path, PurePosixPath]) -> List[Dict[str, Any]]:
+	"""
+	Return normalized resources from `terraform show -json` output:
+	{ type, name, body, file, line, end_line, lines, address, references }
+	Bodies are the fully resolved values (count/for_each expanded, variables
+	and module inputs substituted); `line` is None as plans carry no source
+	positions; `references` maps top-level attributes to the config
+	addresses their expressions reference (see plan_references). Non-plan
+	JSON yields no records.
+	"""
+	if not looks_like_plan(data[:SNIFF_BYTES]):
+		return []
+	return _records(io.BytesIO(data), path)
+
+def is_large_plan(path: Path) -> bool:
+	"""True for plans parse_plan_file returns as a PlanStream."""
+	try:
+		return path.stat().st_size >= STREAM_MIN_BYTES
+	except OSError:
+		return False
+
+def parse_plan_file(path: Path) -> Union[List[Dict[str, Any]], PlanStream]:
+	"""
+	parse_plan_source for a file on disk. Plans of STREAM_MIN_BYTES or more
+	come back as a PlanStream, read module by module when iterated.
+	"""
+	with open(path, "rb") as fh:
+		if not looks_like_plan(fh.read(SNIFF_BYTES)):
+			return []
+		if is_large_plan(path):
+			return PlanStream(path)
+		fh.seek(0)
+		return _records(fh, path)
@@ -0,0 +1,236 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Any, Collection, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import logging
+import os
+
+from .parser_tf import parse_terraform_file, parse_terraform_source
+from .parser_k8s import parse_k8s_file, parse_k8s_source
+from .parser_tfplan import parse_plan_file, parse_plan_source, looks_like_plan, is_large_plan, SNIFF_BYTES
+from .cache import ParseCache
+from .sources import SourceFile
+
+logger = logging.getLogger(__name__)
+
+TF_EXTS = {".tf"}
+K8S_EXTS = {".yaml", ".yml"}
+# `terraform show -json` plans/state; other JSON files parse to nothing
+PLAN_EXTS = {".json"}
+
+# Below this many files the pool start-up cost outweighs any parallel gain.
+MIN_PARALLEL_FILES = 8
+MAX_CHUNKSIZE = 64
+
+ParsedFile = Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]
+# Kubernetes kinds the rules read; documents of other kinds are only counted
+Kinds = Optional[Collection[str]]
+
+def k8s_kinds_for(evaluate: Any) -> Kinds:
+	"""
+	Kinds a file evaluator's Kubernetes checks read, from its `k8s_kinds()`
+	attribute (see rules_k8s.rule_kinds); None (all kinds) without one.
+	"""
+	kinds = getattr(evaluate, "k8s_kinds", None)
+	return kinds() if kinds is not None else None
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+	"""
+	Normalize a requested worker count: None/1 means serial, 0 or a
+	negative value means one worker per CPU.
+	"""
+	if jobs is None:
+		return 1
+	if jobs <= 0:
+		return os.cpu_count() or 1
+	return jobs
+
+def parser_for(path: Path) -> Optional[str]:
+	"""Return the parser id ("tf", "tfplan" or "k8s") handling this file, or None."""
+	suffix = path.suffix
+	if suffix in TF_EXTS:
+		return "tf"
+	if suffix in K8S_EXTS:
+		return "k8s"
+	if suffix in PLAN_EXTS:
+		return "tfplan"
+	return None
+
+def _split(parser: Optional[str], records: List[Dict[str, Any]]) -> ParsedFile:
+	if parser in ("tf", "tfplan"):
+		return records, []
+	if parser == "k8s":
+		return [], records
+	return [], []
+
+def parse_file(path: Union[Path, SourceFile], kinds: Kinds = None) -> ParsedFile:
+	"""
+	Parse a single IaC file and return (terraform_resources, k8s_docs).
+	Exactly one of the two lists can be non-empty. With `kinds`, Kubernetes
+	documents of other kinds come back as stubs (see parse_k8s_source).
+	"""
+	if isinstance(path, SourceFile):
+		return parse_bytes(path, path.read_bytes(), kinds)
+	parser = parser_for(path)
+	if parser == "tf":
+		return parse_terraform_file(path), []
+	if parser == "k8s":
+		return [], parse_k8s_file(path, kinds)
+	if parser == "tfplan":
+		return parse_plan_file(path), []
+	return [], []
+
+def parse_bytes(path: Union[Path, PurePosixPath, SourceFile], data: bytes, kinds: Kinds = None) -> ParsedFile:
+	"""Like parse_file, for content that has already been read."""
+	parser = parser_for(path)
+	if parser is None:
+		return [], []
+	if parser == "tfplan":
+		return parse_plan_source(data, path), []
+	try:
+		text = data.decode("utf-8")
+	except UnicodeDecodeError:
+		return [], []
+	if parser == "tf":
+		return parse_terraform_source(text, path), []
+	return [], parse_k8s_source(text, path, kinds)
+
+def _parse_chunk(items: List[Union[str, Tuple[str, bytes]]], kinds: Kinds = None) -> List[ParsedFile]:
+	# Files on disk travel as paths; virtual files (zip members) as (name, content)
+	return [parse_bytes(PurePosixPath(i[0]), i[1], kinds) if isinstance(i, tuple) else parse_file(Path(i), kinds) for i in items]
+
+def _chunk_item(f: Union[Path, SourceFile]) -> Union[str, Tuple[str, bytes]]:
+	if isinstance(f, SourceFile):
+		return str(f), f.read_bytes()
+	return str(f)
+
+def _parse_many(files: List[Path], workers: int, kinds: Kinds = None) -> Iterator[ParsedFile]:
+	if workers <= 1 or len(files) < MIN_PARALLEL_FILES:
+		for f in files:
+			yield parse_file(f, kinds)
+		return
+	chunksize = max(1, min(MAX_CHUNKSIZE, len(files) // (workers * 4)))
+	logger.info("Parsing %d files with %d workers (chunksize=%d)", len(files), workers, chunksize)
+	# Keep a bounded window of chunks in flight so parsed records of the whole
+	# corpus never pile up in memory ahead of the consumer.
+	window = workers * 2
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		pending: Deque[Future] = deque()
+		for i in range(0, len(files), chunksize):
+			chunk = [_chunk_item(f) for f in files[i:i + chunksize]]
+			pending.append(pool.submit(_parse_chunk, chunk, kinds))
+			if len(pending) >= window:
+				yield from pending.popleft().result()
+		while pending:
+			yield from pending.popleft().result()
+
+def _cache_key(cache: ParseCache, f: Path, kinds: Kinds = None) -> Tuple[Optional[str], Optional[bytes]]:
+	parser = parser_for(f)
+	if parser is None:
+		return None, None
+	tag = parser
+	if parser == "k8s" and kinds is not None:
+		# Stubbed documents differ from fully parsed ones
+		tag = f"k8s:{','.join(sorted(kinds))}"
+	if parser == "tfplan" and isinstance(f, Path):
+		# Only plans are cached, and not those parsed as a PlanStream: reading
+		# them whole to hash them would defeat streaming. Other JSON is
+		# rejected by its header without being read.
+		try:
+			with open(f, "rb") as fh:
+				head = fh.read(SNIFF_BYTES)
+		except OSError:
+			return None, None
+		if not looks_like_plan(head) or is_large_plan(f):
+			return None, None
+	try:
+		data = f.read_bytes()
+	except OSError:
+		return None, None
+	return cache.key(tag, data), data
+
+def _cache_get(cache: ParseCache, f: Path, key: Optional[str]) -> Optional[ParsedFile]:
+	if key is None:
+		return None
+	records = cache.get(key)
+	if records is None:
+		return None
+	# Identical content may live at several paths; records carry the path.
+	for r in records:
+		r["file"] = str(f)
+	return _split(parser_for(f), records)
+
+def _iter_cached(files: List[Path], workers: int, cache: ParseCache, kinds: Kinds = None) -> Iterator[Tuple[Path, List[Dict[str, Any]], List[Dict[str, Any]]]]:
+	if workers <= 1 or len(files) < MIN_PARALLEL_FILES:
+		for f in files:
+			key, data = _cache_key(cache, f, kinds)
+			hit = _cache_get(cache, f, key)
+			if hit is None:
+				hit = parse_bytes(f, data, kinds) if data is not None else parse_file(f, kinds)
+				if key:
+					cache.put(key, hit[0] or hit[1])
+			yield f, hit[0], hit[1]
+		return
+
+	# Hash everything up front so only cache misses are shipped to the pool;
+	# hits are loaded lazily as they are yielded.
+	keys: List[Optional[str]] = []
+	misses: List[Path] = []
+	miss_idx = set()
+	for i, f in enumerate(files):
+		key, _ = _cache_key(cache, f, kinds)
+		keys.append(key)
+		if parser_for(f) is not None and (key is None or key not in cache):
+			misses.append(f)
+			miss_idx.add(i)
+	logger.info("Parse cache | hits=%d misses=%d", len(files) - len(misses), len(misses))
+
+	parsed = _parse_many(misses, workers, kinds)
+	for i, f in enumerate(files):
+		if i in miss_idx:
+			tf, k8s = next(parsed)
+			if keys[i]:
+				cache.put(keys[i], tf or k8s)
+		else:
+			tf, k8s = _cache_get(cache, f, keys[i]) or parse_file(f, kinds)
+		yield f, tf, k8s
+
+def iter_parsed_files(
+	files: Iterable[Path],
+	jobs: Optional[int] = 1,
+	cache: Optional[ParseCache] = None,
+	kinds: Kinds = None,
+) -> Iterator[Tuple[Path, List[Dict[str, Any]], List[Dict[str, Any]]]]:
+	"""
+	Yield (path, terraform_resources, k8s_docs) per file, in input order.
+	With jobs > 1 files are parsed in a process pool; results are still yielded
+	in input order so output is identical to serial mode. With a cache, files
+	whose content hash is already known are not parsed at all. With `kinds`,
+	Kubernetes documents of other kinds are counted but not constructed.
+	"""
+	workers = resolve_jobs(jobs)
+	if workers > 1:
+		files = list(files)
+		workers = min(workers, len(files))
+	if cache is not None:
+		yield from _iter_cached(files, workers, cache, kinds)
+		return
+	if workers <= 1:
+		# Serial mode consumes `files` lazily (e.g. straight from discovery)
+		for f in files:
+			tf, k8s = parse_file(f, kinds)
+			yield f, tf, k8s
+		return
+	for f, (tf, k8s) in zip(files, _parse_many(files, workers, kinds)):
+		yield f, tf, k8s
+
+def parse_files(files: Iterable[Path], jobs: Optional[int] = 1, cache: Optional[ParseCache] = None) -> ParsedFile:
+	"""
+	Parse all files and merge their records, preserving file order.
+	"""
+	tf_resources: List[Dict[str, Any]] = []
+	k8s_docs: List[Dict[str, Any]] = []
+	for _, tf, k8s in iter_parsed_files(files, jobs, cache):
+		tf_resources.extend(tf)
+		k8s_docs.extend(k8s)
+	return tf_resources, k8s_docs
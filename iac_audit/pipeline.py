@@ -0,0 +1,235 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import os
+import time
+
+from .utils import iter_discovered
+from .parsing import iter_parsed_files, resolve_jobs, parser_for, k8s_kinds_for, Kinds
+from .parser_tfplan import PlanStream
+from .cache import ParseCache
+from .sources import Source
+from .profiling import Profiler
+from .references import ReferenceIndex
+from .rules_tf import run_tf_rules
+from .rules_k8s import run_k8s_rules, run_k8s_global_rules, count_kinds, rule_kinds
+
+Findings = List[Dict[str, Any]]
+FileEvaluator = Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], Findings]
+GlobalEvaluator = Callable[[Dict[str, int]], Findings]
+
+class ScanStats:
+	"""
+	Aggregate state kept while streaming a scan. Its size does not depend on
+	the corpus: counters, per-kind document counts for the cross-document
+	rules and a short sample of scanned file names.
+	"""
+	__slots__ = ("files", "terraform_resources", "k8s_documents", "findings", "kind_counts", "sample_files")
+
+	SAMPLE_SIZE = 50
+
+	def __init__(self):
+		self.files = 0
+		self.terraform_resources = 0
+		self.k8s_documents = 0
+		self.findings = 0
+		self.kind_counts: Dict[str, int] = {}
+		self.sample_files: List[str] = []
+
+	def add_file(self, path: Path, tf: List[Dict[str, Any]], k8s: List[Dict[str, Any]], findings: Findings, resources: Optional[int] = None) -> None:
+		self.files += 1
+		self.terraform_resources += len(tf) if resources is None else resources
+		self.k8s_documents += len(k8s)
+		self.findings += len(findings)
+		count_kinds(k8s, self.kind_counts)
+		if len(self.sample_files) < self.SAMPLE_SIZE:
+			self.sample_files.append(str(path))
+
+def evaluate(tf_resources: List[Dict[str, Any]], k8s_docs: List[Dict[str, Any]]) -> Findings:
+	"""Per-file evaluation with the base rule set."""
+	findings: Findings = []
+	findings.extend(run_tf_rules(tf_resources))
+	findings.extend(run_k8s_rules(k8s_docs))
+	return findings
+
+# Kinds the evaluator's checks read; others are parsed as stubs
+evaluate.k8s_kinds = rule_kinds
+
+def iter_file_results(
+	target: Union[str, Path, Source, Iterable[Path]],
+	evaluate: FileEvaluator = evaluate,
+	global_rules: GlobalEvaluator = run_k8s_global_rules,
+	jobs: Optional[int] = 1,
+	cache: Optional[ParseCache] = None,
+	stats: Optional[ScanStats] = None,
+	profiler: Optional[Profiler] = None,
+) -> Iterator[Tuple[Optional[Path], Findings]]:
+	"""
+	Discover, parse and evaluate one file at a time, yielding (path, findings)
+	as each file completes. Files of one directory (a Terraform module) are
+	evaluated together, after a ReferenceIndex over their Terraform records
+	is built, so rules can resolve resources split across files. Kubernetes
+	documents of kinds no check of `evaluate` reads (see
+	parsing.k8s_kinds_for) are counted but not constructed. Once every
+	file is done a final (None, findings) item carries the scan-wide results
+	of the cross-document rules.
+	`target` is a directory/file path, a Source (e.g. a zip archive) or an
+	already discovered file list. Discovery is lazy, so in serial mode the
+	first files are parsed while the walk is still running.
+	A file list is regrouped by directory first; files of sources that are not
+	contiguous (see Source.contiguous) are held per directory until the end.
+	With a `profiler`, stage, rule and per-file timings are recorded; the
+	file list is then discovered up front so stages are timed separately,
+	except for streaming sources, whose files are still arriving.
+	"""
+	stats = ScanStats() if stats is None else stats
+	streaming = isinstance(target, Source) and target.streaming
+	contiguous = not isinstance(target, Source) or target.contiguous
+	if isinstance(target, (str, Path, Source)):
+		files = iter_discovered(target, resolve_jobs(jobs))
+	elif isinstance(target, list):
+		files = sorted(target, key=lambda f: os.path.dirname(str(f)))
+	else:
+		files, contiguous = target, False
+	kinds = k8s_kinds_for(evaluate)
+	if profiler is not None:
+		yield from _iter_profiled(files, evaluate, global_rules, jobs, cache, stats, profiler, not streaming, contiguous, kinds)
+		return
+	for batch in _by_module(iter_parsed_files(files, jobs, cache, kinds), contiguous):
+		if isinstance(batch[0][1], PlanStream):
+			f, plan, _ = batch[0]
+			resources, findings = _evaluate_plan(plan, evaluate)
+			stats.add_file(f, [], [], findings, resources)
+			yield f, findings
+			continue
+		index = ReferenceIndex(r for _, tf, _ in batch for r in tf)
+		for f, tf, k8s in batch:
+			with index.active():
+				findings = evaluate(tf, k8s)
+			stats.add_file(f, tf, k8s, findings)
+			yield f, findings
+	findings = global_rules(stats.kind_counts)
+	stats.findings += len(findings)
+	yield None, findings
+
+def _iter_profiled(
+	files: Iterable[Path],
+	evaluate: FileEvaluator,
+	global_rules: GlobalEvaluator,
+	jobs: Optional[int],
+	cache: Optional[ParseCache],
+	stats: ScanStats,
+	prof: Profiler,
+	materialize: bool = True,
+	contiguous: bool = True,
+	kinds: Kinds = None,
+) -> Iterator[Tuple[Optional[Path], Findings]]:
+	clock = time.perf_counter
+	if materialize and not isinstance(files, list):
+		t0 = clock()
+		files = list(files)
+		if not contiguous:
+			files.sort(key=lambda f: os.path.dirname(str(f)))
+			contiguous = True
+		prof.add_stage("discover", clock() - t0)
+
+	def timed_parse() -> Iterator[Tuple[Path, List[Dict[str, Any]], List[Dict[str, Any]], float]]:
+		parsed = iter_parsed_files(files, jobs, cache, kinds)
+		while True:
+			t0 = clock()
+			item = next(parsed, None)
+			if item is None:
+				return
+			# With jobs > 1 this is the wait for the pool's result
+			seconds = clock() - t0
+			prof.add_stage("parse", seconds)
+			yield item + (seconds,)
+
+	for batch in _by_module(timed_parse(), contiguous):
+		if isinstance(batch[0][1], PlanStream):
+			f, plan, _, parse_seconds = batch[0]
+			t1 = clock()
+			with prof.active():
+				resources, findings = _evaluate_plan(plan, evaluate)
+			t2 = clock()
+			# Modules are read while they are evaluated: all of it counts as rules
+			prof.add_stage("rules", t2 - t1)
+			prof.add_file(f, parse_seconds + t2 - t1)
+			stats.add_file(f, [], [], findings, resources)
+			yield f, findings
+			continue
+		with prof.stage("index"):
+			index = ReferenceIndex(r for _, tf, _, _ in batch for r in tf)
+		for f, tf, k8s, parse_seconds in batch:
+			t1 = clock()
+			with prof.active(), index.active():
+				findings = evaluate(tf, k8s)
+			t2 = clock()
+			prof.add_stage("rules", t2 - t1)
+			prof.add_file(f, parse_seconds + t2 - t1)
+			stats.add_file(f, tf, k8s, findings)
+			yield f, findings
+	with prof.stage("global_rules"), prof.active():
+		findings = global_rules(stats.kind_counts)
+	stats.findings += len(findings)
+	yield None, findings
+
+def _evaluate_plan(plan: PlanStream, evaluate: FileEvaluator) -> Tuple[int, Findings]:
+	"""
+	Evaluate a large plan one module at a time, each with its own reference
+	index, so only one module's records are held. Returns (resources, findings).
+	"""
+	resources = 0
+	findings: Findings = []
+	for records in plan.modules():
+		resources += len(records)
+		with ReferenceIndex(records).active():
+			findings.extend(evaluate(records, []))
+	return resources, findings
+
+def _module_key(path: Any) -> Optional[str]:
+	# A plan is a whole configuration of its own, never part of its directory's module
+	if parser_for(path) == "tfplan":
+		return None
+	return os.path.dirname(str(path))
+
+def _by_module(items: Iterable[tuple], contiguous: bool = True) -> Iterator[List[tuple]]:
+	"""
+	Group parsed files (path first) that share a directory; each plan file is
+	a group by itself. With `contiguous` items a group ends when the directory
+	changes, otherwise groups are held until the end and yielded in
+	first-seen order.
+	"""
+	if not contiguous:
+		groups: Dict[str, List[tuple]] = {}
+		for item in items:
+			key = _module_key(item[0])
+			if key is None:
+				yield [item]
+			else:
+				groups.setdefault(key, []).append(item)
+		yield from groups.values()
+		return
+	batch: List[tuple] = []
+	current = None
+	for item in items:
+		key = _module_key(item[0])
+		if batch and (key != current or key is None):
+			yield batch
+			batch = []
+		current = key
+		batch.append(item)
+	if batch:
+		yield batch
+
+def iter_findings(
+	target: Union[str, Path, Source, Iterable[Path]],
+	evaluate: FileEvaluator = evaluate,
+	global_rules: GlobalEvaluator = run_k8s_global_rules,
+	jobs: Optional[int] = 1,
+	cache: Optional[ParseCache] = None,
+	stats: Optional[ScanStats] = None,
+	profiler: Optional[Profiler] = None,
+) -> Iterator[Dict[str, Any]]:
+	"""Yield findings incrementally as files are processed."""
+	for _, findings in iter_file_results(target, evaluate, global_rules, jobs, cache, stats, profiler):
+		yield from findings
@@ -0,0 +1,92 @@
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+# Records carry their position as `line`/`end_line` (1-based) plus a flat
+# side table `lines` mapping dotted body paths ("ingress.0",
+# "spec.containers.1.securityContext") to start lines, so bodies stay plain.
+LineTable = Dict[str, int]
+
+HCL_START = "__start_line__"
+HCL_END = "__end_line__"
+
+# YAML line tables stay small however large a document is: collections
+# (not scalar keys) down to LINE_DEPTH levels, plus every key down to
+# DETAIL_DEPTH levels below the subtree findings point into (a workload's pod
+# spec: "containers.0.securityContext.privileged"). line_of falls back to the
+# deepest recorded prefix for anything else.
+LINE_DEPTH = 3
+DETAIL_DEPTH = 4
+
+def _join(path: str, key: Any) -> str:
+	return f"{path}.{key}" if path else str(key)
+
+def strip_hcl_meta(value: Any, table: LineTable, path: str = "") -> Tuple[Optional[int], Optional[int]]:
+	"""
+	Remove python-hcl2 `with_meta` markers from `value` in place, recording the
+	start line of every nested block in `table`. Returns the (start, end) lines
+	of `value` itself, or (None, None) when it is not a block.
+	"""
+	if isinstance(value, list):
+		for i, item in enumerate(value):
+			strip_hcl_meta(item, table, _join(path, i))
+		return None, None
+	if not isinstance(value, dict):
+		return None, None
+	start = value.pop(HCL_START, None)
+	end = value.pop(HCL_END, None)
+	if path and start is not None:
+		table[path] = start
+	for k, v in value.items():
+		if isinstance(v, (dict, list)):
+			strip_hcl_meta(v, table, _join(path, k))
+	return start, end
+
+def yaml_line_table(
+	node: yaml.Node,
+	table: LineTable,
+	path: str = "",
+	detail: Optional[str] = None,
+	depth: int = 0,
+	below: Optional[int] = None,
+) -> None:
+	"""
+	Record start lines of mapping keys and collection items under `node`:
+	collection-valued ones down to LINE_DEPTH levels, and all of them down to
+	DETAIL_DEPTH levels below the `detail` path (and the keys leading to it).
+	"""
+	if isinstance(node, yaml.MappingNode):
+		children = [(k.value, k, v) for k, v in node.value if isinstance(k, yaml.ScalarNode)]
+	elif isinstance(node, yaml.SequenceNode):
+		children = [(i, item, item) for i, item in enumerate(node.value) if not isinstance(item, yaml.ScalarNode)]
+	else:
+		return
+	for key, marked, child in children:
+		p = _join(path, key)
+		level = below + 1 if below is not None else (0 if p == detail else None)
+		if level is not None:
+			if level <= DETAIL_DEPTH:
+				table[p] = marked.start_mark.line + 1
+				yaml_line_table(child, table, p, detail, depth + 1, level)
+			continue
+		on_way = detail is not None and detail.startswith(p + ".")
+		if on_way or (depth < LINE_DEPTH and isinstance(child, (yaml.MappingNode, yaml.SequenceNode))):
+			table[p] = marked.start_mark.line + 1
+			yaml_line_table(child, table, p, detail, depth + 1)
+
+def yaml_span(node: yaml.Node) -> Tuple[int, int]:
+	"""1-based (start, end) lines of a composed YAML node."""
+	end = node.end_mark.line + (1 if node.end_mark.column else 0)
+	return node.start_mark.line + 1, max(end, node.start_mark.line + 1)
+
+def line_of(record: Dict[str, Any], path: str = "") -> Optional[int]:
+	"""
+	Best known line for `path` inside a record: the deepest recorded prefix
+	of the path, else the record's own start line.
+	"""
+	lines = record.get("lines")
+	while path and lines:
+		if path in lines:
+			return lines[path]
+		path = path.rpartition(".")[0]
+	return record.get("line")
@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import heapq
+import time
+
+_active: ContextVar[Optional["Profiler"]] = ContextVar("iac_audit_profiler", default=None)
+
+def active_profiler() -> Optional["Profiler"]:
+	"""The profiler rule registries should report to, if any."""
+	return _active.get()
+
+class Profiler:
+	"""
+	Timers and counters for one scan: seconds and call counts per pipeline
+	stage, per rule check (plus findings per rule id) and per file, keeping
+	only the slowest `top_n` files. Disabled profiling costs nothing: callers
+	pass None and registries skip the timed path.
+	"""
+	__slots__ = ("top_n", "stages", "rules", "findings_by_rule", "files", "_slowest")
+
+	def __init__(self, top_n: int = 10):
+		self.top_n = top_n
+		self.stages: Dict[str, List[float]] = {}
+		self.rules: Dict[str, List[float]] = {}
+		self.findings_by_rule: Dict[str, int] = {}
+		self.files = 0
+		self._slowest: List[Tuple[float, str]] = []
+
+	def add_stage(self, name: str, seconds: float, calls: int = 1) -> None:
+		entry = self.stages.get(name)
+		if entry is None:
+			self.stages[name] = [seconds, calls]
+		else:
+			entry[0] += seconds
+			entry[1] += calls
+
+	@contextmanager
+	def stage(self, name: str) -> Iterator[None]:
+		t0 = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.add_stage(name, time.perf_counter() - t0)
+
+	def add_rule(self, name: str, seconds: float, findings: List[Dict[str, Any]]) -> None:
+		entry = self.rules.get(name)
+		if entry is None:
+			self.rules[name] = [seconds, 1, len(findings)]
+		else:
+			entry[0] += seconds
+			entry[1] += 1
+			entry[2] += len(findings)
+		for f in findings:
+			fid = f.get("id", "?")
+			self.findings_by_rule[fid] = self.findings_by_rule.get(fid, 0) + 1
+
+	def add_file(self, path: Any, seconds: float) -> None:
+		self.files += 1
+		item = (seconds, str(path))
+		if len(self._slowest) < self.top_n:
+			heapq.heappush(self._slowest, item)
+		elif item > self._slowest[0]:
+			heapq.heapreplace(self._slowest, item)
+
+	@contextmanager
+	def active(self) -> Iterator["Profiler"]:
+		"""Make this the profiler rule registries report to (no yields inside!)."""
+		token = _active.set(self)
+		try:
+			yield self
+		finally:
+			_active.reset(token)
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+			"stages": {k: {"seconds": round(v[0], 6), "calls": v[1]} for k, v in self.stages.items()},
+			"rules": {
+				k: {"seconds": round(v[0], 6), "calls": v[1], "findings": v[2]}
+				for k, v in sorted(self.rules.items(), key=lambda kv: -kv[1][0])
+			},
+			"findings_by_rule": dict(sorted(self.findings_by_rule.items())),
+			"files": self.files,
+			"slowest_files": [{"file": p, "seconds": round(s, 6)} for s, p in sorted(self._slowest, reverse=True)],
+		}
+
+def format_profile(profile: Dict[str, Any]) -> str:
+	"""Human-readable rendering of Profiler.to_dict() for terminals."""
+	lines = ["Stages:"]
+	for name, s in profile["stages"].items():
+		lines.append(f"  {name:<16} {s['seconds']:>10.4f}s  x{s['calls']}")
+	lines.append("Rules:")
+	for name, r in profile["rules"].items():
+		lines.append(f"  {name:<32} {r['seconds']:>10.4f}s  x{r['calls']}  findings={r['findings']}")
+	lines.append(f"Slowest files (of {profile['files']}):")
+	for f in profile["slowest_files"]:
+		lines.append(f"  {f['seconds']:>10.4f}s  {f['file']}")
+	return "\n".join(lines)
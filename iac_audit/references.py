@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import re
+
+_active: ContextVar[Optional["ReferenceIndex"]] = ContextVar("iac_audit_references", default=None)
+
+# `aws_s3_bucket.logs.id`, `${aws_s3_bucket.logs[0].arn}`: a resource address
+# followed by an attribute. Other roots (var., local., data., module., ...) are
+# not resources.
+_REF = re.compile(r"(?<![\w.])([a-z][a-z0-9]*_[a-z0-9_]+)\.([A-Za-z_][\w-]*)(?:\[[^\]]*\])?\.[A-Za-z_]")
+
+# Attributes naming a resource itself, whose literal values other resources
+# use to point at it; Terraform plans carry these resolved values instead of
+# expressions. Other attributes (an SSE config's `bucket`) point elsewhere.
+ALIAS_ATTRS = ("id", "arn")
+TYPE_ALIAS_ATTRS = {"aws_s3_bucket": ("bucket",)}
+
+# Instance keys (`[0]`, `["a"]`) of plan addresses
+_INSTANCE = re.compile(r"\[[^\]]*\]")
+
+def active_index() -> Optional["ReferenceIndex"]:
+	"""The reference index Terraform rules should consult, if any."""
+	return _active.get()
+
+def address(record: Dict[str, Any]) -> str:
+	"""
+	`type.name`, or the full address plan records carry, which includes the
+	module path (`module.app.aws_s3_bucket.logs`): names repeat across modules.
+	"""
+	return record.get("address") or f'{record.get("type")}.{record.get("name")}'
+
+def _attr_strings(body: Any) -> Iterator[Tuple[str, str]]:
+	# (top-level attribute, string found anywhere under it)
+	if isinstance(body, dict):
+		for attr, v in body.items():
+			for s in _strings(v):
+				yield attr, s
+
+def _strings(value: Any) -> Iterator[str]:
+	if isinstance(value, str):
+		yield value
+	elif isinstance(value, dict):
+		for v in value.values():
+			yield from _strings(v)
+	elif isinstance(value, list):
+		for v in value:
+			yield from _strings(v)
+
+class ReferenceIndex:
+	"""
+	Address and reference tables over a set of Terraform records (one module:
+	the files of a directory, or a whole plan), built once so cross-resource
+	rules do O(1) lookups instead of scanning every other resource.
+
+	A record references a resource when any string in its body is an
+	expression naming it (`bucket = aws_s3_bucket.x.id`) or equals one of that
+	resource's own literal id/arn (or an S3 bucket's name), as resolved in plan
+	JSON. Plan records also carry the references of their configuration
+	expressions, which name resources whose ids are not known yet. The
+	top-level attributes holding the reference are kept, so rules can insist
+	on a particular one (`bucket`, not a `target_bucket` pointing elsewhere).
+	"""
+	__slots__ = ("_by_address", "_referrers", "_references")
+
+	def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+		self._by_address: Dict[str, Dict[str, Any]] = {}
+		self._referrers: Dict[str, Dict[str, List[Tuple[Dict[str, Any], Set[str]]]]] = {}
+		self._references: Dict[int, List[str]] = {}
+		records = list(records)
+		# Shared values (a bucket name that is also a config's id) alias every
+		# owner, so the result does not depend on file order
+		aliases: Dict[str, Set[str]] = {}
+		# Plan config address -> instance addresses
+		instances: Dict[str, List[str]] = {}
+		for r in records:
+			addr = address(r)
+			self._by_address[addr] = r
+			if r.get("address"):
+				instances.setdefault(_INSTANCE.sub("", addr), []).append(addr)
+			body = r.get("body") or {}
+			if not isinstance(body, dict):
+				continue
+			for attr in ALIAS_ATTRS + TYPE_ALIAS_ATTRS.get(r.get("type"), ()):
+				v = body.get(attr)
+				if isinstance(v, str) and v:
+					aliases.setdefault(v, set()).add(addr)
+		for r in records:
+			self._link(r, aliases, instances)
+
+	def _link(self, record: Dict[str, Any], aliases: Dict[str, Set[str]], instances: Dict[str, List[str]]) -> None:
+		own = address(record)
+		targets: Dict[str, Set[str]] = {}
+		# Plans: references the configuration's expressions name
+		for attr, refs in (record.get("references") or {}).items():
+			for ref in refs:
+				for target in instances.get(ref, ()):
+					targets.setdefault(target, set()).add(attr)
+		for attr, s in _attr_strings(record.get("body")):
+			for target in aliases.get(s, ()):
+				targets.setdefault(target, set()).add(attr)
+			if "." in s:
+				for m in _REF.finditer(s):
+					targets.setdefault(f"{m.group(1)}.{m.group(2)}", set()).add(attr)
+		targets.pop(own, None)
+		found = sorted(t for t in targets if t in self._by_address)
+		self._references[id(record)] = found
+		rtype = record.get("type")
+		for t in found:
+			self._referrers.setdefault(t, {}).setdefault(rtype, []).append((record, targets[t]))
+
+	def get(self, addr: str) -> Optional[Dict[str, Any]]:
+		"""The record at `addr` (see `address`), if it is in this index."""
+		return self._by_address.get(addr)
+
+	def referrers(self, record: Dict[str, Any], rtype: Optional[str] = None, attr: Optional[str] = None) -> List[Dict[str, Any]]:
+		"""
+		Records referencing `record`, optionally only those of type `rtype`
+		and only through their top-level attribute `attr`.
+		"""
+		by_type = self._referrers.get(address(record))
+		if not by_type:
+			return []
+		links = by_type.get(rtype, []) if rtype is not None else [link for ls in by_type.values() for link in ls]
+		return [r for r, attrs in links if attr is None or attr in attrs]
+
+	def references(self, record: Dict[str, Any]) -> List[str]:
+		"""Addresses of the indexed resources `record` references."""
+		return self._references.get(id(record), [])
+
+	def __len__(self) -> int:
+		return len(self._by_address)
+
+	@contextmanager
+	def active(self) -> Iterator["ReferenceIndex"]:
+		"""Make this the index rules consult (no yields inside!)."""
+		token = _active.set(self)
+		try:
+			yield self
+		finally:
+			_active.reset(token)
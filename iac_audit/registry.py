@@ -0,0 +1,93 @@
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+import time
+
+from .profiling import Profiler, active_profiler
+
+Check = Callable[[Dict[str, Any]], List[Dict[str, Any]]]
+
+class RuleRegistry:
+	"""
+	Ordered set of per-record checks, each declaring the record types it
+	applies to. Records are dispatched on `field` ("type" for Terraform
+	resources, "kind" for Kubernetes documents) through a table built once per
+	distinct value, so a record only visits the checks that can fire on it.
+	Static metadata of the rule ids the checks report (for SARIF rule
+	descriptors) is kept in `descriptions`.
+	"""
+
+	def __init__(self, field: str):
+		self.field = field
+		self._rules: List[Tuple[Check, Optional[FrozenSet[str]]]] = []
+		self._table: Dict[Any, Tuple[Check, ...]] = {}
+		self.descriptions: Dict[str, Dict[str, str]] = {}
+
+	def register(self, *applies_to: str) -> Callable[[Check], Check]:
+		"""
+		Decorator registering a check for the given types/kinds. With no
+		arguments the check runs on every record.
+		"""
+		def deco(fn: Check) -> Check:
+			self.add(fn, applies_to)
+			return fn
+		return deco
+
+	def add(self, fn: Check, applies_to=()) -> None:
+		self._rules.append((fn, frozenset(applies_to) or None))
+		self._table.clear()
+
+	def describe(self, rule_id: str, title: str, recommendation: str = "") -> None:
+		"""Record a rule id's generic title and recommendation (no per-finding details)."""
+		self.descriptions[rule_id] = {"title": title, "recommendation": recommendation}
+
+	@property
+	def checks(self) -> List[Check]:
+		return [fn for fn, _ in self._rules]
+
+	def applies_to(self) -> Optional[FrozenSet[str]]:
+		"""Every type/kind some check applies to, or None when a check applies to all."""
+		values: set = set()
+		for _, types in self._rules:
+			if types is None:
+				return None
+			values |= types
+		return frozenset(values)
+
+	def rules_for(self, value: Any) -> Tuple[Check, ...]:
+		try:
+			rules = self._table.get(value)
+		except TypeError:
+			# Unhashable value (malformed document): only catch-all checks apply
+			return tuple(fn for fn, types in self._rules if types is None)
+		if rules is None:
+			rules = tuple(fn for fn, types in self._rules if types is None or value in types)
+			self._table[value] = rules
+		return rules
+
+	def run(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+		"""Evaluate all records; findings keep record order, then registration order."""
+		field = self.field
+		rules_for = self.rules_for
+		prof = active_profiler()
+		if prof is not None:
+			return self._run_profiled(records, prof)
+		all_findings: List[Dict[str, Any]] = []
+		for r in records:
+			for check in rules_for(r.get(field)):
+				all_findings.extend(check(r))
+		return all_findings
+
+	def _run_profiled(self, records: List[Dict[str, Any]], prof: Profiler) -> List[Dict[str, Any]]:
+		field = self.field
+		all_findings: List[Dict[str, Any]] = []
+		for r in records:
+			for check in self.rules_for(r.get(field)):
+				profiled = getattr(check, "profiled", None)
+				if profiled is not None:
+					# The check reports its own (finer-grained) timings
+					all_findings.extend(profiled(r, prof))
+					continue
+				t0 = time.perf_counter()
+				found = check(r)
+				prof.add_rule(getattr(check, "__name__", repr(check)), time.perf_counter() - t0, found)
+				all_findings.extend(found)
+		return all_findings
@@ -1,7 +1,7 @@
 
 from typing import List, Dict, Any
-import json
 from .utils import summarize
+from .encoding import dumps
 
 def to_json(findings: List[Dict[str, Any]]) -> str:
 	data = {
@@ -9,7 +9,7 @@ def to_json(findings: List[Dict[str, Any]]) -> str:
 		"count": len(findings),
 		"findings": findings,
 	}
-	return json.dumps(data, indent=2)
+	return dumps(data, indent=True).decode("utf-8")
 
 def to_markdown(findings: List[Dict[str, Any]]) -> str:
 	s = summarize(findings)
@@ -29,7 +29,8 @@ def to_markdown(findings: List[Dict[str, Any]]) -> str:
 	else:
 		for f in findings:
 			lines.append(f"- **{f['severity']}** `{f['id']}` — **{f['title']}**")
-			lines.append(f"  - File: `{f['file']}`  Resource: `{f['resource']}`")
+			loc = f"{f['file']}:{f['line']}" if f.get("line") else f["file"]
+			lines.append(f"  - File: `{loc}`  Resource: `{f['resource']}`")
 			lines.append(f"  - Recommendation: {f['recommendation']}")
 			lines.append("")
 	return "\n".join(lines)
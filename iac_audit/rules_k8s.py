@@ -1,44 +1,44 @@
 
-from typing import Dict, Any, List
-
-WORKLOAD_KINDS = {"Pod","Deployment","StatefulSet","DaemonSet","Job","CronJob"}
-
-def _finding(doc: Dict[str, Any], fid: str, severity: str, title: str, recommendation: str) -> Dict[str, Any]:
-	return {
-		"id": fid,
-		"severity": severity,
-		"title": title,
-		"file": doc["file"],
-		"resource": f'{doc.get("kind")}.{doc.get("name")}',
-		"recommendation": recommendation,
-	}
-
-def _containers_from(doc: Dict[str, Any]) -> List[Dict[str, Any]]:
-	body = doc["body"]
-	kind = doc.get("kind")
-	spec = body.get("spec", {}) or {}
-	if kind in {"Deployment","StatefulSet","DaemonSet","Job"}:
-		spec = spec.get("template", {}).get("spec", {}) or {}
-	if kind == "CronJob":
-		spec = spec.get("jobTemplate", {}).get("spec", {}).get("template", {}).get("spec", {}) or {}
-	containers = list(spec.get("containers", []) or [])
-	containers += list(spec.get("initContainers", []) or [])
-	pod_sc = spec.get("securityContext", {}) or {}
-	# Attach effective pod securityContext to each container for evaluation
-	for c in containers:
-		eff = {}
-		eff.update(pod_sc)
-		eff.update(c.get("securityContext", {}) or {})
-		c["_effective_sc"] = eff
-	return containers
+from typing import Dict, Any, FrozenSet, List, Optional
+from .registry import RuleRegistry
+from .k8s_workload import WORKLOAD_KINDS, workload_of
+from .positions import line_of
+from .findings import Finding
 
+K8S_RULES = RuleRegistry("kind")
+
+def _finding(doc: Dict[str, Any], fid: str, severity: str, title: str, recommendation: str, path: str = "") -> Finding:
+	return Finding(
+		fid,
+		severity,
+		title,
+		doc["file"],
+		f'{doc.get("kind")}.{doc.get("name")}',
+		recommendation,
+		line_of(doc, path),
+	)
+
+K8S_RULES.describe(
+	"K8S.RUNASROOT",
+	"Container may run as root",
+	"Set securityContext.runAsNonRoot: true (and/or runAsUser: a non-zero UID).",
+)
+# Reported by the cross-document rules, which do not go through the registry
+K8S_RULES.describe(
+	"K8S.NO_NETWORKPOLICY",
+	"No Kubernetes NetworkPolicy resources detected",
+	"Define NetworkPolicy to restrict pod ingress/egress by default (deny-all baseline).",
+)
+
+@K8S_RULES.register(*WORKLOAD_KINDS)
 def check_run_as_root(doc: Dict[str, Any]) -> List[Dict[str, Any]]:
 	findings: List[Dict[str, Any]] = []
-	if doc.get("kind") not in WORKLOAD_KINDS:
+	wl = workload_of(doc)
+	if wl is None:
 		return findings
 
-	for c in _containers_from(doc):
-		sc = c.get("_effective_sc", {})
+	for c in wl.containers:
+		sc = c.security_context
 		run_as_non_root = sc.get("runAsNonRoot")
 		run_as_user = sc.get("runAsUser")
 		# Flag if explicit non-root is not enforced
@@ -47,13 +47,53 @@ def check_run_as_root(doc: Dict[str, Any]) -> List[Dict[str, Any]]:
 				doc,
 				"K8S.RUNASROOT",
 				"HIGH",
-				f'Container "{c.get("name","<unnamed>")}" may run as root.',
-				"Set securityContext.runAsNonRoot: true (and/or runAsUser: a non-zero UID)."
+				f'Container "{c.name}" may run as root.',
+				"Set securityContext.runAsNonRoot: true (and/or runAsUser: a non-zero UID).",
+				f"{c.path}.securityContext",
 			))
 	return findings
 
 def run_k8s_rules(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-	all_findings: List[Dict[str, Any]] = []
+	return K8S_RULES.run(docs)
+
+def rule_kinds(*registries: RuleRegistry) -> Optional[FrozenSet[str]]:
+	"""
+	Kinds the checks of K8S_RULES and `registries` read, or None when one of
+	them applies to every kind. Documents of other kinds only need counting,
+	so the parser can skip constructing them (see parse_k8s_source).
+	"""
+	kinds: set = set()
+	for registry in (K8S_RULES,) + registries:
+		applies = registry.applies_to()
+		if applies is None:
+			return None
+		kinds |= applies
+	return frozenset(kinds)
+
+def count_kinds(docs: List[Dict[str, Any]], counts: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+	"""
+	Tally documents per kind. This is all the state the cross-document rules
+	need, so it can be accumulated per file and merged.
+	"""
+	counts = {} if counts is None else counts
 	for d in docs:
-		all_findings.extend(check_run_as_root(d))
-	return all_findings
+		kind = d.get("kind") or ""
+		counts[kind] = counts.get(kind, 0) + 1
+	return counts
+
+def check_networkpolicy_present(kind_counts: Dict[str, int]) -> List[Dict[str, Any]]:
+	# Only meaningful when the scan set contains Kubernetes documents at all
+	if not kind_counts or kind_counts.get("NetworkPolicy"):
+		return []
+	return [Finding(
+		"K8S.NO_NETWORKPOLICY",
+		"LOW",
+		"No Kubernetes NetworkPolicy resources detected",
+		"-",
+		"Kubernetes.NetworkPolicy",
+		"Define NetworkPolicy to restrict pod ingress/egress by default (deny-all baseline).",
+	)]
+
+def run_k8s_global_rules(kind_counts: Dict[str, int]) -> List[Dict[str, Any]]:
+	"""Cross-document rules, evaluated once per scan over the per-kind counts."""
+	return check_networkpolicy_present(kind_counts)
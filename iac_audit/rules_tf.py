@@ -1,16 +1,29 @@
 
 from typing import Dict, Any, List
+from .registry import RuleRegistry
+from .positions import line_of
+from .findings import Finding
 
-def _finding(resource: Dict[str, Any], fid: str, severity: str, title: str, recommendation: str) -> Dict[str, Any]:
-	return {
-		"id": fid,
-		"severity": severity,
-		"title": title,
-		"file": resource["file"],
-		"resource": f'{resource["type"]}.{resource["name"]}',
-		"recommendation": recommendation,
-	}
+TF_RULES = RuleRegistry("type")
 
+def _finding(resource: Dict[str, Any], fid: str, severity: str, title: str, recommendation: str, path: str = "") -> Finding:
+	return Finding(
+		fid,
+		severity,
+		title,
+		resource["file"],
+		resource.get("address") or f'{resource["type"]}.{resource["name"]}',
+		recommendation,
+		line_of(resource, path),
+	)
+
+TF_RULES.describe(
+	"TF.SG.OPEN",
+	"Security Group allows ingress from 0.0.0.0/0",
+	"Restrict ingress CIDRs to known IP ranges or use load balancers/WAF.",
+)
+
+@TF_RULES.register("aws_security_group", "aws_security_group_rule")
 def check_open_sg(resource: Dict[str, Any]) -> List[Dict[str, Any]]:
 	"""
 	Flags:
@@ -35,16 +48,18 @@ def check_open_sg(resource: Dict[str, Any]) -> List[Dict[str, Any]]:
 
 	if rtype == "aws_security_group":
 		ing = body.get("ingress", [])
+		paths = ["ingress"] if isinstance(ing, dict) else [f"ingress.{i}" for i in range(len(ing))]
 		if isinstance(ing, dict):
 			ing = [ing]
-		for rule in ing:
+		for rule, path in zip(ing, paths):
 			if "0.0.0.0/0" in cidr_list(rule):
 				findings.append(_finding(
 					resource,
 					"TF.SG.OPEN",
 					"HIGH",
 					"Security Group allows ingress from 0.0.0.0/0",
-					"Restrict ingress CIDRs to known IP ranges or use load balancers/WAF."
+					"Restrict ingress CIDRs to known IP ranges or use load balancers/WAF.",
+					path,
 				))
 	elif rtype == "aws_security_group_rule":
 		# explicit rule resources
@@ -60,7 +75,4 @@ def check_open_sg(resource: Dict[str, Any]) -> List[Dict[str, Any]]:
 	return findings
 
 def run_tf_rules(resources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-	all_findings: List[Dict[str, Any]] = []
-	for r in resources:
-		all_findings.extend(check_open_sg(r))
-	return all_findings
+	return TF_RULES.run(resources)
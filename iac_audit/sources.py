@@ -0,0 +1,205 @@
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Union
+import logging
+import posixpath
+import queue
+import zipfile
+
+from .parser_tfplan import looks_like_plan, SNIFF_BYTES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ARCHIVE_BYTES = 512 * 1024 * 1024
+
+class ArchiveTooLarge(Exception):
+	"""Raised when an archive's IaC members exceed the uncompressed size budget."""
+
+class FeedAborted(Exception):
+	"""Raised to the consumer of a FeedSource whose producer gave up."""
+
+class SourceFile:
+	"""
+	A file of a virtual source (e.g. a zip member). Quacks like the parts of
+	Path the pipeline uses: `name`, `suffix`, `str()` and `read_bytes()`.
+	"""
+	__slots__ = ("path", "_reader")
+
+	def __init__(self, path: Union[str, PurePosixPath], reader: Callable[[], bytes]):
+		self.path = PurePosixPath(path)
+		self._reader = reader
+
+	@property
+	def name(self) -> str:
+		return self.path.name
+
+	@property
+	def suffix(self) -> str:
+		return self.path.suffix
+
+	def read_bytes(self) -> bytes:
+		return self._reader()
+
+	def __str__(self) -> str:
+		return str(self.path)
+
+	def __repr__(self) -> str:
+		return f"SourceFile({str(self.path)!r})"
+
+class Source:
+	"""A set of IaC files the pipeline can discover and parse."""
+
+	# True when files arrive over time (see FeedSource): consumers must not
+	# materialize the file list up front or they wait for the last file.
+	streaming = False
+	# True when each directory's files are yielded together, so a consumer can
+	# close a Terraform module as soon as the directory changes.
+	contiguous = False
+
+	def iter_files(self) -> Iterator[Union[Path, SourceFile]]:
+		raise NotImplementedError
+
+	def close(self) -> None:
+		pass
+
+	def __enter__(self) -> "Source":
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.close()
+
+class DirectorySource(Source):
+	"""Files on disk under a directory (or a single file)."""
+	contiguous = True
+
+	def __init__(self, root: Union[str, Path]):
+		self.root = Path(root)
+
+	def iter_files(self) -> Iterator[Union[Path, SourceFile]]:
+		from .utils import iter_discovered
+		return iter_discovered(self.root)
+
+def _is_iac(path: Union[Path, SourceFile]) -> bool:
+	from .utils import is_iac_file
+	return is_iac_file(path)
+
+class FileListSource(Source):
+	"""
+	An already known list of files (e.g. just-saved uploads); nothing is
+	walked. Files are kept in order but grouped by directory.
+	"""
+	contiguous = True
+
+	def __init__(self, files: Iterable[Union[str, Path]]):
+		self.files = sorted((Path(f) for f in files), key=lambda f: str(f.parent))
+
+	def iter_files(self) -> Iterator[Union[Path, SourceFile]]:
+		return (f for f in self.files if _is_iac(f))
+
+class FeedSource(Source):
+	"""
+	Files handed over one by one by a producer thread or coroutine (e.g. an
+	upload handler as each file lands on disk) while the pipeline consumes
+	them elsewhere, so parsing overlaps with writing. The producer must end
+	the feed with finish() or abort().
+	"""
+	streaming = True
+	_END = object()
+	_ABORT = object()
+
+	def __init__(self):
+		self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+		self.aborted = False
+
+	def put(self, path: Union[Path, SourceFile]) -> None:
+		self._queue.put(path)
+
+	def finish(self) -> None:
+		self._queue.put(self._END)
+
+	def abort(self) -> None:
+		"""Stop the consumer at its next file, even if files are still queued."""
+		self.aborted = True
+		self._queue.put(self._ABORT)
+
+	def iter_files(self) -> Iterator[Union[Path, SourceFile]]:
+		while True:
+			item = self._queue.get()
+			if item is self._ABORT or self.aborted:
+				raise FeedAborted()
+			if item is self._END:
+				return
+			if _is_iac(item):
+				yield item
+
+class ZipSource(Source):
+	"""
+	IaC members of a zip archive, read straight from the ZipFile without
+	extracting anything to disk. Members are selected by name (and `.json`
+	members by their first few KiB, see utils.PLAN_EXTS); the total
+	uncompressed size of selected members is capped to guard against zip bombs.
+	Members are sorted by directory, so each module's files are adjacent.
+	"""
+	contiguous = True
+
+	def __init__(self, archive: Union[str, Path, BinaryIO], max_total_bytes: int = DEFAULT_MAX_ARCHIVE_BYTES):
+		from .utils import IAC_EXTS, PLAN_EXTS
+		self._zip = zipfile.ZipFile(archive, "r")
+		self.max_total_bytes = max_total_bytes
+		self.total_entries = len(self._zip.infolist())
+		self._read_bytes = 0
+		self._counted = set()
+		self.members: List[zipfile.ZipInfo] = []
+		for info in self._zip.infolist():
+			if info.is_dir() or info.filename.startswith("__MACOSX/"):
+				continue
+			suffix = PurePosixPath(info.filename).suffix.lower()
+			if suffix in IAC_EXTS or (suffix in PLAN_EXTS and self._is_plan(info)):
+				self.members.append(info)
+		# Zip order is arbitrary: keep each directory's members together (stable)
+		self.members.sort(key=lambda info: posixpath.dirname(info.filename))
+		declared = sum(info.file_size for info in self.members)
+		if declared > max_total_bytes:
+			self.close()
+			raise ArchiveTooLarge(f"archive IaC content is {declared} bytes uncompressed (limit {max_total_bytes})")
+		logger.info("ZipSource: %d of %d entries selected", len(self.members), self.total_entries)
+
+	def _is_plan(self, info: zipfile.ZipInfo) -> bool:
+		# Only the header is inflated, and it is not charged to the budget
+		with self._zip.open(info) as member:
+			return looks_like_plan(member.read(SNIFF_BYTES))
+
+	def _reader(self, info: zipfile.ZipInfo) -> Callable[[], bytes]:
+		def read() -> bytes:
+			# Headers can lie about sizes, so enforce the budget on actual bytes
+			budget = self.max_total_bytes - self._read_bytes
+			with self._zip.open(info) as member:
+				data = member.read(budget + 1)
+			if len(data) > budget:
+				raise ArchiveTooLarge(f"archive IaC content exceeds {self.max_total_bytes} bytes uncompressed")
+			if info.filename not in self._counted:
+				self._counted.add(info.filename)
+				self._read_bytes += len(data)
+			return data
+		return read
+
+	def iter_files(self) -> Iterator[Union[Path, SourceFile]]:
+		for info in self.members:
+			yield SourceFile(info.filename, self._reader(info))
+
+	def close(self) -> None:
+		self._zip.close()
+
+class MultiSource(Source):
+	"""Concatenation of several sources."""
+
+	def __init__(self, sources: Iterable[Source]):
+		self.sources = list(sources)
+		self.contiguous = all(s.contiguous for s in self.sources)
+
+	def iter_files(self) -> Iterator[Union[Path, SourceFile]]:
+		for s in self.sources:
+			yield from s.iter_files()
+
+	def close(self) -> None:
+		for s in self.sources:
+			s.close()
@@ -1,22 +1,47 @@
 
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any, Optional, Union
 import logging
 
+from .sources import Source, SourceFile
+from .discovery import walk_files
+from .parser_tfplan import is_plan_file
+
 # Accepted IaC extensions (lowercase). Always compare using lower() to be case-insensitive.
 IAC_EXTS = {".tf", ".yaml", ".yml"}
+# Terraform plan/state JSON (`terraform show -json`). A .json file is IaC only
+# when its header says so, so package.json, lockfiles and fixtures are never
+# counted, parsed or charged to archive limits.
+PLAN_EXTS = {".json"}
 logger = logging.getLogger(__name__)
 
-def discover_files(target: str) -> List[Path]:
+SEVERITY_ORDER = {"LOW": 1, "MEDIUM": 2, "HIGH": 3, "CRITICAL": 4}
+
+def is_iac_file(path: Union[Path, SourceFile]) -> bool:
+	suffix = path.suffix.lower()
+	return suffix in IAC_EXTS or (suffix in PLAN_EXTS and is_plan_file(path))
+
+def iter_discovered(target: Union[str, Path, Source], jobs: int = 1) -> Iterator[Union[Path, SourceFile]]:
+	"""
+	Lazily yield the IaC files of `target` (a file, a directory or a Source).
+	Directory walks prune heavy directories and honour ignore files; see
+	iac_audit.discovery.walk_files.
+	"""
+	if isinstance(target, Source):
+		yield from target.iter_files()
+		return
 	p = Path(target)
-	if p.is_file() and p.suffix.lower() in IAC_EXTS:
-		logger.info("discover_files: single file %s accepted", p)
-		return [p]
-	files = [
-		f for f in p.rglob("*")
-		if f.is_file() and f.suffix.lower() in IAC_EXTS
-	]
-	logger.info("discover_files: %d files under %s", len(files), target)
+	if p.is_file():
+		if is_iac_file(p):
+			yield p
+		return
+	for f in walk_files(p, IAC_EXTS | PLAN_EXTS, jobs=jobs):
+		if f.suffix.lower() not in PLAN_EXTS or is_plan_file(f):
+			yield f
+
+def discover_files(target: Union[str, Path, Source], jobs: int = 1) -> List[Union[Path, SourceFile]]:
+	files = list(iter_discovered(target, jobs))
+	logger.info("discover_files: %d files under %s", len(files), target if not isinstance(target, Source) else type(target).__name__)
 	return files
 
 def summarize(findings: List[Dict[str, Any]]) -> Dict[str, int]:
@@ -26,3 +51,10 @@ def summarize(findings: List[Dict[str, Any]]) -> Dict[str, int]:
 		if sev in counts:
 			counts[sev] += 1
 	return counts
+
+def filter_by_severity(findings: List[Dict[str, Any]], min_severity: Optional[str]) -> List[Dict[str, Any]]:
+	"""Keep findings at or above min_severity (LOW|MEDIUM|HIGH|CRITICAL); None keeps all."""
+	if not min_severity:
+		return findings
+	threshold = SEVERITY_ORDER[min_severity.upper()]
+	return [f for f in findings if SEVERITY_ORDER.get(f.get("severity", "LOW"), 1) >= threshold]
@@ -9,3 +9,9 @@ resource "aws_s3_bucket" "good" {
     }
   }
 }
+
+resource "aws_s3_bucket_logging" "good" {
+  bucket        = aws_s3_bucket.good.id
+  target_bucket = "good-logs-bucket"
+  target_prefix = "s3/"
+}
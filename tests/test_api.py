@@ -0,0 +1,277 @@
+# test_api.py
+# API tests for the FastAPI backend
+
+import json
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+
+BASE = Path(__file__).resolve().parent
+client = TestClient(app)
+
+
+def upload(*rels):
+	return [("files", (Path(r).name, (BASE / r).read_bytes())) for r in rels]
+
+
+def test_scan_stream_ndjson_events():
+	files = upload("samples/k8s/pod-root.yaml", "samples/terraform/sg_open.tf")
+	r = client.post("/scan/stream", files=files)
+	assert r.status_code == 200
+	assert r.headers["content-type"].startswith("application/x-ndjson")
+	events = [json.loads(line) for line in r.text.splitlines()]
+	assert events[0]["event"] == "start"
+	assert events[-1]["event"] == "summary"
+	assert sum(1 for e in events if e["event"] == "progress") == 2
+	found = [e["finding"]["id"] for e in events if e["event"] == "finding"]
+	assert "K8S.RUNASROOT" in found and "TF.SG.OPEN" in found
+	assert events[-1]["count"] == len(found)
+
+
+def test_scan_rejects_when_executor_saturated(monkeypatch):
+	from backend.services.executor import ScanExecutor
+	import backend.api.scan as scan_api
+
+	from backend.services.result_cache import ResultCache
+
+	monkeypatch.setattr(scan_api, "scan_executor", ScanExecutor(max_workers=1, max_queue=0))
+	monkeypatch.setattr(scan_api, "result_cache", ResultCache(0))
+	assert scan_api.scan_executor.try_acquire()
+	r = client.post("/scan", files=upload("samples/k8s/pod-root.yaml"))
+	assert r.status_code == 503
+	assert "retry-after" in r.headers
+	scan_api.scan_executor.release()
+	r = client.post("/scan", files=upload("samples/k8s/pod-root.yaml"))
+	assert r.status_code == 200
+	assert r.json()["count"] >= 1
+
+
+def test_scan_job_lifecycle():
+	import time
+
+	r = client.post("/scans?severity=HIGH", files=upload("samples/k8s/pod-root.yaml", "samples/terraform/sg_open.tf"))
+	assert r.status_code == 202
+	job_id = r.json()["id"]
+	for _ in range(100):
+		job = client.get(f"/scans/{job_id}").json()
+		if job["status"] in ("succeeded", "failed"):
+			break
+		time.sleep(0.05)
+	assert job["status"] == "succeeded", job
+	assert job["progress"]["files_scanned"] == 2
+	assert {f["severity"] for f in job["result"]["findings"]} <= {"HIGH", "CRITICAL"}
+	assert client.get("/scans/does-not-exist").status_code == 404
+
+	# Client subdirectories are kept on disk and still scanned
+	sg = (BASE / "samples/terraform/sg_open.tf").read_bytes()
+	r = client.post("/scans", files=[("files", ("mod1/main.tf", sg)), ("files", ("mod2/main.tf", sg))])
+	job_id = r.json()["id"]
+	for _ in range(100):
+		job = client.get(f"/scans/{job_id}").json()
+		if job["status"] in ("succeeded", "failed"):
+			break
+		time.sleep(0.05)
+	assert job["status"] == "succeeded", job
+	assert job["result"]["metadata"]["total_files"] == 2
+	sync = client.post("/scan", files=[("files", ("mod1/main.tf", sg)), ("files", ("mod2/main.tf", sg))]).json()
+	assert job["result"]["count"] == sync["count"] >= 2
+
+
+def test_sqlite_job_store_roundtrip(tmp_path):
+	from backend.services.jobs import SqliteJobStore
+
+	store = SqliteJobStore(str(tmp_path / "jobs.db"))
+	store.create({"id": "j1", "status": "running", "params": {"severity": None}})
+	store.update("j1", progress={"files_scanned": 3})
+	assert store.get("j1")["progress"] == {"files_scanned": 3}
+	# A fresh process cannot resume running jobs
+	assert SqliteJobStore(str(tmp_path / "jobs.db")).get("j1")["status"] == "failed"
+
+
+def zip_bytes(members):
+	import io
+	import zipfile
+
+	buf = io.BytesIO()
+	with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+		for name, data in members.items():
+			zf.writestr(name, data)
+	return buf.getvalue()
+
+
+def test_scan_reads_archive_in_place():
+	data = zip_bytes({
+		"iac/k8s/pod-root.yaml": (BASE / "samples/k8s/pod-root.yaml").read_bytes(),
+		"iac/tf/sg_open.tf": (BASE / "samples/terraform/sg_open.tf").read_bytes(),
+		"README.txt": b"not iac",
+	})
+	r = client.post("/scan", files=[("archive", ("bundle.zip", data))])
+	assert r.status_code == 200
+	body = r.json()
+	assert body["debug"]["archive_entries"] == 3
+	assert body["total_files"] == 2
+	files = {f["file"] for f in body["findings"]}
+	assert "iac/k8s/pod-root.yaml" in files and "iac/tf/sg_open.tf" in files
+	assert client.post("/scan", files=[("archive", ("bad.zip", b"not a zip"))]).status_code == 400
+
+
+def test_zip_source_caps_uncompressed_size():
+	import io
+	import pytest
+	from iac_audit.sources import ZipSource, ArchiveTooLarge
+
+	data = zip_bytes({"a.yaml": b"#" * 4096})
+	with pytest.raises(ArchiveTooLarge):
+		ZipSource(io.BytesIO(data), max_total_bytes=1024)
+	assert client.post("/scan", files=[("archive", ("ok.zip", data))]).status_code == 200
+
+
+def test_scan_profile_and_metrics(monkeypatch):
+	import backend.api.scan as scan_api
+	import backend.services.scanner as scanner
+	from backend.services.result_cache import ResultCache
+
+	monkeypatch.setattr(scanner, "SCAN_PROFILE", True)
+	monkeypatch.setattr(scan_api, "result_cache", ResultCache(0))
+	r = client.post("/scan", files=upload("samples/k8s/pod-root.yaml", "samples/terraform/sg_open.tf"))
+	profile = r.json()["debug"]["profile"]
+	# Multi-file uploads are fed to the scan as they are saved: nothing to discover
+	assert {"parse", "rules"} <= set(profile["stages"]) and "discover" not in profile["stages"]
+	assert profile["rules"]["check_run_as_root"]["findings"] >= 1
+	assert profile["findings_by_rule"]["TF.SG.OPEN"] == 1
+	# Declarative rules are timed one rule id at a time
+	assert {"K8S.PRIVILEGED", "K8S.NO_LIMITS", "k8s_declarative_rules"} <= set(profile["rules"])
+	assert len(profile["slowest_files"]) == 2
+
+	text = client.get("/metrics").text
+	assert "# TYPE iac_audit_scans_total counter" in text
+	assert 'iac_audit_rule_findings_total{rule_id="TF.SG.OPEN"}' in text
+	assert 'iac_audit_executor_running{pool="scan"}' in text
+
+
+def test_reports_render_on_demand():
+	files = upload("samples/terraform/sg_open.tf")
+	body = client.post("/scan", files=files).json()
+	assert "sarif" not in body and "markdown" not in body
+	assert body["links"]["sarif"] == f"/scans/{body['id']}/sarif"
+	# Synchronous results are kept apart from (and never written to) the job store
+	from backend.services.jobs import job_manager
+	assert job_manager.store.get(body["id"]) is None and job_manager.get(body["id"])["status"] == "succeeded"
+
+	body = client.post("/scan?formats=sarif", files=files).json()
+	assert body["sarif"]["runs"][0]["results"] and "markdown" not in body
+	assert client.post("/scan?formats=pdf", files=files).status_code == 400
+
+	r = client.get(body["links"]["sarif"])
+	assert r.status_code == 200 and "attachment" in r.headers["content-disposition"]
+	result = r.json()["runs"][0]["results"][0]
+	assert result["locations"][0]["physicalLocation"]["region"]["startLine"] > 1
+	assert client.get(body["links"]["sarif"]).content == r.content
+	md = client.get(body["links"]["markdown"])
+	assert md.headers["content-type"].startswith("text/markdown") and "TF.SG.OPEN" in md.text
+	assert client.get("/scans/missing/sarif").status_code == 404
+
+
+def test_sarif_rule_descriptors_are_static():
+	from backend.services.sarif import generate_sarif
+	from iac_audit.findings import Finding
+
+	finding = Finding("K8S.PRIVILEGED", "HIGH", 'Container "secret-app" runs privileged.', "a.yaml", "Pod.x", "fix")
+	rules = generate_sarif([finding])["runs"][0]["tool"]["driver"]["rules"]
+	assert rules[0]["name"] == rules[0]["shortDescription"]["text"] == "Container runs privileged."
+	assert "secret-app" not in json.dumps(rules)
+	other = generate_sarif([Finding("X.CUSTOM", "LOW", "t", "a.tf", "r", "fix")])
+	assert other["runs"][0]["tool"]["driver"]["rules"][0]["name"] == "X.CUSTOM"
+
+
+def test_identical_uploads_reuse_cached_result(tmp_path):
+	from backend.services.result_cache import ResultCache, upload_digest
+
+	files = upload("samples/k8s/pod-root.yaml", "samples/terraform/unencrypted_s3.tf")
+	first = client.post("/scan", files=files).json()
+	again = client.post("/scan", files=list(reversed(files))).json()
+	assert again["debug"]["cache"] == "hit"
+	assert again["id"] != first["id"]
+	# Same findings, with paths rebased onto this request's upload directory
+	strip = lambda fs: [dict(f, file=Path(f["file"]).name) for f in fs]
+	assert strip(again["findings"]) == strip(first["findings"])
+	dirs = {str(Path(f["file"]).parent) for f in again["findings"] if f["file"] != "-"}
+	assert len(dirs) == 1 and dirs.isdisjoint(str(Path(f["file"]).parent) for f in first["findings"])
+
+	high = client.post("/scan?severity=HIGH", files=files).json()
+	assert high["debug"]["cache"] == "hit"
+	assert {f["severity"] for f in high["findings"]} <= {"HIGH", "CRITICAL"}
+	assert high["count"] < first["count"]
+
+	assert upload_digest({"a.tf": "00"}) != upload_digest({"b.tf": "00"})
+	disk = tmp_path / "results"
+	ResultCache(1, disk).put("k", {"findings": []})
+	assert ResultCache(1, disk).get("k") == {"findings": []}
+
+
+def test_uploads_stream_with_limits(monkeypatch):
+	import backend.api.scan as scan_api
+
+	files = upload("samples/terraform/sg_open.tf") + [("files", ("notes.txt", b"irrelevant"))]
+	body = client.post("/scan", files=files).json()
+	assert body["debug"]["saved_filenames"] == ["sg_open.tf"]
+
+	# Same basename in different directories (or twice): each is saved and scanned once
+	sg = (BASE / "samples/terraform/sg_open.tf").read_bytes()
+	names = ["mod1/main.tf", "mod2/main.tf", "../main.tf", "main.tf"]
+	body = client.post("/scan", files=[("files", (n, sg)) for n in names]).json()
+	single = client.post("/scan", files=upload("samples/terraform/sg_open.tf")).json()
+	assert body["total_files"] == 4 and body["count"] == 4 * single["count"]
+	files_seen = {"/".join(Path(f["file"]).parts[-2:]) for f in body["findings"]}
+	assert {"mod1/main.tf", "mod2/main.tf"} <= files_seen
+	assert any(p.endswith("/main-2.tf") for p in files_seen)
+
+	monkeypatch.setattr(scan_api, "UPLOAD_MAX_FILE_BYTES", 64)
+	r = client.post("/scan", files=upload("samples/terraform/sg_open.tf"))
+	assert r.status_code == 413 and "sg_open.tf" in r.json()["detail"]
+	monkeypatch.setattr(scan_api, "UPLOAD_MAX_FILE_BYTES", None)
+	monkeypatch.setattr(scan_api, "UPLOAD_MAX_BYTES", 64)
+	r = client.post("/scan", files=[("archive", ("repo.zip", zip_bytes({"a.tf": b"#" * 128})))])
+	assert r.status_code == 413
+
+
+def test_findings_query_pages_and_filters():
+	files = upload("samples/k8s/pod-root.yaml", "samples/terraform/unencrypted_s3.tf", "samples/terraform/sg_open.tf")
+	full = client.post("/scan", files=files).json()
+	slim = client.post("/scan?findings=false", files=files).json()
+	assert slim["findings"] == [] and slim["count"] == full["count"] > 3
+	url = slim["links"]["findings"]
+	assert url == f"/scans/{slim['id']}/findings"
+
+	seen, cursor = [], None
+	while True:
+		page = client.get(url, params={"limit": 2, **({"cursor": cursor} if cursor else {})}).json()
+		assert len(page["findings"]) <= 2 and page["count"] == full["count"]
+		seen.extend(page["findings"])
+		cursor = page["next_cursor"]
+		if cursor is None:
+			break
+	# The slim scan reuses the cached result, rebased onto its own upload directory
+	assert [dict(f, file=Path(f["file"]).name) for f in seen] == [dict(f, file=Path(f["file"]).name) for f in full["findings"]]
+	facets = page["facets"]
+	assert sum(facets["severity"].values()) == full["count"]
+	assert facets["rule"]["TF.SG.OPEN"] == sum(1 for f in full["findings"] if f["id"] == "TF.SG.OPEN")
+
+	high = client.get(url, params={"severity": "HIGH"}).json()
+	assert high["count"] == sum(1 for f in full["findings"] if f["severity"] in ("HIGH", "CRITICAL"))
+	assert {f["severity"] for f in high["findings"]} <= {"HIGH", "CRITICAL"}
+	sg_file = next(f["file"] for f in seen if f["id"] == "TF.SG.OPEN")
+	one = client.get(url, params={"rule": "TF.SG.OPEN", "file": sg_file}).json()
+	assert one["count"] and all(f["id"] == "TF.SG.OPEN" and f["file"] == sg_file for f in one["findings"])
+	assert client.get(url, params={"q": "sg.open"}).json()["count"] == one["count"]
+	assert client.get(url, params={"cursor": "x"}).status_code == 400
+	assert client.get("/scans/missing/findings").status_code == 404
+
+	# A lower severity than the submitted one does not widen the results
+	high_scan = client.post("/scan?severity=HIGH&findings=false", files=files).json()
+	low = client.get(high_scan["links"]["findings"], params={"severity": "LOW"}).json()
+	assert low["count"] == high["count"] and {f["severity"] for f in low["findings"]} <= {"HIGH", "CRITICAL"}
+	critical = client.get(high_scan["links"]["findings"], params={"severity": "CRITICAL"}).json()
+	assert critical["count"] == sum(1 for f in full["findings"] if f["severity"] == "CRITICAL")
@@ -0,0 +1,215 @@
+# test_pipeline.py
+# Tests for the parse/scan pipeline (parallelism, caching, incremental runs)
+
+from pathlib import Path
+
+from iac_audit.utils import discover_files
+from iac_audit.parsing import parse_files
+
+BASE = Path(__file__).resolve().parent
+
+
+def test_parallel_parse_matches_serial():
+	files = discover_files(str(BASE / "samples"))
+	serial = parse_files(files, jobs=1)
+	parallel = parse_files(files, jobs=2)
+	assert parallel == serial
+	assert serial[0] and serial[1]
+
+
+def test_parse_cache_warm_run_skips_parsing(tmp_path):
+	from iac_audit.cache import ParseCache
+
+	files = discover_files(str(BASE / "samples/pack"))
+	cache = ParseCache(tmp_path / "cache")
+	cold = parse_files(files, cache=cache)
+	assert cache.misses == len(files) and cache.hits == 0
+	warm = parse_files(files, cache=cache)
+	assert warm == cold
+	assert cache.hits == len(files)
+
+
+def test_parse_cache_evicts_to_size_bound(tmp_path):
+	from iac_audit.cache import ParseCache
+
+	cache = ParseCache(tmp_path / "cache", max_bytes=2048)
+	for i in range(50):
+		cache.put(cache.key("tf", str(i).encode()), [{"type": "t", "name": str(i), "body": {"x": "y" * 200}, "file": "f"}])
+	total = sum(p.stat().st_size for p in (tmp_path / "cache").glob("*/*.bin"))
+	assert total <= 2048
+
+
+def test_parse_cache_stores_data_only(tmp_path):
+	import datetime
+	import os
+	import pickle
+	import zlib
+	from iac_audit.cache import ParseCache
+	from iac_audit.parser_k8s import parse_k8s_source
+
+	cache = ParseCache(tmp_path / "cache")
+	docs = parse_k8s_source("kind: Pod\nmetadata: {name: p}\nspec:\n  containers: [{name: c}]\n  when: 2024-01-02\n  ports: {8080: http}\n", "pod.yaml")
+	cache.put("k8s", docs)
+	loaded = cache.get("k8s")
+	assert loaded == docs and loaded[0]["workload"].containers[0].name == "c"
+	assert loaded[0]["body"]["spec"]["when"] == datetime.date(2024, 1, 2) and loaded[0]["body"]["spec"]["ports"] == {8080: "http"}
+
+	# A planted pickle is never unpickled: the entry is dropped as unreadable
+	class Boom:
+		def __reduce__(self):
+			return (os.system, ("touch " + str(tmp_path / "pwned"),))
+	cache._entry("evil").parent.mkdir(parents=True, exist_ok=True)
+	cache._entry("evil").write_bytes(zlib.compress(pickle.dumps([Boom()])))
+	assert cache.get("evil") is None
+	assert not (tmp_path / "pwned").exists() and "evil" not in cache
+
+
+def test_incremental_rescans_only_changed_files(tmp_path):
+	import shutil
+	from iac_audit.cli import RULESET, evaluate, scan_path
+	from iac_audit.incremental import scan_incremental
+
+	src = tmp_path / "src"
+	shutil.copytree(BASE / "samples/pack", src)
+	state = tmp_path / "state"
+
+	first, stats = scan_incremental(str(src), state, evaluate, RULESET)
+	assert stats["changed_files"] == stats["total_files"]
+	assert sorted(f["id"] for f in first) == sorted(f["id"] for f in scan_path(str(src)))
+	assert "K8S.NO_NETWORKPOLICY" not in {f["id"] for f in first}
+
+	# Removing the only NetworkPolicy must re-trigger the cross-file rule
+	(src / "k8s/10_networkpolicy.yaml").unlink()
+	second, stats = scan_incremental(str(src), state, evaluate, RULESET)
+	assert stats["changed_files"] == 0 and stats["removed_files"] == 1
+	assert "K8S.NO_NETWORKPOLICY" in {f["id"] for f in second}
+	assert sorted(f["id"] for f in second) == sorted(f["id"] for f in scan_path(str(src)))
+
+
+def test_iter_findings_streams_per_file():
+	from iac_audit.pipeline import ScanStats, iter_file_results
+	from backend.services.scanner import iter_findings, scan_directory
+
+	stats = ScanStats()
+	results = list(iter_file_results(str(BASE / "samples/k8s"), stats=stats))
+	assert results[-1][0] is None
+	assert len(results) - 1 == stats.files
+
+	streamed = [f["id"] for f in iter_findings(BASE / "samples/pack")]
+	report = scan_directory(BASE / "samples/pack")
+	assert streamed == [f.id for f in report.findings]
+
+
+def test_discovery_prunes_and_honours_ignore_files(tmp_path):
+	def touch(rel, text="x: 1\n"):
+		p = tmp_path / rel
+		p.parent.mkdir(parents=True, exist_ok=True)
+		p.write_text(text)
+
+	touch("main.tf")
+	touch(".terraform/modules/vpc/main.tf")
+	touch("node_modules/pkg/chart.yaml")
+	touch("build/out.yaml")
+	touch("k8s/app.yaml")
+	touch("k8s/generated/a.yaml")
+	touch("k8s/generated/keep.yaml")
+	touch("k8s/notes.txt")
+	touch(".gitignore", "build/\n# comment\n")
+	touch("k8s/.iacauditignore", "generated/*.yaml\n!generated/keep.yaml\n")
+
+	found = sorted(p.relative_to(tmp_path).as_posix() for p in discover_files(tmp_path))
+	assert found == ["k8s/app.yaml", "k8s/generated/keep.yaml", "main.tf"]
+	assert discover_files(tmp_path, jobs=4) == discover_files(tmp_path)
+
+	# Only Terraform plan/state JSON is IaC; other JSON is neither counted nor charged to archives
+	import io
+	import zipfile
+	from iac_audit.sources import ZipSource
+	plan = '{"format_version": "1.2", "terraform_version": "1.6.0"}'
+	touch("package.json", '{"name": "app"}')
+	touch("plans/tfplan.json", plan)
+	found = sorted(p.relative_to(tmp_path).as_posix() for p in discover_files(tmp_path))
+	assert found == ["k8s/app.yaml", "k8s/generated/keep.yaml", "main.tf", "plans/tfplan.json"]
+	buf = io.BytesIO()
+	with zipfile.ZipFile(buf, "w") as zf:
+		zf.writestr("package-lock.json", "{" + " " * 4096 + "}")
+		zf.writestr("tfplan.json", plan)
+	with ZipSource(buf, max_total_bytes=1024) as source:
+		assert [m.filename for m in source.members] == ["tfplan.json"]
+
+
+def test_bench_k8s_yaml_variants():
+	from iac_audit.bench import bench_k8s_yaml
+
+	result = bench_k8s_yaml(docs=4, configmap_kb=1, repeat=1)
+	assert result["documents"] == 4 and "SafeLoader" in result["variants"]
+	assert all(v["seconds"] > 0 for v in result["variants"].values())
+
+
+def test_bench_generates_corpus_and_times_stages(tmp_path):
+	from iac_audit.bench import generate_corpus, benchmark
+
+	counts = generate_corpus(tmp_path, tf_files=4, k8s_files=4, density=1.0, resources_per_file=2, docs_per_file=2)
+	result = benchmark(tmp_path, repeat=1)
+	assert result["files"] == counts["tf_files"] + counts["k8s_files"]
+	assert result["terraform_resources"] == counts["tf_resources"]
+	assert result["k8s_documents"] == counts["k8s_documents"]
+	assert result["findings"] >= counts["insecure"]
+	assert set(result["stages"]) == {"discover", "parse", "rules", "sarif", "serialize"}
+
+
+def test_feed_source_scans_files_as_they_arrive(tmp_path):
+	import threading
+	import pytest
+	from iac_audit.pipeline import iter_file_results
+	from iac_audit.profiling import Profiler
+	from iac_audit.sources import FeedSource, FeedAborted
+
+	feed = FeedSource()
+	seen = []
+
+	def consume():
+		for path, _ in iter_file_results(feed, profiler=Profiler()):
+			seen.append(path)
+
+	worker = threading.Thread(target=consume)
+	worker.start()
+	feed.put(BASE / "samples/terraform/sg_open.tf")
+	feed.put(tmp_path / "notes.txt")
+	feed.put(BASE / "samples/k8s/pod-root.yaml")
+	feed.finish()
+	worker.join(5)
+	assert [p.name for p in seen if p] == ["sg_open.tf", "pod-root.yaml"]
+
+	aborted = FeedSource()
+	aborted.put(BASE / "samples/terraform/sg_open.tf")
+	aborted.abort()
+	with pytest.raises(FeedAborted):
+		list(iter_file_results(aborted))
+
+
+def test_scan_batch_writes_reports_and_summary(tmp_path):
+	import json
+	from iac_audit.batch import scan_batch, read_manifest
+	from iac_audit.cli import scan_path
+
+	manifest = tmp_path / "repos.txt"
+	manifest.write_text(f"# nightly\n{BASE / 'samples/terraform'}\n{BASE / 'samples/k8s'}  # workloads\nmissing\n")
+	roots = read_manifest(manifest)
+	assert roots[2] == str(tmp_path / "missing")
+
+	seen = []
+	summary = scan_batch(roots, tmp_path / "out", workers=2, progress=seen.append)
+	assert len(seen) == 3
+	entries = summary["repos"]
+	assert [e["root"] for e in entries] == roots
+	assert entries[2] == {"root": roots[2], "error": "path does not exist"}
+	for e in entries[:2]:
+		report = json.loads((tmp_path / "out" / e["report"]).read_text())
+		assert report["count"] == e["count"] == len(scan_path(e["root"]))
+		assert report["summary"] == e["summary"]
+	totals = summary["totals"]
+	assert totals["repos"] == 3 and totals["failed"] == 1
+	assert totals["count"] == entries[0]["count"] + entries[1]["count"]
+	assert sum(totals["rules"].values()) == totals["count"]
+	assert json.loads((tmp_path / "out" / "summary.json").read_text()) == summary
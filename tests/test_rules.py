@@ -46,3 +46,352 @@ def test_pack_has_mixture():
 	assert r.count >= 5
 	assert any(f.id.startswith("TF.") for f in r.findings)
 
+
+
+def test_rule_registry_dispatch_by_type():
+	from iac_audit.registry import RuleRegistry
+
+	reg = RuleRegistry("type")
+	calls = []
+
+	@reg.register("aws_s3_bucket")
+	def s3_only(r):
+		calls.append(("s3", r["name"]))
+		return [{"id": "S3"}]
+
+	@reg.register()
+	def every(r):
+		calls.append(("all", r["name"]))
+		return []
+
+	out = reg.run([{"type": "aws_s3_bucket", "name": "a"}, {"type": "aws_lb", "name": "b"}])
+	assert out == [{"id": "S3"}]
+	assert calls == [("s3", "a"), ("all", "a"), ("all", "b")]
+
+
+def test_k8s_workload_view_precomputed_without_mutation():
+	from iac_audit.parser_k8s import parse_k8s_source
+	from backend.services.rules_k8s_ext import run_k8s_extra_rules
+
+	src = """
+apiVersion: batch/v1
+kind: CronJob
+metadata: {name: nightly}
+spec:
+  jobTemplate:
+    spec:
+      template:
+        spec:
+          securityContext: {runAsNonRoot: true}
+          containers:
+          - name: job
+            securityContext: {privileged: true}
+"""
+	[doc] = parse_k8s_source(src, "cron.yaml")
+	wl = doc["workload"]
+	assert [c.name for c in wl.containers] == ["job"]
+	assert wl.containers[0].security_context == {"runAsNonRoot": True, "privileged": True}
+	ids = {f["id"] for f in run_k8s_extra_rules([doc])}
+	assert "K8S.PRIVILEGED" in ids
+	container = doc["body"]["spec"]["jobTemplate"]["spec"]["template"]["spec"]["containers"][0]
+	assert "_effective_sc" not in container
+
+
+def test_findings_carry_source_lines():
+	from iac_audit.parser_tf import parse_terraform_file
+	from iac_audit.parser_k8s import parse_k8s_file
+	from iac_audit.rules_tf import run_tf_rules
+	from iac_audit.rules_k8s import run_k8s_rules
+
+	tf = parse_terraform_file(BASE / "samples/terraform/sg_open.tf")
+	assert tf[0]["line"] == 1 and tf[0]["end_line"] == 18
+	assert "__start_line__" not in tf[0]["body"] and "__start_line__" not in tf[0]["body"]["ingress"][0]
+	assert [f["line"] for f in run_tf_rules(tf)] == [5]
+
+	docs = parse_k8s_file(BASE / "samples/k8s/pod-root.yaml")
+	findings = run_k8s_rules(docs)
+	assert [f["line"] for f in findings] == [7]
+
+	# Line tables stay compact: big bodies no rule reads are not tracked key by key
+	from iac_audit.parser_k8s import parse_k8s_source
+	data = "".join(f"  key{i}: value\n" for i in range(500))
+	cm, cron = parse_k8s_source(
+		f"kind: ConfigMap\nmetadata: {{name: big}}\ndata:\n{data}---\n"
+		"kind: CronJob\nmetadata: {name: c}\nspec:\n  jobTemplate:\n    spec:\n      template:\n        spec:\n"
+		"          containers:\n          - name: app\n            securityContext:\n              privileged: true\n",
+		"m.yaml",
+	)
+	assert cm["lines"] == {"metadata": 2, "data": 3}
+	assert cron["lines"]["spec.jobTemplate.spec.template.spec.containers.0.securityContext.privileged"] == 503 + 12
+
+
+def test_k8s_kind_prefilter_keeps_counts(tmp_path):
+	from iac_audit.parser_k8s import parse_k8s_source
+	from iac_audit.k8s_workload import WORKLOAD_KINDS
+	from iac_audit.parsing import iter_parsed_files, k8s_kinds_for
+	from iac_audit.cache import ParseCache
+	from backend.services.scanner import evaluate
+
+	src = "kind: ConfigMap\nmetadata: {name: big}\ndata: {a: b}\n---\nkind: Pod\nmetadata: {name: p}\nspec: {containers: [{name: c}]}\n"
+	full = parse_k8s_source(src, "m.yaml")
+	filtered = parse_k8s_source(src, "m.yaml", kinds=WORKLOAD_KINDS)
+	assert [(d["kind"], d["name"]) for d in filtered] == [(d["kind"], d["name"]) for d in full]
+	assert filtered[0]["body"] == {} and filtered[1] == full[1]
+
+	# Scans derive the kinds from the registered checks, which all declare theirs
+	kinds = k8s_kinds_for(evaluate)
+	assert kinds == WORKLOAD_KINDS
+	(tmp_path / "m.yaml").write_text(src)
+	cache = ParseCache(tmp_path / "cache")
+	[(_, _, stubbed)] = iter_parsed_files([tmp_path / "m.yaml"], cache=cache, kinds=kinds)
+	[(_, _, docs)] = iter_parsed_files([tmp_path / "m.yaml"], cache=cache)
+	assert stubbed[0]["body"] == {} and docs[0]["body"]["data"] == {"a": "b"} and cache.hits == 0
+	assert scan_directory(tmp_path / "m.yaml").metadata["k8s_documents"] == 2
+
+
+def test_finding_record_behaves_like_dict():
+	import json
+	from iac_audit.findings import Finding
+	from iac_audit.encoding import dumps
+
+	f = Finding("X.ID", "HIGH", "t", "a.tf", "aws_x.y", "fix", 3)
+	d = {"id": "X.ID", "severity": "HIGH", "title": "t", "file": "a.tf", "resource": "aws_x.y", "recommendation": "fix", "line": 3}
+	assert f == d and dict(f) == d and f["severity"] == f.severity == "HIGH"
+	assert f.get("missing", 1) == 1
+	assert json.loads(dumps({"findings": [f]})) == {"findings": [d]}
+	# Non-string keys are stringified like the stdlib encoder does
+	assert json.loads(dumps({1: "a", None: 2})) == json.loads(json.dumps({1: "a", None: 2}))
+
+
+def test_terraform_plan_json_resources(tmp_path, monkeypatch):
+	import json
+	from iac_audit import parser_tfplan
+
+	sg = {"ingress": [{"cidr_blocks": ["0.0.0.0/0"], "from_port": 22, "to_port": 22, "protocol": "tcp"}]}
+	plan = {
+		"format_version": "1.2",
+		"terraform_version": "1.6.0",
+		"planned_values": {"root_module": {
+			"resources": [
+				{"address": "aws_security_group.web[0]", "mode": "managed", "type": "aws_security_group", "name": "web", "index": 0, "values": sg},
+				{"address": "data.aws_ami.base", "mode": "data", "type": "aws_ami", "name": "base", "values": {}},
+			],
+			"child_modules": [{"address": "module.app", "resources": [
+				{"address": "module.app.aws_security_group.db", "mode": "managed", "type": "aws_security_group", "name": "db", "values": sg},
+			]}],
+		}},
+		"prior_state": {"values": {"root_module": {"resources": [
+			{"address": "aws_security_group.old", "mode": "managed", "type": "aws_security_group", "name": "old", "values": sg},
+		]}}},
+	}
+	(tmp_path / "tfplan.json").write_text(json.dumps(plan))
+	(tmp_path / "package.json").write_text('{"name": "not-terraform"}')
+
+	loaded = parser_tfplan.parse_plan_file(tmp_path / "tfplan.json")
+	assert [(r["type"], r["name"], r["address"]) for r in loaded] == [
+		("aws_security_group", "web[0]", "aws_security_group.web[0]"),
+		("aws_security_group", "db", "module.app.aws_security_group.db"),
+	]
+	assert loaded[1]["body"] == sg
+	assert parser_tfplan.parse_plan_file(tmp_path / "package.json") == []
+
+	report = scan_directory(tmp_path)
+	expected = ["aws_security_group.web[0]", "module.app.aws_security_group.db"]
+	assert sorted(f.resource for f in report.findings if f.id == "TF.SG.OPEN") == expected
+
+	# Large plans are read lazily, one module at a time, even with the parse cache on
+	from iac_audit.cache import ParseCache
+	from iac_audit.pipeline import iter_findings
+	monkeypatch.setattr(parser_tfplan, "STREAM_MIN_BYTES", 0)
+	stream = parser_tfplan.parse_plan_file(tmp_path / "tfplan.json")
+	assert isinstance(stream, parser_tfplan.PlanStream)
+	assert [len(m) for m in stream.modules()] == [1, 1] and list(stream) == loaded
+	assert sorted(f.resource for f in scan_directory(tmp_path).findings if f.id == "TF.SG.OPEN") == expected
+	cache = ParseCache(tmp_path / "cache")
+	assert sorted(f["resource"] for f in iter_findings(tmp_path / "tfplan.json", cache=cache)) == expected
+	assert not [p for p in (tmp_path / "cache").rglob("*") if p.is_file()]
+
+
+def test_s3_settings_in_separate_resources_across_files(tmp_path):
+	from iac_audit.references import ReferenceIndex
+
+	mod = tmp_path / "storage"
+	mod.mkdir()
+	(mod / "main.tf").write_text('resource "aws_s3_bucket" "data" {\n  bucket = "data-bucket"\n}\n')
+	(mod / "s3.tf").write_text(
+		'resource "aws_s3_bucket_server_side_encryption_configuration" "data" {\n'
+		'  bucket = aws_s3_bucket.data.id\n'
+		'  rule {\n    apply_server_side_encryption_by_default {\n      sse_algorithm = "aws:kms"\n    }\n  }\n}\n'
+		'resource "aws_s3_bucket_logging" "data" {\n  bucket = "${aws_s3_bucket.data.bucket}"\n  target_bucket = aws_s3_bucket.logs.id\n}\n'
+	)
+	# Only the target of the logging config: the log sink itself is not logged
+	(mod / "logs.tf").write_text(
+		'resource "aws_s3_bucket" "logs" {\n  bucket = "logs"\n}\n'
+		'resource "aws_s3_bucket_server_side_encryption_configuration" "logs" {\n  bucket = aws_s3_bucket.logs.id\n'
+		'  rule {\n    apply_server_side_encryption_by_default {\n      sse_algorithm = "AES256"\n    }\n  }\n}\n'
+	)
+	other = tmp_path / "other"
+	other.mkdir()
+	(other / "main.tf").write_text('resource "aws_s3_bucket" "data" {\n  bucket = "other-bucket"\n}\n')
+
+	report = scan_directory(tmp_path)
+	flagged = sorted((Path(f.file).parent.name, f.resource, f.id) for f in report.findings if f.id.startswith("TF.S3."))
+	assert flagged == [
+		("other", "aws_s3_bucket.data", "TF.S3.NO_ENCRYPTION"),
+		("other", "aws_s3_bucket.data", "TF.S3.NO_LOGGING"),
+		("storage", "aws_s3_bucket.logs", "TF.S3.NO_LOGGING"),
+	]
+
+	# Zip members of one module need not be adjacent in the archive
+	import io
+	import zipfile
+	from iac_audit.pipeline import iter_findings
+	from iac_audit.sources import ZipSource
+	from backend.services.scanner import evaluate
+	buf = io.BytesIO()
+	with zipfile.ZipFile(buf, "w") as zf:
+		zf.writestr("m/a.tf", (mod / "main.tf").read_text())
+		zf.writestr("m/sub/c.tf", 'resource "aws_s3_bucket" "c" {\n  bucket = "c"\n}\n')
+		zf.writestr("m/b.tf", (mod / "s3.tf").read_text().replace("aws_s3_bucket.logs.id", '"elsewhere"'))
+	buf.seek(0)
+	with ZipSource(buf) as source:
+		zipped = sorted((f["file"], f["id"]) for f in iter_findings(source, evaluate) if f["id"].startswith("TF.S3."))
+	assert zipped == [("m/sub/c.tf", "TF.S3.NO_ENCRYPTION"), ("m/sub/c.tf", "TF.S3.NO_LOGGING")]
+	# ...and are still streamed a module at a time: c/ is not read yet when a/ is done
+	from iac_audit.pipeline import iter_file_results
+	buf = io.BytesIO()
+	with zipfile.ZipFile(buf, "w") as zf:
+		for name in ("b/1.tf", "a/1.tf", "c/1.tf", "a/2.tf"):
+			zf.writestr(name, 'resource "aws_s3_bucket" "x" {\n  bucket = "x"\n}\n')
+	buf.seek(0)
+	with ZipSource(buf) as source:
+		first, _ = next(iter_file_results(source, evaluate))
+		assert str(first) == "a/1.tf" and "c/1.tf" not in source._counted
+
+	# Plans carry resolved literals instead of expressions
+	bucket = {"type": "aws_s3_bucket", "name": "b", "body": {"bucket": "plan-bucket", "id": "plan-bucket"}}
+	logging = {"type": "aws_s3_bucket_logging", "name": "b", "body": {"bucket": "plan-bucket"}}
+	index = ReferenceIndex([bucket, logging])
+	assert index.referrers(bucket, "aws_s3_bucket_logging") == [logging]
+	assert index.references(logging) == ["aws_s3_bucket.b"] and index.get("aws_s3_bucket.b") is bucket
+
+	# Plan addresses keep same-named resources of different modules apart
+	a = dict(bucket, address="module.a.aws_s3_bucket.b")
+	b = {"type": "aws_s3_bucket", "name": "b", "address": "module.b.aws_s3_bucket.b", "body": {"bucket": "b-bucket", "id": "b-bucket"}}
+	index = ReferenceIndex([a, b, logging])
+	assert index.get("module.a.aws_s3_bucket.b") is a and index.get("module.b.aws_s3_bucket.b") is b
+	assert index.referrers(a, "aws_s3_bucket_logging", attr="bucket") == [logging] and index.referrers(b) == []
+
+
+def test_s3_references_independent_of_file_order_and_from_plan_configuration(tmp_path):
+	import json
+
+	bucket = 'resource "aws_s3_bucket" "data" {\n  bucket = "data-bucket"\n}\n'
+	sse = (
+		'resource "aws_s3_bucket_server_side_encryption_configuration" "data" {\n  bucket = "data-bucket"\n'
+		'  rule {\n    apply_server_side_encryption_by_default {\n      sse_algorithm = "AES256"\n    }\n  }\n}\n'
+	)
+	for name in ("a_sse.tf", "z_sse.tf"):
+		mod = tmp_path / name.split(".")[0]
+		mod.mkdir()
+		(mod / "main.tf").write_text(bucket)
+		(mod / name).write_text(sse)
+		ids = {f.id for f in scan_directory(mod).findings}
+		assert "TF.S3.NO_ENCRYPTION" not in ids and "TF.S3.NO_LOGGING" in ids, name
+
+	# In a plan, a reference to a bucket created by the same plan is unknown:
+	# planned_values leave `bucket` out and only the configuration names it
+	ref = {"references": ["aws_s3_bucket.data.id", "aws_s3_bucket.data"]}
+	plan = {
+		"format_version": "1.2",
+		"terraform_version": "1.6.0",
+		"planned_values": {"root_module": {"child_modules": [{"address": "module.store", "resources": [
+			{"address": "module.store.aws_s3_bucket.data", "mode": "managed", "type": "aws_s3_bucket", "name": "data", "values": {"bucket": "data-bucket"}},
+			{"address": "module.store.aws_s3_bucket_server_side_encryption_configuration.data", "mode": "managed",
+				"type": "aws_s3_bucket_server_side_encryption_configuration", "name": "data", "values": {"rule": [{}]}},
+			{"address": "module.store.aws_s3_bucket_logging.data", "mode": "managed", "type": "aws_s3_bucket_logging", "name": "data", "values": {}},
+		]}]}},
+		"configuration": {"root_module": {"module_calls": {"store": {"module": {"resources": [
+			{"address": "aws_s3_bucket.data", "type": "aws_s3_bucket", "name": "data", "expressions": {"bucket": {"constant_value": "data-bucket"}}},
+			{"address": "aws_s3_bucket_server_side_encryption_configuration.data", "type": "aws_s3_bucket_server_side_encryption_configuration",
+				"name": "data", "expressions": {"bucket": ref, "rule": [{"apply_server_side_encryption_by_default": [{"sse_algorithm": {"constant_value": "AES256"}}]}]}},
+			{"address": "aws_s3_bucket_logging.data", "type": "aws_s3_bucket_logging", "name": "data",
+				"expressions": {"bucket": ref, "target_bucket": {"constant_value": "logs"}}},
+		]}}}}},
+	}
+	(tmp_path / "tfplan.json").write_text(json.dumps(plan))
+	report = scan_directory(tmp_path / "tfplan.json")
+	assert not [f for f in report.findings if f.id.startswith("TF.S3.")]
+
+
+def test_declarative_rules_from_yaml(tmp_path):
+	from iac_audit.declarative import RuleSet, load_rules
+	from iac_audit.parser_k8s import parse_k8s_source
+	from iac_audit.k8s_workload import WORKLOAD_KINDS, POD_SPEC_PATHS
+
+	pack = tmp_path / "pack.yaml"
+	pack.write_text("""
+target: kubernetes
+rules:
+  - id: X.LATEST
+    severity: LOW
+    applies_to: ["@workloads"]
+    for_each: [pod.containers.*, pod.initContainers.*]
+    when: [{path: image, op: contains, value: ":latest"}]
+    title: 'Container "{name}" uses a latest tag.'
+    at: image
+  - id: X.HOST_NET
+    severity: HIGH
+    applies_to: [Pod]
+    when: [{path: spec.hostNetwork, op: eq, value: true}]
+    title: Pod shares the host network.
+""")
+	assert load_rules(pack, "terraform") == []
+	rules = RuleSet("kind", load_rules(pack, "kubernetes"), groups={"workloads": WORKLOAD_KINDS}, roots={"pod": POD_SPEC_PATHS})
+	src = """
+kind: Deployment
+metadata: {name: web}
+spec:
+  template:
+    spec:
+      hostNetwork: true
+      initContainers:
+      - name: init
+        image: busybox:latest
+      containers:
+      - name: app
+        image: app:latest
+      - name: ok
+        image: app:1.2
+"""
+	[doc] = parse_k8s_source(src, "deploy.yaml")
+	found = rules.check(doc)
+	assert [(f.id, f.title) for f in found] == [
+		("X.LATEST", 'Container "app" uses a latest tag.'),
+		("X.LATEST", 'Container "init" uses a latest tag.'),
+	]
+	assert found[0].resource == "Deployment.web" and found[0].line == 13
+	pod = dict(doc, kind="Pod", body={"spec": {"hostNetwork": True, "containers": [{"name": "a", "image": "a:1"}]}})
+	assert [f.id for f in rules.check(pod)] == ["X.HOST_NET"]
+
+
+def test_declarative_k8s_rules_inherit_pod_security_context():
+	from backend.services.rules_k8s_ext import run_k8s_extra_rules
+
+	doc = {
+		"kind": "Pod",
+		"name": "p",
+		"body": {"spec": {
+			"securityContext": {"privileged": True, "readOnlyRootFilesystem": True},
+			"containers": [
+				{"name": "a", "resources": {"limits": {"cpu": "1", "memory": "1Gi"}}},
+				{"name": "b", "securityContext": {"privileged": False, "readOnlyRootFilesystem": False}, "resources": {"limits": {"cpu": "1"}}},
+			],
+		}},
+	}
+	found = [(f["id"], f["title"]) for f in run_k8s_extra_rules([doc])]
+	assert found == [
+		("K8S.PRIVILEGED", 'Container "a" runs privileged.'),
+		("K8S.NO_LIMITS", 'Container "b" has no CPU/memory limits.'),
+		("K8S.NO_READONLY_ROOTFS", 'Container "b" does not set readOnlyRootFilesystem.'),
+	]